@@ -0,0 +1,153 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from catalog import DB_PATH, DEFAULT_TOLERANCE, NEAREST_K, NEAREST_TOLERANCE
+from engine import SEARCH_TYPES, SearchEngine
+
+log = logging.getLogger("batch_lookup")
+
+_worker_engine = None
+
+
+def read_queries(stream, fmt):
+    # خواندن جریانی؛ کل فایل هیچ‌وقت یک‌جا در حافظه نیست
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield {k.strip(): v for k, v in row.items() if k is not None}
+        return
+
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            query = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"_error": f"line {line_no}: {e}"}
+            continue
+        yield query if isinstance(query, dict) else {"_error": f"line {line_no}: not an object"}
+
+
+def detect_format(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def run_query(engine, query, options):
+    if "_error" in query:
+        return {"status": "invalid", "error": query["_error"]}
+
+    search_type = query.get("type") or query.get("search_type") or options["search_type"]
+    if search_type not in SEARCH_TYPES:
+        return {"id": query.get("id"), "status": "invalid", "error": f"unknown search type: {search_type}"}
+
+    result = engine.lookup_raw(
+        search_type,
+        query,
+        query.get("lang") or options["lang"],
+        tolerance=options["tolerance"],
+        nearest_k=options["nearest_k"],
+        nearest_tolerance=options["nearest_tolerance"],
+    )
+    record = {"id": query.get("id"), "type": search_type}
+    record.update(result.to_dict())
+    return record
+
+
+def _init_worker(db_path):
+    # هر worker کاتالوگ خودش را در حافظه می‌سازد (از artifact باینری در صورت وجود، سریع‌تر از JSON)
+    global _worker_engine
+    _worker_engine = SearchEngine(db_path=db_path)
+    _worker_engine.catalog.refresh()
+
+
+def _run_chunk(queries, options):
+    return [run_query(_worker_engine, q, options) for q in queries]
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def lookup_stream(queries, options, db_path=DB_PATH, workers=1, chunk_size=2000):
+    chunks = _chunks(queries, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        return
+
+    # دسته‌های کوچک ارزش راه‌اندازی process pool را ندارند
+    if workers <= 1 or len(first) < chunk_size:
+        engine = SearchEngine(db_path=db_path)
+        for chunk in chain([first], chunks):
+            for query in chunk:
+                yield run_query(engine, query, options)
+        log.info("result cache: %s", engine.cache_stats())
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+        # تعداد محدودی chunk در جریان است تا ترتیب خروجی حفظ و حافظه محدود بماند
+        pending = deque([pool.submit(_run_chunk, first, options)])
+        for chunk in chunks:
+            pending.append(pool.submit(_run_chunk, chunk, options))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk bearing/housing lookup from CSV or JSONL queries.")
+    parser.add_argument("input", help="CSV or JSONL file with d/D/B columns ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output path (default: stdout)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="input format (default: from extension)")
+    parser.add_argument("--db", default=DB_PATH, help="catalog file or directory of shards")
+    parser.add_argument("--type", dest="search_type", default="bearing", choices=SEARCH_TYPES)
+    parser.add_argument("--lang", default="en", choices=("fa", "en"))
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--nearest", type=int, default=NEAREST_K, help="closest matches when none exact (0 = off)")
+    parser.add_argument("--nearest-tolerance", type=float, default=NEAREST_TOLERANCE)
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    if not os.path.exists(args.db):
+        parser.error(f"catalog not found: {args.db}")
+
+    options = {
+        "search_type": args.search_type,
+        "lang": args.lang,
+        "tolerance": args.tolerance,
+        "nearest_k": args.nearest,
+        "nearest_tolerance": args.nearest_tolerance,
+    }
+    fmt = args.format or detect_format(args.input)
+    src = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8-sig", newline="")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    count = 0
+    try:
+        for record in lookup_stream(read_queries(src, fmt), options, args.db, args.workers, args.chunk_size):
+            dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    log.info("wrote %d results", count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
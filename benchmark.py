@@ -0,0 +1,347 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # ویندوز: اوج مصرف حافظه گزارش نمی‌شود
+    resource = None
+
+from catalog import DB_PATH, FAMILIES_FILE, CatalogStore, np
+from engine import SearchEngine
+
+log = logging.getLogger("benchmark")
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+QUERY_KINDS = ("bearing_exact", "bearing_closest", "housing", "model", "keywords")
+
+BEARING_TYPES = ["bearing", "spherical_roller", "tapered_roller", "CARB_toroidal", "needle_roller", "cylindrical_thrust"]
+HOUSING_TYPES = ["housing_split", "pillow_block", "flanged_unit", "housing_oil", "flanged_unit_composite"]
+SLEEVE_TYPES = ["adapter_sleeve", "withdrawal_sleeve"]
+OTHER_TYPES = ["lock_nut", "locking_washer", "end_cover"]
+
+# شکل‌های مختلف کلیدها همان‌طور که در فایل‌های واقعی و فایل‌های فروشنده‌ها دیده می‌شود
+DIMENSION_KEYS = [
+    ("inner_diameter", "outer_diameter", "width"),
+    ("inner_diameter", "outer_diameter", "width"),
+    ("d", "D", "B"),
+    ("Inner Diameter", "Outer Diameter", "Width"),
+    ("ID", "OD", "W"),
+]
+DESCRIPTION_KEYS = [
+    ("special_features", "special_features_en"),
+    ("special_features", "special_features_en"),
+    ("description", "description_en"),
+    ("purpose", "purpose_en"),
+]
+FEATURES = [
+    ("طراحی استاندارد باز", "Open standard design"),
+    ("دارای دو واشر فلزی جهت حفاظت", "It has two metal washers for protection"),
+    ("آب‌بندی لاستیکی دو طرفه", "Double-sided rubber sealing"),
+    ("لقی داخلی بیشتر از نرمال (C3)", "Internal clearance greater than normal (C3)"),
+    ("مناسب برای سرعت‌های بالا", "Suitable for high speeds"),
+    ("سوراخ مخروطی، مناسب برای آداپتور اسلیو", "Tapered bore, suitable for adapter sleeve"),
+]
+MATERIALS = [("چدن خاکستری", "Grey cast iron"), ("فولاد پرس شده", "Pressed steel"), ("کامپوزیت", "Composite")]
+SERIES = ["60", "62", "63", "222", "223", "302", "NU2", "NJ3", "C22"]
+SUFFIXES = ["", "", "-2Z", "-2RS1", " ETN9", "/C3", " E", "-2RSH"]
+KEYWORD_QUERIES = ["2Z", "rubber", "metal washer", "C3", "high speed*", "لاستیکی", "واشر فلزی", "cast iron", "چدن"]
+
+_PERSIAN = str.maketrans("0123456789.", "۰۱۲۳۴۵۶۷۸۹٫")
+
+
+def _number(rng, value):
+    # مقادیر عددی، رشته‌ای، با ارقام فارسی یا با واحد
+    roll = rng.random()
+    if roll < 0.7:
+        return value
+    if roll < 0.8:
+        return str(value)
+    if roll < 0.9:
+        return str(value).translate(_PERSIAN)
+    return f"{value} mm"
+
+
+def synthetic_records(count, seed=7):
+    rng = random.Random(seed)
+    for i in range(count):
+        roll = rng.random()
+        fa, en = rng.choice(FEATURES)
+        fa_key, en_key = rng.choice(DESCRIPTION_KEYS)
+        if roll < 0.8:
+            d = rng.randint(3, 400)
+            D = d * 2 + rng.randint(2, 60)
+            B = round(rng.uniform(4, 120), 1)
+            d_key, D_key, B_key = rng.choice(DIMENSION_KEYS)
+            record = {
+                "type": rng.choice(BEARING_TYPES),
+                "model": f"{rng.choice(SERIES)}{i:06d}{rng.choice(SUFFIXES)}",
+                d_key: _number(rng, d),
+                D_key: _number(rng, D),
+                B_key: _number(rng, B),
+            }
+        elif roll < 0.95:
+            shaft = rng.randint(10, 300)
+            sleeve = roll >= 0.9
+            record = {
+                "type": rng.choice(SLEEVE_TYPES if sleeve else HOUSING_TYPES),
+                "model": f"{'H' if sleeve else 'SNL'} {i:06d}",
+                "shaft_diameter": _number(rng, shaft),
+            }
+            if sleeve:
+                record["bearing_bore"] = _number(rng, shaft + 5)
+            else:
+                material_fa, material_en = rng.choice(MATERIALS)
+                record["material"] = material_fa
+                record["material_en"] = material_en
+        else:
+            record = {"type": rng.choice(OTHER_TYPES), "model": f"KM {i:06d}"}
+        record[fa_key] = fa
+        record[en_key] = en
+        yield record
+
+
+def write_catalog(path, count, seed=7):
+    # نوشتن جریانی تا فایل ۱ میلیون رکوردی کامل در حافظه ساخته نشود
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, record in enumerate(synthetic_records(count, seed)):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n]\n")
+
+
+def make_queries(catalog, per_kind, seed=11):
+    rng = random.Random(seed)
+    bearings = catalog.rows("bearing")
+    housings = catalog.rows("housing")
+    everything = catalog.all_rows()
+    queries = []
+    for _ in range(per_kind):
+        if bearings:
+            row = rng.choice(bearings)
+            queries.append(("bearing_exact", "bearing", {"d": str(row.d).translate(_PERSIAN), "D": row.D, "B": row.B}))
+            off = rng.uniform(0.3, 2.0)
+            queries.append(("bearing_closest", "bearing", {"d": row.d + off, "D": row.D - off, "B": row.B}))
+        if housings:
+            queries.append(("housing", "housing", {"d": rng.choice(housings).d}))
+        model = rng.choice(everything).model
+        if rng.random() < 0.3 and len(model) > 3:
+            # خطای تایپی: حذف یک کاراکتر
+            cut = rng.randrange(len(model))
+            model = model[:cut] + model[cut + 1 :]
+        queries.append(("model", "model", {"model": model}))
+        queries.append(("keywords", rng.choice(["bearing", "housing"]), {"keywords": rng.choice(KEYWORD_QUERIES)}))
+    rng.shuffle(queries)
+    return queries
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]  # noqa: E731
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # لینوکس کیلوبایت و macOS بایت گزارش می‌کند
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+class RenderProbe:
+    # همان مدل/view صفحه جستجو روی پلتفرم offscreen؛ زمان پر کردن مدل تا رسم کامل view
+    def __init__(self):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+
+        from result_view import ResultListModel, ResultListView, SeparatorDelegate
+
+        self.app = QApplication.instance() or QApplication([])
+        self.model = ResultListModel()
+        self.view = ResultListView()
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(SeparatorDelegate(self.view))
+        self.view.setUniformItemSizes(True)
+        self.view.resize(1000, 500)
+
+    def render(self, result):
+        started = time.perf_counter()
+        self.model.set_message(result.status, "#2ecc71")
+        self.model.append(result.entries)
+        self.view.grab()
+        return time.perf_counter() - started
+
+
+def run_size(path, size, per_kind, render=True):
+    record = {"records": size, "file_mb": round(os.path.getsize(path) / 1e6, 2)}
+
+    catalog = CatalogStore(path, use_artifact=False)
+    started = time.perf_counter()
+    catalog.refresh()
+    record["load_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    started = time.perf_counter()
+    catalog.warm_up()
+    record["index_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    record["partitions"] = catalog.stats()["partitions"]
+
+    # همان مسیری که دکمه جستجو (SearchTask) طی می‌کند؛ بدون cache نتایج تا هزینه واقعی جستجو اندازه‌گیری شود
+    engine = SearchEngine(catalog, cache_size=0)
+    probe = RenderProbe() if render else None
+    latencies = {kind: [] for kind in QUERY_KINDS}
+    renders = []
+    statuses = {}
+    for kind, search_type, raw in make_queries(catalog, per_kind):
+        started = time.perf_counter()
+        result = engine.lookup_raw(search_type, raw, "en")
+        latencies[kind].append(time.perf_counter() - started)
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+        if probe is not None:
+            renders.append(probe.render(result))
+
+    record["latency"] = {kind: percentiles(samples) for kind, samples in latencies.items()}
+    record["latency"]["all"] = percentiles([s for samples in latencies.values() for s in samples])
+    record["render"] = percentiles(renders) if probe is not None else None
+    record["statuses"] = statuses
+    record["peak_rss_mb"] = peak_rss_mb()
+    return record
+
+
+def memory_report(path, size):
+    # بایت به ازای هر رکورد: dictهای خام json.loads (مبنا) در برابر ردیف‌های کاتالوگ و ایندکس‌ها.
+    # در پردازه جدا اجرا می‌شود چون tracemalloc بارگذاری را کند می‌کند
+    with open(path, "rb") as f:
+        payload = f.read()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    raw = json.loads(payload.decode("utf-8"))
+    dict_bytes = tracemalloc.get_traced_memory()[0] - base
+    del raw, payload
+
+    catalog = CatalogStore(path, use_artifact=False)
+    base = tracemalloc.get_traced_memory()[0]
+    catalog.refresh()
+    row_bytes = tracemalloc.get_traced_memory()[0] - base
+    base = tracemalloc.get_traced_memory()[0]
+    catalog.warm_up()
+    index_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    per_record = lambda n: round(n / max(size, 1), 1)  # noqa: E731
+    return {
+        "dict_bytes_per_record": per_record(dict_bytes),
+        "row_bytes_per_record": per_record(row_bytes),
+        "index_bytes_per_record": per_record(index_bytes),
+        "row_mb": round(row_bytes / 1e6, 1),
+        "index_mb": round(index_bytes / 1e6, 1),
+    }
+
+
+def run_isolated(path, size, args, memory=False):
+    # هر اندازه در پردازه جدا اجرا می‌شود تا اوج حافظه (RSS) مربوط به همان اندازه باشد
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", path, "--sizes", str(size), "--queries", str(args.queries)]
+    if args.no_render:
+        cmd.append("--no-render")
+    if memory:
+        cmd.append("--memory")
+    out = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, text=True, encoding="utf-8").stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def summary_line(r):
+    lat = r["latency"]["all"]
+    render = r["render"]["p50_ms"] if r.get("render") else "-"
+    return (
+        f"{r['records']:>9} records  load {r['load_ms']:>9.1f} ms  index {r['index_ms']:>9.1f} ms  "
+        f"p50 {lat['p50_ms']:>7.3f} ms  p99 {lat['p99_ms']:>8.3f} ms  render p50 {render} ms  "
+        f"rss {r['peak_rss_mb']} MB"
+    )
+
+
+def memory_line(r):
+    m = r["memory"]
+    return (
+        f"{r['records']:>9} records  dicts {m['dict_bytes_per_record']:>7.1f} B/rec  "
+        f"rows {m['row_bytes_per_record']:>7.1f} B/rec  indexes {m['index_bytes_per_record']:>7.1f} B/rec  "
+        f"({m['row_mb']} + {m['index_mb']} MB)"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless search benchmark on synthetic catalogs.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="comma separated record counts")
+    parser.add_argument("--queries", type=int, default=100, help="queries per kind and size (default: 100)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-render", action="store_true", help="skip the Qt result-rendering probe")
+    parser.add_argument(
+        "--memory", action="store_true", help="also report bytes per record of the loaded catalog against plain dicts"
+    )
+    parser.add_argument("-o", "--output", help="JSONL output (default: stdout)")
+    parser.add_argument("--worker", metavar="CATALOG", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(name)s: %(message)s")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    if args.worker:
+        if args.memory:
+            print(json.dumps(memory_report(args.worker, sizes[0])))
+        else:
+            print(json.dumps(run_size(args.worker, sizes[0], args.queries, not args.no_render)))
+        return 0
+
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np is not None,
+        "seed": args.seed,
+        "queries_per_kind": args.queries,
+    }
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # قواعد خانواده‌ها کنار فایل کاتالوگ خوانده می‌شوند
+            families = os.path.join(os.path.dirname(DB_PATH), FAMILIES_FILE)
+            if os.path.exists(families):
+                shutil.copy(families, tmp)
+            for size in sizes:
+                path = os.path.join(tmp, f"catalog_{size}.json")
+                started = time.perf_counter()
+                write_catalog(path, size, args.seed)
+                generate_ms = round((time.perf_counter() - started) * 1000, 1)
+
+                record = dict(meta, generate_ms=generate_ms)
+                record.update(run_isolated(path, size, args))
+                if args.memory:
+                    record["memory"] = run_isolated(path, size, args, memory=True)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                print(summary_line(record), file=sys.stderr)
+                if args.memory:
+                    print(memory_line(record), file=sys.stderr)
+                os.remove(path)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,911 @@
+import bisect
+import gc
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+
+try:
+    import numpy as np
+except ImportError:  # بدون NumPy جستجوی نزدیک‌ترین با heapq انجام می‌شود
+    np = None
+
+DB_PATH = os.path.join("DataBase", "DataBase.json")
+# قواعد تقسیم نوع‌ها به خانواده (کنار فایل دیتابیس)
+FAMILIES_FILE = "type_families.json"
+OTHER_FAMILY = "other"
+
+log = logging.getLogger("catalog")
+
+_BIDI_MARKS = re.compile(r"[\u200e\u200f\u202a-\u202e\u2066-\u2069]")
+_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩٫٬،", "01234567890123456789.,,")
+_NUMBER = re.compile(r"[-+]?(?:\d+\.\d+|\d+|\.\d+)")
+
+# کلیدهای مستعار هر فیلد: (کلیدهای دقیق، کلیدهای نرمال‌شده)
+FIELD_ALIASES = {
+    "d": (["d"], ["inner_diameter", "inner", "di", "id", "innerdiameter"]),
+    "D": (["D"], ["outer_diameter", "outer", "od", "douter", "outerdiameter", "de"]),
+    "B": (["B", "b"], ["width", "w"]),
+    "shaft": (["shaft_diameter"], ["shaftdiameter", "shaft"]),
+    "bore": (["bearing_bore"], ["bearingbore", "bore"]),
+    "model": (["model", "Model"], ["model"]),
+    "type": (["type"], ["type"]),
+    "desc_fa": (["purpose", "description", "special_features"], ["purpose", "description", "specialfeatures"]),
+    "desc_en": (
+        ["purpose_en", "description_en", "special_features_en"],
+        ["purposeen", "descriptionen", "specialfeaturesen"],
+    ),
+    "desc_any": (
+        ["purpose", "purpose_en", "description", "description_en", "special_features", "special_features_en"],
+        ["purpose", "purposeen", "description", "descriptionen", "specialfeatures", "specialfeaturesen"],
+    ),
+}
+
+DIMENSION_FIELDS = ("d", "D", "B", "shaft", "bore")
+
+# ویژگی‌های متنی دیگر که فقط در جستجوی کلمه کلیدی استفاده می‌شوند (هر دو زبان)
+KEYWORD_KEYS = {
+    "material",
+    "materialen",
+    "lockingmethod",
+    "lockingmethoden",
+    "shape",
+    "shapeen",
+    "features",
+    "featuresen",
+}
+
+DEFAULT_TOLERANCE = 0.1
+NEAREST_K = 10
+NEAREST_TOLERANCE = 5.0
+
+# فیلدهای ابعادی هر نوع جستجو؛ فیلد اول کلید مرتب‌سازی ایندکس است
+SEARCH_FIELDS = {
+    "bearing": ("d", "D", "B"),
+    "housing": ("d",),
+}
+
+
+def normalize_digits(txt):
+    # نرمال‌سازی برای حذف علائم کنترلی RTL/LTR و اختلاف‌های یونیکدی
+    txt = unicodedata.normalize("NFKC", txt)
+    txt = _BIDI_MARKS.sub("", txt)
+
+    # ارقام فارسی/عربی + جداکننده‌های اعشاری رایج
+    return txt.translate(_DIGITS)
+
+
+def safe_float(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    txt = str(value).strip()
+    if not txt:
+        return None
+
+    txt = normalize_digits(txt)
+    txt = txt.replace(",", ".").replace("/", ".").replace("\\", ".")
+    txt = re.sub(r"\s+", "", txt)
+    txt = re.sub(r"[^0-9.+-]", "", txt)
+
+    # اگر چند نقطه وجود داشت، فقط اولین نقطه نگه داشته شود
+    if txt.count(".") > 1:
+        first = txt.find(".")
+        txt = txt[: first + 1] + txt[first + 1 :].replace(".", "")
+
+    match = _NUMBER.search(txt)
+    if not match:
+        return None
+
+    try:
+        return float(match.group(0))
+    except ValueError:
+        return None
+
+
+@contextmanager
+def gc_paused():
+    # ساخت میلیون‌ها شیء کوچک بدون وقفه‌های مکرر garbage collector چند برابر سریع‌تر است
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def file_digest(payload):
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def norm_key(key):
+    return re.sub(r"[^a-z0-9]", "", str(key).strip().lower())
+
+
+def resolve_key(keys, exact_keys, normalized_keys):
+    # همان ترتیب اولویت _get_by_keys، ولی روی نام کلیدها و فقط یک بار برای هر امضای کلید
+    for key in exact_keys:
+        if key in keys:
+            return key
+
+    lowered = {str(k).strip().lower(): k for k in keys}
+    for key in exact_keys:
+        hit = lowered.get(str(key).strip().lower())
+        if hit is not None:
+            return hit
+
+    normalized_candidates = {norm_key(k) for k in normalized_keys}
+    for k in keys:
+        if norm_key(k) in normalized_candidates:
+            return k
+
+    return None
+
+
+class ValuePool:
+    # نوع، توضیحات و ویژگی‌ها در هزاران ردیف تکرار می‌شوند و ابعاد هم مقادیر محدودی دارند؛
+    # هر مقدار فقط یک بار در حافظه می‌ماند و ردیف‌ها به همان شیء مشترک اشاره می‌کنند
+    def __init__(self):
+        self._values = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def shared(self, value):
+        if not isinstance(value, (str, float)) or value != value:
+            return value
+        return self._values.setdefault(value, value)
+
+    def shared_known(self):
+        # برای مقادیری که همیشه str یا float یا None هستند؛ بدون بررسی نوع در حلقه‌های بارگذاری
+        return self._values.setdefault
+
+
+class CatalogRow:
+    __slots__ = ("d", "D", "B", "shaft", "bore", "model", "type", "desc_fa", "desc_en", "keywords")
+
+    def __init__(self, d, D, B, shaft, bore, model, type, desc_fa, desc_en, keywords=""):
+        self.d = d
+        self.D = D
+        self.B = B
+        self.shaft = shaft
+        self.bore = bore
+        self.model = model
+        self.type = type
+        self.desc_fa = desc_fa
+        self.desc_en = desc_en
+        self.keywords = keywords
+
+    def desc(self, lang):
+        return self.desc_en if lang == "en" else self.desc_fa
+
+    def __repr__(self):
+        return f"CatalogRow({self.model!r}, d={self.d}, D={self.D}, B={self.B})"
+
+
+def _is_number(value):
+    return value is not None and value == value
+
+
+class DimensionIndex:
+    # آرایه مرتب روی فیلد اول + bisect؛ بقیه فیلدها فقط روی بازه کوچک پیدا شده فیلتر می‌شوند
+    def __init__(self, rows, fields, required=None):
+        self.fields = tuple(fields)
+        self.required = tuple(required or self.fields)
+        usable = [r for r in rows if self._usable(r)]
+        usable.sort(key=lambda r: getattr(r, self.fields[0]))
+        self._rows = usable
+        self._keys = array("d", (getattr(r, self.fields[0]) for r in usable))
+        self._columns = None
+        self._types = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _usable(self, row):
+        return all(_is_number(getattr(row, f)) for f in self.required)
+
+    def updated(self, removed, added):
+        # نسخه جدید با حذف و درج چند ردیف (بدون مرتب‌سازی دوباره)؛ نسخه قبلی برای جستجوهای در جریان دست نخورده می‌ماند
+        first = self.fields[0]
+        drop = []
+        for row in removed:
+            if self._usable(row):
+                pos = bisect.bisect_left(self._keys, getattr(row, first))
+                while pos < len(self._rows) and self._rows[pos] is not row and self._keys[pos] == getattr(row, first):
+                    pos += 1
+                if pos < len(self._rows) and self._rows[pos] is row:
+                    drop.append(pos)
+        drop.sort()
+        rows, keys = [], array("d")
+        start = 0
+        for pos in drop + [len(self._rows)]:
+            rows.extend(self._rows[start:pos])
+            keys.extend(self._keys[start:pos])
+            start = pos + 1
+
+        # ردیف‌های جدید بعد از ردیف‌های هم‌کلید قبلی می‌آیند؛ همان ترتیبی که مرتب‌سازی پایدار می‌داد
+        new = sorted((r for r in added if self._usable(r)), key=lambda r: getattr(r, first))
+        at = [bisect.bisect_right(keys, getattr(r, first)) for r in new]
+        if new:
+            merged_rows, merged_keys = [], array("d")
+            start = 0
+            for pos, row in zip(at, new):
+                merged_rows.extend(rows[start:pos])
+                merged_keys.extend(keys[start:pos])
+                merged_rows.append(row)
+                merged_keys.append(getattr(row, first))
+                start = pos
+            merged_rows.extend(rows[start:])
+            merged_keys.extend(keys[start:])
+            rows, keys = merged_rows, merged_keys
+
+        clone = DimensionIndex.__new__(DimensionIndex)
+        clone.fields = self.fields
+        clone.required = self.required
+        clone._rows = rows
+        clone._keys = keys
+        clone._columns = None
+        clone._types = None
+        if self._columns is not None:
+            clone._columns = [
+                np.insert(np.delete(column, drop), at, np.array([getattr(r, f) for r in new], dtype=np.float32))
+                for column, f in zip(self._columns, self.fields)
+            ]
+        return clone
+
+    def query(self, values, tolerance=DEFAULT_TOLERANCE, types=None):
+        # می‌توان فقط چند فیلد اول را داد (مثلاً فقط d در جستجوی جزئی)؛ types اختیاری نوع‌های مجاز است
+        first = values[0]
+        # حاشیه کوچک برای خطای گرد کردن؛ شرط دقیق abs(x - u) < tol دوباره بررسی می‌شود
+        pad = tolerance + 1e-9 * max(1.0, abs(first))
+        lo = bisect.bisect_left(self._keys, first - pad)
+        hi = bisect.bisect_right(self._keys, first + pad, lo)
+
+        rest = list(zip(self.fields, values))
+        matches = []
+        for row in self._rows[lo:hi]:
+            if all(abs(getattr(row, f) - v) < tolerance for f, v in rest):
+                matches.append(row)
+        if types is not None:
+            matches = [row for row in matches if row.type in types]
+        return matches
+
+    def _window(self, first, tolerance, weight):
+        # فاصله وزن‌دار هیچ‌وقت از sqrt(w) * |d - u| کمتر نیست، پس بیرون این بازه نیازی به محاسبه نیست
+        if tolerance is None or weight <= 0:
+            return 0, len(self._rows)
+        reach = tolerance / weight**0.5
+        lo = bisect.bisect_left(self._keys, first - reach)
+        hi = bisect.bisect_right(self._keys, first + reach, lo)
+        return lo, hi
+
+    def columns(self):
+        if self._columns is None and np is not None:
+            # ستون‌های float32 پهنای باند حافظه را نصف می‌کنند؛ رتبه‌بندی نهایی دوباره با float64 انجام می‌شود
+            self._columns = [
+                np.fromiter((getattr(r, f) for r in self._rows), dtype=np.float32, count=len(self._rows))
+                for f in self.fields
+            ]
+        return self._columns
+
+    def type_codes(self):
+        # شماره نوع هر ردیف (به ترتیب ایندکس) تا فیلتر نوع در nearest هم برداری باشد
+        if self._types is None and np is not None:
+            codes = {}
+            column = np.fromiter(
+                (codes.setdefault(r.type, len(codes)) for r in self._rows), dtype=np.int32, count=len(self._rows)
+            )
+            self._types = (codes, column)
+        return self._types
+
+    def _distance(self, row, values, weights):
+        return sum(w * (getattr(row, f) - v) ** 2 for f, v, w in zip(self.fields, values, weights)) ** 0.5
+
+    def nearest(self, values, k=NEAREST_K, tolerance=None, weights=None, types=None):
+        weights = tuple(weights) if weights else (1.0,) * len(self.fields)
+        lo, hi = self._window(values[0], tolerance, weights[0])
+        if hi <= lo or k <= 0:
+            return []
+
+        if np is None:
+            candidates = (
+                (self._distance(row, values, weights), row.model, row.desc_en, i)
+                for i, row in enumerate(self._rows[lo:hi], lo)
+                if types is None or row.type in types
+            )
+            if tolerance is not None:
+                candidates = (c for c in candidates if c[0] <= tolerance)
+            return [(self._rows[i], dist) for dist, _, _, i in heapq.nsmallest(k, candidates)]
+
+        columns = self.columns()
+        dist = np.subtract(columns[0][lo:hi], np.float32(values[0]))
+        np.multiply(dist, dist, out=dist)
+        if weights[0] != 1.0:
+            dist *= np.float32(weights[0])
+        buf = np.empty_like(dist)
+        for column, v, w in zip(columns[1:], values[1:], weights[1:]):
+            np.subtract(column[lo:hi], np.float32(v), out=buf)
+            np.multiply(buf, buf, out=buf)
+            if w != 1.0:
+                buf *= np.float32(w)
+            dist += buf
+
+        margin = k + 8
+        if tolerance is not None:
+            slack = tolerance * (1 + 1e-3) + 1e-3
+            candidates = np.flatnonzero(dist <= np.float32(slack * slack))
+        else:
+            candidates = np.arange(len(dist))
+        if types is not None:
+            codes, column = self.type_codes()
+            wanted = np.array([codes[t] for t in types if t in codes], dtype=np.int32)
+            candidates = candidates[np.isin(column[lo:hi][candidates], wanted)]
+        if len(candidates) > margin:
+            # همه ردیف‌های هم‌فاصله با آخرین کاندید نگه داشته می‌شوند تا ترتیب برابرها (بر اساس مدل) قطعی باشد
+            selected = dist[candidates]
+            cutoff = selected[np.argpartition(selected, margin - 1)[margin - 1]]
+            candidates = candidates[selected <= cutoff * (1 + 1e-5) + 1e-6]
+
+        ranked = []
+        for i in candidates.tolist():
+            row = self._rows[lo + i]
+            exact = self._distance(row, values, weights)
+            if tolerance is None or exact <= tolerance:
+                ranked.append((exact, row.model, row.desc_en, lo + i))
+        ranked.sort()
+        return [(self._rows[i], dist_) for dist_, _, _, i in ranked[:k]]
+
+
+def build_field_plan(keys):
+    plan = {field: resolve_key(keys, *aliases) for field, aliases in FIELD_ALIASES.items()}
+    keyword_keys = tuple(k for k in keys if norm_key(k) in KEYWORD_KEYS)
+    return plan, keyword_keys
+
+
+def _keyword_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value if v is not None)
+    return str(value)
+
+
+def ingest_records(items, plans=None, pool=None):
+    plans = {} if plans is None else plans
+    pool = ValuePool() if pool is None else pool
+    shared, known = pool.shared, pool.shared_known()
+    rows = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+
+        signature = tuple(k for k, v in item.items() if v is not None)
+        entry = plans.get(signature)
+        if entry is None:
+            entry = plans[signature] = build_field_plan(signature)
+        plan, keyword_keys = entry
+
+        values = {field: (item[key] if key is not None else None) for field, key in plan.items()}
+        fallback = values["desc_any"] or ""
+        d, D, B, shaft, bore = (safe_float(values[field]) for field in DIMENSION_FIELDS)
+        desc_fa = str(values["desc_fa"] or fallback)
+        desc_en = str(values["desc_en"] or fallback)
+        keywords = " ".join(_keyword_text(item[key]) for key in keyword_keys)
+        rows.append(
+            CatalogRow(
+                known(d, d),
+                known(D, D),
+                known(B, B),
+                known(shaft, shaft),
+                known(bore, bore),
+                model=str(values["model"] or "N/A"),
+                type=shared(values["type"]),
+                desc_fa=known(desc_fa, desc_fa),
+                desc_en=known(desc_en, desc_en),
+                keywords=known(keywords, keywords),
+            )
+        )
+    return rows
+
+
+class TypeFamilies:
+    # هر خانواده: الگوهای نام نوع (glob)، فیلدهایی که نوع ناشناخته را به خانواده نسبت می‌دهند
+    # و منبع جایگزین فیلدهای جستجو (مثلاً d یاتاقان از shaft_diameter/bearing_bore)
+    def __init__(self, spec=None):
+        self.rules = []
+        for name, rule in (spec or {}).items():
+            patterns = tuple(str(p).lower() for p in rule.get("types", ()))
+            self.rules.append((name, patterns, tuple(rule.get("infer", ())), dict(rule.get("fields", {}))))
+        self._by_type = {}
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def family(self, row):
+        key = str(row.type or "").strip().lower()
+        name = self._by_type.get(key)
+        if name is None:
+            matched = (n for n, patterns, _, _ in self.rules if any(fnmatchcase(key, p) for p in patterns))
+            name = self._by_type[key] = next(matched, "")
+        if name:
+            return name
+        for n, _, infer, _ in self.rules:
+            if infer and all(getattr(row, f) is not None for f in infer):
+                return n
+        return OTHER_FAMILY
+
+    def fill_fields(self, rows, family):
+        fields = next((f for n, _, _, f in self.rules if n == family), None)
+        if not fields:
+            return
+        for row in rows:
+            for field, sources in fields.items():
+                if getattr(row, field) is None:
+                    values = (getattr(row, s) for s in sources if getattr(row, s) is not None)
+                    setattr(row, field, next(values, None))
+
+    def partition(self, rows):
+        parts = {name: [] for name, _, _, _ in self.rules}
+        parts[OTHER_FAMILY] = []
+        for row in rows:
+            parts[self.family(row)].append(row)
+        for name, part in parts.items():
+            self.fill_fields(part, name)
+        return parts
+
+
+def load_type_families(path):
+    try:
+        with open(path, "rb") as f:
+            payload = f.read()
+    except FileNotFoundError:
+        return TypeFamilies(), b""
+    return TypeFamilies(json.loads(payload.decode("utf-8"))), payload
+
+
+class CatalogSnapshot:
+    # ردیف‌ها، ایندکس‌ها و نسخه یک بارگذاری؛ بارگذاری دوباره همیشه snapshot تازه می‌سازد و یک‌جا جایگزین می‌کند
+    def __init__(self, sections=None, indexes=None, version=None):
+        self.sections = sections if sections is not None else {}
+        self.indexes = indexes if indexes is not None else {}
+        self.version = version
+
+
+class CatalogStore:
+    def __init__(self, path=DB_PATH, use_artifact=True, workers=None):
+        # مسیر می‌تواند یک پوشه از فایل‌های فروشنده‌ها (shard) باشد؛ catalog_shards.py
+        self.is_directory = os.path.isdir(path)
+        self.path = os.path.normpath(path) if self.is_directory else path
+        self.families_path = os.path.join(os.path.dirname(self.path), FAMILIES_FILE)
+        if self.is_directory and os.path.isfile(os.path.join(self.path, FAMILIES_FILE)):
+            self.families_path = os.path.join(self.path, FAMILIES_FILE)
+        self.use_artifact = use_artifact
+        self.workers = workers
+        self.source = None
+        self.load_time = 0.0
+        self.record_count = 0
+        self.load_count = 0
+        self.load_stages = {}
+        self.last_update = None
+        self.load_error = None
+        self._stat = None
+        self._snapshot = CatalogSnapshot()
+        self._pinned = threading.local()
+        self._lock = threading.RLock()
+        self.signature_count = 0
+
+    # جستجویی که snapshot را pin کرده تا پایان همان نسخه را می‌بیند، حتی اگر در این میان فایل دوباره بارگذاری شود
+    def _current(self):
+        return getattr(self._pinned, "snapshot", None) or self._snapshot
+
+    @property
+    def _sections(self):
+        return self._current().sections
+
+    @property
+    def _indexes(self):
+        return self._current().indexes
+
+    @property
+    def version(self):
+        return self._current().version
+
+    @property
+    def latest_version(self):
+        # نسخه آخرین بارگذاری، بدون توجه به snapshot که این thread pin کرده است
+        return self._snapshot.version
+
+    @contextmanager
+    def snapshot(self):
+        # همه فراخوان‌های یک جستجو (تطبیق، نزدیک‌ترین، تعداد جایگزین‌ها) روی یک نسخه اجرا می‌شوند
+        if getattr(self._pinned, "snapshot", None) is not None:
+            yield self._pinned.snapshot
+            return
+        self.refresh()
+        self._pinned.snapshot = self._snapshot
+        try:
+            yield self._pinned.snapshot
+        finally:
+            self._pinned.snapshot = None
+
+    def exists(self):
+        return os.path.isdir(self.path) if self.is_directory else os.path.isfile(self.path)
+
+    def shard_paths(self):
+        import catalog_shards
+
+        return catalog_shards.shard_paths(self.path, exclude=(FAMILIES_FILE,))
+
+    def _stat_signature(self):
+        # تغییر فایل قواعد خانواده‌ها هم مثل تغییر دیتابیس باعث بارگذاری دوباره می‌شود
+        if self.is_directory:
+            # tuple تخت (نام، mtime، size هر shard) تا در header فایل artifact هم قابل مقایسه بماند
+            stat = []
+            for path in self.shard_paths():
+                st = os.stat(path)
+                stat += [os.path.basename(path), st.st_mtime_ns, st.st_size]
+            try:
+                fam = os.stat(self.families_path)
+                return tuple(stat) + (fam.st_mtime_ns, fam.st_size)
+            except FileNotFoundError:
+                return tuple(stat) + (None, None)
+        st = os.stat(self.path)
+        try:
+            fam = os.stat(self.families_path)
+        except FileNotFoundError:
+            return (st.st_mtime_ns, st.st_size, None, None)
+        return (st.st_mtime_ns, st.st_size, fam.st_mtime_ns, fam.st_size)
+
+    def source_stat(self):
+        return self._stat
+
+    def refresh(self):
+        # بررسی ارزان mtime/size در هر جستجو؛ فقط در صورت تغییر واقعی فایل دوباره parse می‌شود
+        stat = self._stat_signature()
+        if stat == self._stat:
+            return False
+
+        # جستجوها در thread جدا اجرا می‌شوند؛ فقط یک thread فایل را بارگذاری می‌کند
+        with self._lock:
+            if stat == self._stat:
+                return False
+            try:
+                changed = self._reload(stat)
+            except (OSError, ValueError) as e:
+                # فایل نیمه‌نوشته (در میانه ذخیره) یا خراب: تا تغییر بعدی فایل همان snapshot قبلی استفاده می‌شود
+                if not self._snapshot.sections:
+                    raise
+                self.load_error = f"{self.path}: {e}"
+                self._stat = stat
+                log.warning("keeping the previous catalog: %s", self.load_error)
+                return False
+            self.load_error = None
+            return changed
+
+    def _reload(self, stat):
+        started = time.perf_counter()
+        with gc_paused():
+            if self._load_artifact(stat, None, started):
+                self.load_stages = {"artifact": self.load_time}
+                return True
+            if self.is_directory:
+                return self._reload_shards(stat, started)
+
+            with open(self.path, "rb") as f:
+                payload = f.read()
+            families, families_payload = load_type_families(self.families_path)
+            digest = file_digest(payload + b"\0" + families_payload)
+            if digest == self._snapshot.version:
+                self._stat = stat
+                return False
+            # زمان هر مرحله بارگذاری برای گزارش زمان‌بندی جستجو (query_trace)
+            stages = {"read": time.perf_counter() - started}
+            mark = time.perf_counter()
+            if self._load_artifact(stat, digest, started):
+                self.load_stages = dict(stages, artifact=time.perf_counter() - mark)
+                return True
+
+            raw_data = json.loads(payload.decode("utf-8"))
+            stages["parse"], mark = time.perf_counter() - mark, time.perf_counter()
+            sections = self._ingest_sections(self._split_sections(raw_data))
+            del raw_data
+            stages["ingest"], mark = time.perf_counter() - mark, time.perf_counter()
+            sections = self._partition(sections, families)
+            stages["partition"] = time.perf_counter() - mark
+            self.load_stages = stages
+            self._finish_load(sections, digest, stat, started, "json")
+        return True
+
+    def _reload_shards(self, stat, started):
+        import catalog_shards
+
+        loaded = catalog_shards.load_shards(self.shard_paths(), self.workers)
+        families, families_payload = load_type_families(self.families_path)
+        # نسخه از hash همه shardها به ترتیب نام؛ hash هر فایل هنگام خواندن جریانی حساب شده است
+        digest = file_digest("\n".join(loaded.digests).encode("utf-8") + b"\0" + families_payload)
+        if digest == self._snapshot.version:
+            self._stat = stat
+            return False
+        stages = dict(loaded.stages)
+        mark = time.perf_counter()
+        if self._load_artifact(stat, digest, started):
+            self.load_stages = dict(stages, artifact=time.perf_counter() - mark)
+            return True
+
+        self.signature_count = loaded.signatures
+        flat, explicit = loaded.flat, loaded.explicit
+        del loaded
+        if not any(explicit.values()):
+            sections = self._partition({"all": flat}, families)
+        elif families:
+            # رکوردهای بخش‌های صریح (bearings/housings) به خانواده خودشان اضافه می‌شوند
+            sections = families.partition(flat)
+            for name, rows in explicit.items():
+                families.fill_fields(rows, name)
+                sections.setdefault(name, []).extend(rows)
+        else:
+            sections = {name: rows + flat for name, rows in explicit.items()}
+        stages["partition"] = time.perf_counter() - mark
+        self.load_stages = stages
+        self._finish_load(sections, digest, stat, started, "shards")
+        return True
+
+    def _load_artifact(self, stat, digest, started):
+        if not self.use_artifact:
+            return False
+        import catalog_binary
+
+        path = catalog_binary.artifact_path(self.path)
+        if not os.path.isfile(path):
+            return False
+        loaded = catalog_binary.load_fresh(path, stat, digest)
+        if loaded is None:
+            return False
+        sections, version = loaded
+        if version == self._snapshot.version:
+            self._stat = stat
+            return False
+        self._finish_load(sections, version, stat, started, "artifact")
+        return True
+
+    def _finish_load(self, sections, version, stat, started, source):
+        previous = self._snapshot
+        self.last_update = None
+        if previous.sections:
+            # بارگذاری دوباره: فقط ردیف‌های اضافه/تغییر/حذف شده (بر اساس model) روی ایندکس‌های موجود اعمال می‌شوند
+            import catalog_diff
+
+            mark = time.perf_counter()
+            snapshot, self.last_update = catalog_diff.apply(previous, sections, version)
+            self.load_stages["update"] = time.perf_counter() - mark
+        else:
+            snapshot = CatalogSnapshot(sections, {}, version)
+        # جستجوهای در جریان snapshot قبلی را نگه داشته‌اند؛ جایگزینی یک انتساب است
+        self._snapshot = snapshot
+        self.load_time = time.perf_counter() - started
+        unique_sections = {id(v): v for v in snapshot.sections.values()}
+        self.record_count = sum(len(v) for v in unique_sections.values())
+        self.load_count += 1
+        self.source = source
+        self._stat = stat
+        log.info(
+            "loaded %d records from %s (%s) in %.1f ms",
+            self.record_count,
+            self.path,
+            source,
+            self.load_time * 1000,
+        )
+        if self.last_update:
+            log.info(
+                "%d models added, %d changed, %d removed (%s index update)",
+                self.last_update["inserted"],
+                self.last_update["changed"],
+                self.last_update["deleted"],
+                "incremental" if self.last_update["incremental"] else "full",
+            )
+
+    def _split_sections(self, raw_data):
+        # تشخیص شکل فایل (لیست یا دیکشنری از لیست‌ها) فقط یک بار هنگام بارگذاری
+        if isinstance(raw_data, list):
+            return {"all": raw_data}
+        if not isinstance(raw_data, dict):
+            return {"all": []}
+
+        sections = {}
+        first_list = next((v for v in raw_data.values() if isinstance(v, list)), [])
+        for search_type, key in (("bearing", "bearings"), ("housing", "housings")):
+            items = raw_data.get(key, [])
+            sections[search_type] = items if items else first_list
+        return sections
+
+    def _ingest_sections(self, sections):
+        plans = {}
+        pool = ValuePool()
+        rows_by_list = {}
+        ingested = {}
+        for name, items in sections.items():
+            if id(items) not in rows_by_list:
+                rows_by_list[id(items)] = ingest_records(items, plans, pool)
+            ingested[name] = rows_by_list[id(items)]
+        self.signature_count = len(plans)
+        return ingested
+
+    def _partition(self, sections, families):
+        # فایل تک‌لیستی بر اساس خانواده نوع تقسیم می‌شود تا هر حالت جستجو فقط بخش خودش را ببیند
+        if not families:
+            return sections
+        shared = sections.get("all")
+        if shared is None and len({id(v) for v in sections.values()}) == 1:
+            shared = next(iter(sections.values()), None)
+        if shared is not None:
+            return families.partition(shared)
+        for name, rows in sections.items():
+            families.fill_fields(rows, name)
+        return sections
+
+    def sections(self):
+        self.refresh()
+        return dict(self._sections)
+
+    def rows(self, search_type):
+        self.refresh()
+        return self._rows(search_type)
+
+    def _rows(self, search_type):
+        if "all" in self._sections:
+            return self._sections["all"]
+        return self._sections.get(search_type, [])
+
+    def all_rows(self):
+        self.refresh()
+        unique_sections = {id(v): v for v in self._sections.values()}
+        return [row for rows in unique_sections.values() for row in rows]
+
+    def model_index(self):
+        self.refresh()
+        index = self._indexes.get("model")
+        if index is None:
+            from model_index import ModelIndex
+
+            with self._lock:
+                index = self._indexes.get("model")
+                if index is None:
+                    index = self._indexes["model"] = ModelIndex((row.model, row) for row in self.all_rows())
+        return index
+
+    def model_search(self, query, limit=20):
+        return self.model_index().search(query, limit)
+
+    def interchange_index(self):
+        # گروه‌های هم‌اندازه (d, D, B) برای پیدا کردن قطعات جایگزین؛ یک بار بعد از هر بارگذاری ساخته می‌شود
+        self.refresh()
+        return self._interchange_index()
+
+    def _interchange_index(self):
+        index = self._indexes.get("interchange")
+        if index is None:
+            from interchange import InterchangeIndex
+
+            with self._lock:
+                index = self._indexes.get("interchange")
+                if index is None:
+                    index = self._indexes["interchange"] = InterchangeIndex(self._rows("bearing"))
+        return index
+
+    def interchange_group(self, values, tolerance=DEFAULT_TOLERANCE):
+        return self.interchange_index().group(values, tolerance)
+
+    def group_size(self, values):
+        return self.interchange_index().group_size(values)
+
+    def group_counter(self):
+        # برای یک لیست نتایج: ایندکس یک بار از snapshot فعلی (یا pin شده) گرفته می‌شود، بدون stat فایل برای هر ردیف
+        return self._interchange_index().group_size
+
+    def text_index(self, search_type):
+        # ایندکس کلمات کلیدی روی همان لیست ردیف‌ها؛ با فایل تک‌لیستی بین bearing و housing مشترک است
+        rows = self.rows(search_type)
+        key = ("text", id(rows))
+        index = self._indexes.get(key)
+        if index is None:
+            from text_index import TextIndex
+
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = self._indexes[key] = TextIndex(
+                        (r.model, r.type, r.desc_fa, r.desc_en, r.keywords) for r in rows
+                    )
+        return rows, index
+
+    def text_search(self, search_type, query, values=None, tolerance=DEFAULT_TOLERANCE, prefix_last=False, types=None):
+        # کلمات کلیدی با AND و فیلتر اختیاری روی ابعاد وارد شده (مثلاً فقط d) و نوع‌ها
+        rows, index = self.text_index(search_type)
+        ids = index.search(query, prefix_last)
+        if ids is None:
+            return None
+        fields = SEARCH_FIELDS[search_type]
+        values = dict(values or {})
+        matches = []
+        for i in ids:
+            row = rows[i]
+            if any(getattr(row, f) is None for f in fields):
+                continue
+            if types is not None and row.type not in types:
+                continue
+            if all(abs(getattr(row, f) - v) < tolerance for f, v in values.items()):
+                matches.append(row)
+        return matches
+
+    def index(self, search_type):
+        self.refresh()
+        index = self._indexes.get(search_type)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(search_type)
+                if index is None:
+                    index = self._indexes[search_type] = DimensionIndex(
+                        self.rows(search_type), SEARCH_FIELDS[search_type]
+                    )
+        return index
+
+    def field_index(self, search_type, field):
+        # ایندکس تک‌فیلدی برای جستجوی جزئی (مثلاً فقط D وارد شده)
+        key = (search_type, field)
+        index = self._indexes.get(key)
+        if index is None:
+            if field == SEARCH_FIELDS[search_type][0]:
+                return self.index(search_type)
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = self._indexes[key] = DimensionIndex(
+                        self.rows(search_type), (field,), SEARCH_FIELDS[search_type]
+                    )
+        return index
+
+    def field_search(self, search_type, field, value, tolerance=DEFAULT_TOLERANCE, types=None):
+        self.refresh()
+        return self.field_index(search_type, field).query((value,), tolerance, types)
+
+    def search(self, search_type, values, tolerance=DEFAULT_TOLERANCE, types=None):
+        return self.index(search_type).query(values, tolerance, types)
+
+    def nearest(self, search_type, values, k=NEAREST_K, tolerance=NEAREST_TOLERANCE, weights=None, types=None):
+        return self.index(search_type).nearest(values, k, tolerance, weights, types)
+
+    def warm_up(self):
+        # همه ایندکس‌ها پیش از اولین جستجو ساخته می‌شوند (در thread پس‌زمینه هنگام شروع برنامه)
+        self.refresh()
+        for search_type, fields in SEARCH_FIELDS.items():
+            self.index(search_type).columns()
+            for field in fields[1:]:
+                self.field_index(search_type, field)
+        for search_type in SEARCH_FIELDS:
+            self.text_index(search_type)
+        self.model_index()
+        self.interchange_index()
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "records": self.record_count,
+            "load_time_ms": round(self.load_time * 1000, 2),
+            "loads": self.load_count,
+            "source": self.source,
+            "key_signatures": self.signature_count,
+            "partitions": {name: len(rows) for name, rows in self._sections.items()},
+            "version": self.version,
+            "last_update": self.last_update,
+            "load_error": self.load_error,
+        }
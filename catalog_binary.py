@@ -0,0 +1,271 @@
+import argparse
+import json
+import logging
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from catalog import DB_PATH, DIMENSION_FIELDS, CatalogRow, CatalogStore, ValuePool
+
+log = logging.getLogger("catalog_binary")
+
+MAGIC = b"BBCAT\x00\x01\x00"
+FORMAT_VERSION = 3
+NO_STRING = 0xFFFFFFFF
+STRING_FIELDS = ("model", "type", "desc_fa", "desc_en", "keywords")
+_PREAMBLE = struct.Struct("<8sI")
+
+
+def artifact_path(json_path):
+    # برای پوشه shardها، artifact کنار پوشه ساخته می‌شود (DataBase/vendors.bbcat)
+    return os.path.splitext(os.path.normpath(json_path))[0] + ".bbcat"
+
+
+def _pad(out, alignment=8):
+    remainder = out.tell() % alignment
+    if remainder:
+        out.write(b"\x00" * (alignment - remainder))
+
+
+def _unique_sections(sections):
+    # بخش‌هایی که یک لیست مشترک دارند فقط یک بار نوشته می‌شوند
+    ordered = []
+    ranges = {}
+    seen = {}
+    start = 0
+    for name, rows in sections.items():
+        if id(rows) not in seen:
+            seen[id(rows)] = (start, len(rows))
+            ordered.append(rows)
+            start += len(rows)
+        ranges[name] = seen[id(rows)]
+    return ordered, ranges
+
+
+def write_artifact(sections, out_path, source_stat, source_digest):
+    ordered, ranges = _unique_sections(sections)
+    rows = [row for section in ordered for row in section]
+
+    # جدول رشته مشترک با حذف تکرار؛ هر ستون رشته‌ای فقط شناسه uint32 نگه می‌دارد
+    string_ids = {}
+    strings = []
+    string_columns = {field: array("I") for field in STRING_FIELDS}
+    for row in rows:
+        for field in STRING_FIELDS:
+            value = getattr(row, field)
+            if value is None:
+                string_columns[field].append(NO_STRING)
+                continue
+            value = str(value)
+            sid = string_ids.get(value)
+            if sid is None:
+                sid = string_ids[value] = len(strings)
+                strings.append(value)
+            string_columns[field].append(sid)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("Q", [0])
+    for chunk in encoded:
+        offsets.append(offsets[-1] + len(chunk))
+
+    blocks = {}
+    for field in DIMENSION_FIELDS:
+        column = array("d", (float("nan") if getattr(r, field) is None else getattr(r, field) for r in rows))
+        blocks[field] = column.tobytes()
+    for field, column in string_columns.items():
+        blocks[field] = column.tobytes()
+    blocks["string_offsets"] = offsets.tobytes()
+    blocks["string_blob"] = b"".join(encoded)
+
+    # طول هدر قبل از نوشتن مشخص نیست؛ پس بلوک‌ها اول جمع و بعد offsetها محاسبه می‌شوند
+    layout = {}
+    cursor = 0
+    for name, data in blocks.items():
+        layout[name] = [cursor, len(data)]
+        cursor += len(data) + (-len(data) % 8)
+
+    header = {
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "rows": len(rows),
+        "strings": len(strings),
+        "sections": ranges,
+        "source_stat": list(source_stat),
+        "source_digest": source_digest,
+        "blocks": layout,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(_PREAMBLE.size + len(header_bytes)) % 8)
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_PREAMBLE.pack(MAGIC, len(header_bytes)))
+        out.write(header_bytes)
+        for data in blocks.values():
+            out.write(data)
+            _pad(out)
+    os.replace(tmp_path, out_path)
+    return header
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a catalog artifact")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    if header.get("format") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+        raise ValueError(f"{path}: unsupported artifact format")
+    header["_data_start"] = _PREAMBLE.size + header_len
+    return header
+
+
+class ArtifactReader:
+    # فایل یک بار خوانده می‌شود و ستون‌ها بدون parse از روی بافر آن cast می‌شوند؛ ردیف‌ها شیء‌های معمولی
+    # در حافظه هر process هستند (ایندکس‌ها و به‌روزرسانی تکه‌ای به خود ردیف‌ها وابسته‌اند)،
+    # پس بافر بعد از ساخت آن‌ها آزاد می‌شود و چیزی بین processها مشترک نیست
+    def __init__(self, path, header=None):
+        self.header = header or read_header(path)
+        with open(path, "rb") as f:
+            self._view = memoryview(f.read())
+        start = self.header["_data_start"]
+        self.columns = {}
+        for name, (offset, size) in self.header["blocks"].items():
+            self.columns[name] = self._view[start + offset : start + offset + size]
+
+    def column(self, field):
+        code = "d" if field in DIMENSION_FIELDS else "I"
+        return self.columns[field].cast(code)
+
+    def strings(self):
+        offsets = self.columns["string_offsets"].cast("Q").tolist()
+        blob = self.columns["string_blob"]
+        return [str(blob[offsets[i] : offsets[i + 1]], "utf-8") for i in range(len(offsets) - 1)]
+
+    def rows(self):
+        # رشته‌ها از جدول مشترک می‌آیند؛ اعداد تکراری هم مثل بارگذاری JSON یک شیء مشترک می‌شوند
+        strings = self.strings()
+        strings.append(None)
+        shared = ValuePool().shared
+        dims = []
+        for field in DIMENSION_FIELDS:
+            dims.append([None if v != v else shared(v) for v in self.column(field).tolist()])
+        texts = []
+        for field in STRING_FIELDS:
+            ids = self.column(field).tolist()
+            texts.append([strings[-1] if i == NO_STRING else strings[i] for i in ids])
+        return [CatalogRow(*values) for values in zip(*dims, *texts)]
+
+    def sections(self):
+        rows = self.rows()
+        by_range = {}
+        sections = {}
+        for name, (start, count) in self.header["sections"].items():
+            key = (start, count)
+            if key not in by_range:
+                by_range[key] = rows[start : start + count]
+            sections[name] = by_range[key]
+        return sections
+
+    def close(self):
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        self._view.release()
+
+
+def load_fresh(path, stat, digest=None):
+    # artifact فقط وقتی استفاده می‌شود که با فایل JSON (از روی mtime/size یا hash) هم‌خوان باشد
+    try:
+        header = read_header(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    same_stat = tuple(header["source_stat"]) == tuple(stat)
+    if not same_stat and header["source_digest"] != digest:
+        return None
+    reader = ArtifactReader(path, header)
+    try:
+        return reader.sections(), header["source_digest"]
+    finally:
+        reader.close()
+
+
+def build(json_path=DB_PATH, out_path=None):
+    out_path = out_path or artifact_path(json_path)
+    store = CatalogStore(json_path, use_artifact=False)
+    store.refresh()
+    header = write_artifact(store.sections(), out_path, store.source_stat(), store.version)
+    log.info("wrote %s (%d rows, %d strings)", out_path, header["rows"], header["strings"])
+    return out_path
+
+
+def synthetic_catalog(count, seed=7):
+    rng = random.Random(seed)
+    features = [
+        ("طراحی استاندارد باز", "Open standard design"),
+        ("واشر فلزی دو طرفه", "Double sided metal washer"),
+        ("آب‌بندی لاستیکی دو طرفه", "Double-sided rubber sealing"),
+    ]
+    types = ["bearing", "spherical_roller", "tapered_roller", "CARB_toroidal", "roller_bearing"]
+    for i in range(count):
+        d = rng.randint(3, 500)
+        fa, en = rng.choice(features)
+        yield {
+            "type": rng.choice(types),
+            "model": f"S{i:07d}",
+            "inner_diameter": d,
+            "outer_diameter": d * 2 + rng.randint(2, 60),
+            "width": round(rng.uniform(4, 120), 1),
+            "special_features": fa,
+            "special_features_en": en,
+        }
+
+
+def bench(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "catalog.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(list(synthetic_catalog(rows)), f, ensure_ascii=False)
+
+        started = time.perf_counter()
+        CatalogStore(json_path, use_artifact=False).refresh()
+        json_time = time.perf_counter() - started
+
+        build(json_path)
+        started = time.perf_counter()
+        store = CatalogStore(json_path)
+        store.refresh()
+        binary_time = time.perf_counter() - started
+
+        size_json = os.path.getsize(json_path)
+        size_bin = os.path.getsize(artifact_path(json_path))
+    print(f"rows:           {rows}")
+    print(f"json load:      {json_time * 1000:9.1f} ms  ({size_json / 1e6:.1f} MB)")
+    print(f"artifact load:  {binary_time * 1000:9.1f} ms  ({size_bin / 1e6:.1f} MB)")
+    print(f"speed-up:       {json_time / binary_time:9.1f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the catalog JSON into a binary artifact.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="compile DataBase.json")
+    p_build.add_argument("json_path", nargs="?", default=DB_PATH)
+    p_build.add_argument("-o", "--output")
+    p_bench = sub.add_parser("bench", help="compare JSON and artifact load time on a synthetic catalog")
+    p_bench.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    if args.command == "build":
+        build(args.json_path, args.output)
+    else:
+        bench(args.rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+from collections import Counter
+from operator import attrgetter, itemgetter
+
+from catalog import CatalogRow, CatalogSnapshot
+
+# وقتی بیش از این سهم ردیف‌ها عوض شده باشد، ساخت دوباره ایندکس‌ها از به‌روزرسانی تکه‌ای ارزان‌تر است
+REBUILD_FRACTION = 0.25
+
+_VALUES = attrgetter(*CatalogRow.__slots__)
+_MODEL = itemgetter(CatalogRow.__slots__.index("model"))
+
+
+class RowDiff:
+    def __init__(self, rows):
+        self.rows = rows
+        self.removed = []
+        self.added = []
+        self.dropped = []
+        self.inserted = 0
+        self.changed = 0
+        self.deleted = 0
+
+    def __bool__(self):
+        return bool(self.removed or self.added)
+
+
+def diff_rows(old_rows, new_rows):
+    # مقایسه با کلید model؛ ردیف بدون تغییر همان شیء قبلی می‌ماند تا ایندکس‌های قبلی برایش معتبر باشند
+    diff = RowDiff(old_rows)
+    old_values = list(map(_VALUES, old_rows))
+    new_values = list(map(_VALUES, new_rows))
+    if old_values == new_values:
+        return diff
+
+    # فقط مدل‌هایی که ردیفی با مقدار تازه دارند (یا تعداد ردیف‌های یکسانشان عوض شده) جزء تغییرات هستند
+    old_set = set(old_values)
+    new_set = set(new_values)
+    touched = set(map(_MODEL, new_set - old_set))
+    touched.update(map(_MODEL, old_set - new_set))
+    if len(old_set) != len(old_values) or len(new_set) != len(new_values):
+        old_counts = Counter(old_values)
+        new_counts = Counter(new_values)
+        touched.update(_MODEL(v) for v, count in new_counts.items() if old_counts[v] != count)
+        touched.update(_MODEL(v) for v in old_counts if v not in new_counts)
+    old_models = set(map(_MODEL, old_values))
+    new_models = set(map(_MODEL, new_values))
+    for model in touched:
+        if model not in old_models:
+            diff.inserted += 1
+        elif model not in new_models:
+            diff.deleted += 1
+        else:
+            diff.changed += 1
+
+    diff.removed = [r for r in old_rows if r.model in touched]
+    diff.added = [r for r in new_rows if r.model in touched]
+    if diff:
+        # ترتیب ردیف‌های باقی‌مانده حفظ می‌شود و ردیف‌های جدید به انتها می‌روند (همان ترتیب ایندکس متنی)
+        diff.dropped = [i for i, r in enumerate(old_rows) if r.model in touched]
+        diff.rows = [r for r in old_rows if r.model not in touched] + diff.added
+    return diff
+
+
+def _layout(sections):
+    # کدام بخش‌ها یک لیست مشترک دارند (مثلاً bearing و housing روی "all")
+    first = {}
+    return tuple(sorted((name, first.setdefault(id(rows), name)) for name, rows in sections.items()))
+
+
+def _text_documents(rows):
+    return [(r.model, r.type, r.desc_fa, r.desc_en, r.keywords) for r in rows]
+
+
+def apply(previous, sections, version):
+    # snapshot جدید از روی قبلی: ردیف‌های بدون تغییر و ایندکس‌ها با تغییرات به‌روز می‌شوند.
+    # خلاصه تغییرات (تعداد مدل‌های اضافه/تغییر/حذف شده) هم برمی‌گردد؛ None یعنی ساختار فایل عوض شده است
+    if _layout(previous.sections) != _layout(sections):
+        return CatalogSnapshot(sections, {}, version), None
+
+    diffs = {}
+    for name, rows in sections.items():
+        old = previous.sections[name]
+        if id(old) not in diffs:
+            diffs[id(old)] = diff_rows(old, rows)
+    summary = {
+        "inserted": sum(d.inserted for d in diffs.values()),
+        "changed": sum(d.changed for d in diffs.values()),
+        "deleted": sum(d.deleted for d in diffs.values()),
+        "rows": sum(len(d.removed) + len(d.added) for d in diffs.values()),
+        "incremental": True,
+    }
+    total = sum(len(d.rows) for d in diffs.values())
+    if summary["rows"] > REBUILD_FRACTION * max(total, 1):
+        summary["incremental"] = False
+        return CatalogSnapshot(sections, {}, version), summary
+
+    merged = {name: diffs[id(previous.sections[name])].rows for name in sections}
+
+    def section_diff(search_type):
+        old = previous.sections["all"] if "all" in previous.sections else previous.sections.get(search_type)
+        return diffs.get(id(old))
+
+    indexes = {}
+    for key, index in previous.indexes.items():
+        if key == "model":
+            removed = [(r.model, r) for d in diffs.values() for r in d.removed]
+            added = [(r.model, r) for d in diffs.values() for r in d.added]
+            index = index.updated(removed, added) if removed or added else index
+            if index is not None:
+                indexes[key] = index
+        elif isinstance(key, tuple) and key[0] == "text":
+            diff = diffs.get(key[1])
+            if diff is None:
+                continue
+            if diff:
+                index = index.updated(diff.dropped, _text_documents(diff.added))
+            if index is not None:
+                indexes[("text", id(diff.rows))] = index
+        else:
+            # ایندکس‌های ابعادی ("bearing"، ("housing", "d")) و گروه‌های جایگزین روی بخش bearing
+            diff = section_diff("bearing" if key == "interchange" else key[0] if isinstance(key, tuple) else key)
+            if diff is None:
+                continue
+            indexes[key] = index.updated(diff.removed, diff.added) if diff else index
+    return CatalogSnapshot(merged, indexes, version), summary
@@ -0,0 +1,259 @@
+import codecs
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import CatalogRow, ValuePool, ingest_records
+
+log = logging.getLogger("catalog_shards")
+
+SHARD_EXTENSIONS = (".json", ".jsonl")
+# کلیدهایی که بخش صریح هستند؛ بقیه لیست‌های یک shard مثل فایل تک‌لیستی بر اساس خانواده تقسیم می‌شوند
+SECTION_KEYS = {"bearings": "bearing", "housings": "housing"}
+CHUNK_BYTES = 1 << 20
+BATCH_SIZE = 5000
+# زیر این حجم کل، راه‌اندازی process pool از parse مستقیم گران‌تر است
+POOL_MIN_BYTES = 8 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+def shard_paths(directory, exclude=()):
+    # ترتیب ثابت (نام فایل) ترتیب ادغام و برنده مدل‌های تکراری را مشخص می‌کند
+    names = sorted(
+        name
+        for name in os.listdir(directory)
+        if not name.startswith(".") and name.lower().endswith(SHARD_EXTENSIONS) and name not in exclude
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+class _JsonStream:
+    # متن JSON تکه‌تکه خوانده می‌شود؛ فقط تکه جاری و مقداری که در حال decode است در حافظه می‌ماند
+    def __init__(self, f, digest):
+        self.f = f
+        self.digest = digest
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        data = self.f.read(CHUNK_BYTES)
+        self.digest.update(data)
+        self.eof = not data
+        self.buf = self.buf[self.pos :] + self.decoder.decode(data, final=self.eof)
+        self.pos = 0
+        return not self.eof
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def error(self, expected):
+        found = self.peek() or "end of file"
+        return ValueError(f"{self.f.name}: expected {expected}, found {found!r}")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self.error(repr(char))
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"{self.f.name}: {e}") from None
+            else:
+                # مقداری که تا انتهای بافر رسیده ممکن است ناقص باشد (مثلاً عددی که در تکه بعد ادامه دارد)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            self.fill()
+
+    def items(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                self.pos -= 1
+                raise self.error("',' or ']'")
+
+    def drain(self):
+        # بقیه فایل هم در hash نسخه shard حساب می‌شود
+        while self.fill():
+            pass
+
+
+def iter_records(path, digest):
+    # (نام کلید، رکورد) برای هر رکورد shard؛ کلید None یعنی لیست سطح اول یا فایل .jsonl
+    if path.lower().endswith(".jsonl"):
+        with open(path, "rb") as f:
+            for line_no, line in enumerate(f, 1):
+                digest.update(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield None, json.loads(line.decode("utf-8-sig"))
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_no}: {e}") from None
+        return
+
+    with open(path, "rb") as f:
+        stream = _JsonStream(f, digest)
+        first = stream.peek()
+        if first == "[":
+            for item in stream.items():
+                yield None, item
+        elif first == "{":
+            stream.pos += 1
+            if stream.peek() == "}":
+                stream.pos += 1
+            else:
+                while True:
+                    key = stream.value()
+                    stream.expect(":")
+                    if stream.peek() == "[":
+                        for item in stream.items():
+                            yield key, item
+                    else:
+                        # مقدارهای غیر لیستی (مثلاً شماره نسخه فروشنده) نادیده گرفته می‌شوند
+                        stream.value()
+                    char = stream.peek()
+                    stream.pos += 1
+                    if char == "}":
+                        break
+                    if char != ",":
+                        stream.pos -= 1
+                        raise stream.error("',' or '}'")
+        elif first:
+            raise stream.error("a JSON list or object")
+        stream.drain()
+
+
+def parse_shard(path):
+    # در process جدا اجرا می‌شود؛ رکوردها دسته‌ای به tuple تبدیل می‌شوند تا dictهای خام جمع نشوند
+    # و مقادیر تکراری (نوع، توضیح، ابعاد) مشترک‌اند و یک بار pickle می‌شوند
+    started = time.perf_counter()
+    digest = hashlib.blake2b(digest_size=16)
+    plans = {}
+    pool = ValuePool()
+    rows = {None: [], "bearing": [], "housing": []}
+    pending = {name: [] for name in rows}
+
+    def flush(name):
+        for row in ingest_records(pending[name], plans, pool):
+            rows[name].append(
+                (row.d, row.D, row.B, row.shaft, row.bore, row.model, row.type, row.desc_fa, row.desc_en, row.keywords)
+            )
+        pending[name].clear()
+
+    for key, item in iter_records(path, digest):
+        name = SECTION_KEYS.get(key)
+        batch = pending[name]
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            flush(name)
+    for name in pending:
+        flush(name)
+    return path, digest.hexdigest(), rows, len(plans), time.perf_counter() - started
+
+
+def _parse_all(paths, workers):
+    if workers <= 1 or len(paths) < 2:
+        for path in paths:
+            yield parse_shard(path)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        # تعداد محدودی shard در جریان است تا ترتیب ادغام ثابت و حافظه محدود بماند
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(parse_shard, path))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def default_workers(paths):
+    try:
+        total = sum(os.path.getsize(p) for p in paths)
+    except OSError:
+        total = 0
+    if total < POOL_MIN_BYTES:
+        return 1
+    return max(1, min(len(paths), os.cpu_count() or 1))
+
+
+class ShardLoad:
+    def __init__(self):
+        self.flat = []
+        self.explicit = {"bearing": [], "housing": []}
+        self.digests = []
+        self.signatures = 0
+        self.duplicates = 0
+        self.stages = {}
+
+
+def load_shards(paths, workers=None):
+    # مدل تکراری در چند shard: رکورد اولین shard (به ترتیب نام فایل) می‌ماند؛
+    # تکرار داخل یک shard مثل فایل تک‌لیستی حفظ می‌شود. مقایسه فقط بدون فاصله دو طرف و حروف کوچک/بزرگ است،
+    # چون کدهایی مثل 62/22 و 6222 مدل‌های متفاوتی هستند
+    started = time.perf_counter()
+    workers = default_workers(paths) if workers is None else workers
+    load = ShardLoad()
+    # هر shard در process خودش مقادیرش را مشترک کرده است؛ بین shardها دوباره یکی می‌شوند
+    shared = ValuePool().shared
+    owners = {}
+    parse_time = 0.0
+    for shard_no, (path, digest, rows, signatures, elapsed) in enumerate(_parse_all(paths, workers)):
+        parse_time += elapsed
+        load.digests.append(f"{os.path.basename(path)}:{digest}")
+        load.signatures += signatures
+        dropped = 0
+        for name, values in rows.items():
+            target = load.flat if name is None else load.explicit[name]
+            for value in values:
+                model = value[5]
+                key = model.strip().casefold() if model != "N/A" else ""
+                owner = owners.setdefault(key, (shard_no, path)) if key else None
+                if owner and owner[0] != shard_no:
+                    log.warning("%s: model %r dropped, already loaded from %s", path, model, owner[1])
+                    dropped += 1
+                    continue
+                target.append(CatalogRow(*map(shared, value[:5]), model, *map(shared, value[6:])))
+        if dropped:
+            log.info("%s: %d models already loaded from an earlier shard", path, dropped)
+        load.duplicates += dropped
+    load.stages = {"shards": time.perf_counter() - started}
+    log.info(
+        "parsed %d shards with %d worker(s) (%.1f ms parse time), %d duplicate models dropped",
+        len(paths),
+        workers,
+        parse_time * 1000,
+        load.duplicates,
+    )
+    return load
@@ -0,0 +1,376 @@
+import argparse
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+from catalog import (
+    DB_PATH,
+    DEFAULT_TOLERANCE,
+    NEAREST_K,
+    NEAREST_TOLERANCE,
+    SEARCH_FIELDS,
+    CatalogRow,
+    CatalogStore,
+)
+
+log = logging.getLogger("catalog_sqlite")
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+# نام ستون‌ها در SQLite به بزرگی/کوچکی حروف حساس نیست، پس d و D نام جدا می‌گیرند
+COLUMNS = {"d": "inner_d", "D": "outer_d", "B": "width"}
+ROW_COLUMNS = "r.inner_d, r.outer_d, r.width, r.shaft, r.bore, r.model, r.type, r.desc_fa, r.desc_en, r.keywords"
+# با تغییر جدول rows بالا برود؛ فایل‌های قدیمی‌تر باید دوباره import شوند
+SCHEMA_VERSION = "4"
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE rows (
+    id INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    inner_d REAL,
+    outer_d REAL,
+    width REAL,
+    shaft REAL,
+    bore REAL,
+    model TEXT NOT NULL,
+    type TEXT,
+    desc_fa TEXT NOT NULL,
+    desc_en TEXT NOT NULL,
+    keywords TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX rows_section_type ON rows (section, type);
+CREATE INDEX rows_model ON rows (model);
+CREATE INDEX rows_inner_d ON rows (inner_d);
+CREATE INDEX rows_outer_d ON rows (outer_d);
+CREATE INDEX rows_width ON rows (width);
+CREATE VIRTUAL TABLE dims_bearing USING rtree (id, inner_d_min, inner_d_max, outer_d_min, outer_d_max, width_min, width_max);
+CREATE VIRTUAL TABLE dims_housing USING rtree (id, inner_d_min, inner_d_max);
+"""
+
+RTREE_TABLES = {"bearing": "dims_bearing", "housing": "dims_housing"}
+# فیلتر نوع با یک پارامتر (آرایه JSON) تا متن statement به تعداد نوع‌ها بستگی نداشته باشد و cache شود
+TYPE_FILTER = "r.type IN (SELECT value FROM json_each(?))"
+
+
+def _types_param(types):
+    return json.dumps(sorted(types))
+
+
+def is_sqlite_path(path):
+    return str(path).lower().endswith(SQLITE_SUFFIXES)
+
+
+def import_json(json_path=DB_PATH, db_path=None, batch_size=5000):
+    # از همان مرحله ingest فایل JSON استفاده می‌شود تا کلیدهای inner_diameter/shaft_diameter/bearing_bore یکسان تفسیر شوند
+    db_path = db_path or os.path.splitext(json_path)[0] + ".sqlite"
+    source = CatalogStore(json_path, use_artifact=False)
+    source.refresh()
+
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # فایل موقت است و در پایان جایگزین می‌شود، پس journal لازم نیست
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        seen = {}
+        next_id = 1
+        for name, rows in source.sections().items():
+            if id(rows) in seen:
+                continue
+            seen[id(rows)] = name
+            for start in range(0, len(rows), batch_size):
+                batch = list(enumerate(rows[start : start + batch_size], next_id + start))
+                conn.executemany(
+                    "INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (i, name, r.d, r.D, r.B, r.shaft, r.bore, r.model, r.type, r.desc_fa, r.desc_en, r.keywords)
+                        for i, r in batch
+                    ],
+                )
+                conn.executemany(
+                    "INSERT INTO dims_bearing VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (i, r.d, r.d, r.D, r.D, r.B, r.B)
+                        for i, r in batch
+                        if r.d is not None and r.D is not None and r.B is not None
+                    ],
+                )
+                conn.executemany(
+                    "INSERT INTO dims_housing VALUES (?, ?, ?)",
+                    [(i, r.d, r.d) for i, r in batch if r.d is not None],
+                )
+            next_id += len(rows)
+
+        sections = {name: seen[id(rows)] for name, rows in source.sections().items()}
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("version", source.version),
+                ("schema", SCHEMA_VERSION),
+                ("source", os.path.abspath(json_path)),
+                ("sections", json.dumps(sections)),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    log.info("imported %d records into %s", source.record_count, db_path)
+    return db_path
+
+
+class SqliteCatalogStore:
+    # همان رابط CatalogStore، ولی داده روی دیسک می‌ماند و فقط ردیف‌های پیدا شده خوانده می‌شوند
+    def __init__(self, path):
+        self.path = path
+        self.source = "sqlite"
+        self.version = None
+        self.load_time = 0.0
+        self.record_count = 0
+        self.load_count = 0
+        self.load_stages = {}
+        self._stat = None
+        self._sections = {}
+        self._conn = None
+        self._model_index = None
+        self._text_indexes = {}
+        self._group_sizes = (None, {})
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def refresh(self):
+        st = os.stat(self.path)
+        stat = (st.st_mtime_ns, st.st_size)
+        if stat == self._stat:
+            return False
+
+        started = time.perf_counter()
+        with self._lock:
+            # import_json فایل را با os.replace جایگزین می‌کند و اتصال قبلی همچنان فایل قدیمی را می‌خواند؛
+            # با هر تغییر فایل اتصال (و statementهای cache شده آن) از نو باز می‌شود
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = self._connect()
+            meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+            if meta.get("schema") != SCHEMA_VERSION:
+                raise ValueError(f"{self.path}: outdated catalog schema, re-run catalog_sqlite.py to rebuild it")
+            changed = meta.get("version") != self.version
+            if changed:
+                self._sections = json.loads(meta.get("sections", "{}"))
+                self.record_count = self._conn.execute("SELECT count(*) FROM rows").fetchone()[0]
+                self.version = meta.get("version")
+                self.load_count += 1
+                self.load_time = time.perf_counter() - started
+                self.load_stages = {"open": self.load_time}
+            self._stat = stat
+        if changed:
+            log.info("opened %s (%d records)", self.path, self.record_count)
+        return changed
+
+    @property
+    def latest_version(self):
+        return self.version
+
+    @contextmanager
+    def snapshot(self):
+        # هر پرس‌وجوی SQLite خودش روی یک نسخه ثابت از فایل اجرا می‌شود
+        self.refresh()
+        yield self
+
+    def _section(self, search_type):
+        return self._sections.get("all") or self._sections.get(search_type, search_type)
+
+    def _box_query(self, search_type, values, reaches, exact_tolerance=None, types=None):
+        fields = SEARCH_FIELDS[search_type]
+        table = RTREE_TABLES[search_type]
+        where = []
+        params = []
+        for field, value, reach in zip(fields, values, reaches):
+            # R*Tree مقادیر را float32 نگه می‌دارد؛ شرط دقیق روی ستون‌های REAL جدول اصلی بررسی می‌شود
+            column = COLUMNS[field]
+            where.append(f"x.{column}_min <= ? AND x.{column}_max >= ?")
+            params += [value + reach, value - reach]
+        if exact_tolerance is not None:
+            for field, value in zip(fields, values):
+                where.append(f"abs(r.{COLUMNS[field]} - ?) < ?")
+                params += [value, exact_tolerance]
+        where.append("r.section = ?")
+        params.append(self._section(search_type))
+        if types is not None:
+            where.append(TYPE_FILTER)
+            params.append(_types_param(types))
+
+        sql = f"SELECT {ROW_COLUMNS} FROM {table} AS x JOIN rows AS r ON r.id = x.id WHERE " + " AND ".join(where)
+        with self._lock:
+            return [CatalogRow(*row) for row in self._conn.execute(sql, params)]
+
+    def search(self, search_type, values, tolerance=DEFAULT_TOLERANCE, types=None):
+        self.refresh()
+        pad = tolerance + 1e-6
+        return self._box_query(search_type, values, [pad] * len(values), tolerance, types)
+
+    def field_search(self, search_type, field, value, tolerance=DEFAULT_TOLERANCE, types=None):
+        self.refresh()
+        fields = SEARCH_FIELDS[search_type]
+        column = COLUMNS[field]
+        required = " AND ".join(f"r.{COLUMNS[f]} IS NOT NULL" for f in fields)
+        sql = (
+            f"SELECT {ROW_COLUMNS} FROM rows AS r WHERE r.{column} BETWEEN ? AND ? "
+            f"AND abs(r.{column} - ?) < ? AND r.section = ? AND {required}"
+        )
+        params = [value - tolerance - 1e-6, value + tolerance + 1e-6, value, tolerance, self._section(search_type)]
+        if types is not None:
+            sql += f" AND {TYPE_FILTER}"
+            params.append(_types_param(types))
+        with self._lock:
+            return [CatalogRow(*row) for row in self._conn.execute(sql, params)]
+
+    def model_index(self):
+        self.refresh()
+        if self._model_index is None or self._model_index[0] != self.version:
+            from model_index import ModelIndex
+
+            with self._lock:
+                pairs = self._conn.execute("SELECT model, id FROM rows").fetchall()
+            self._model_index = (self.version, ModelIndex(pairs))
+        return self._model_index[1]
+
+    def model_search(self, query, limit=20):
+        hits = self.model_index().search(query, limit)
+        if not hits:
+            return []
+        sql = f"SELECT r.id, {ROW_COLUMNS} FROM rows AS r WHERE r.id IN (SELECT value FROM json_each(?))"
+        with self._lock:
+            rows = {row[0]: CatalogRow(*row[1:]) for row in self._conn.execute(sql, [json.dumps([h for h, _ in hits])])}
+        return [(rows[handle], edits) for handle, edits in hits if handle in rows]
+
+    def interchange_group(self, values, tolerance=DEFAULT_TOLERANCE):
+        # جستجوی جعبه‌ای R*Tree روی (d, D, B) همان گروه هم‌اندازه است
+        return self.search("bearing", values, tolerance)
+
+    def group_size(self, values):
+        self.refresh()
+        return self._group_size(values)
+
+    def group_counter(self):
+        self.refresh()
+        return self._group_size
+
+    def _group_size(self, values):
+        if self._group_sizes[0] != self.version:
+            self._group_sizes = (self.version, {})
+        sizes = self._group_sizes[1]
+        size = sizes.get(values)
+        if size is None:
+            size = sizes[values] = len({row.model for row in self.interchange_group(values)})
+        return size
+
+    def text_index(self, search_type):
+        self.refresh()
+        section = self._section(search_type)
+        cached = self._text_indexes.get(section)
+        if cached is None or cached[0] != self.version:
+            from text_index import TextIndex
+
+            sql = "SELECT id, model, type, desc_fa, desc_en, keywords FROM rows WHERE section = ? ORDER BY id"
+            with self._lock:
+                rows = self._conn.execute(sql, [section]).fetchall()
+            ids = array("I", (row[0] for row in rows))
+            cached = self._text_indexes[section] = (self.version, ids, TextIndex(row[1:] for row in rows))
+        return cached[1], cached[2]
+
+    def text_search(self, search_type, query, values=None, tolerance=DEFAULT_TOLERANCE, prefix_last=False, types=None):
+        ids, index = self.text_index(search_type)
+        hits = index.search(query, prefix_last)
+        if hits is None:
+            return None
+        if not hits:
+            return []
+
+        where = [f"r.{COLUMNS[f]} IS NOT NULL" for f in SEARCH_FIELDS[search_type]]
+        params = [json.dumps([ids[i] for i in hits])]
+        for field, value in dict(values or {}).items():
+            where.append(f"abs(r.{COLUMNS[field]} - ?) < ?")
+            params += [value, tolerance]
+        if types is not None:
+            where.append(TYPE_FILTER)
+            params.append(_types_param(types))
+        sql = (
+            f"SELECT {ROW_COLUMNS} FROM rows AS r WHERE r.id IN (SELECT value FROM json_each(?)) AND "
+            + " AND ".join(where)
+            + " ORDER BY r.id"
+        )
+        with self._lock:
+            return [CatalogRow(*row) for row in self._conn.execute(sql, params)]
+
+    def nearest(self, search_type, values, k=NEAREST_K, tolerance=NEAREST_TOLERANCE, weights=None, types=None):
+        self.refresh()
+        fields = SEARCH_FIELDS[search_type]
+        weights = tuple(weights) if weights else (1.0,) * len(fields)
+        if tolerance is None:
+            reaches = [float("inf")] * len(fields)
+        else:
+            reaches = [tolerance / w**0.5 + 1e-6 if w > 0 else float("inf") for w in weights]
+
+        candidates = []
+        for row in self._box_query(search_type, values, reaches, types=types):
+            dist = sum(w * (getattr(row, f) - v) ** 2 for f, v, w in zip(fields, values, weights)) ** 0.5
+            if tolerance is None or dist <= tolerance:
+                candidates.append((dist, row.model, row.desc_en, row))
+        return [(c[3], c[0]) for c in heapq.nsmallest(k, candidates, key=lambda c: c[:3])]
+
+    def warm_up(self):
+        self.refresh()
+        for search_type in SEARCH_FIELDS:
+            self.text_index(search_type)
+        self.model_index()
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "records": self.record_count,
+            "load_time_ms": round(self.load_time * 1000, 2),
+            "loads": self.load_count,
+            "source": self.source,
+            "version": self.version,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._stat = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the JSON catalog into an SQLite database with R*Tree indexes.")
+    parser.add_argument("json_path", nargs="?", default=DB_PATH)
+    parser.add_argument("-o", "--output", help="SQLite path (default: next to the JSON file)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    import_json(args.json_path, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
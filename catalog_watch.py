@@ -0,0 +1,119 @@
+import logging
+import os
+import time
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QRunnable, QTimer, pyqtSignal
+
+log = logging.getLogger("catalog_watch")
+
+# ویرایشگرها و ابزار خروجی معمولاً فایل را در چند نوشتن پشت سر هم ذخیره می‌کنند
+DEBOUNCE_MS = 500
+
+
+class ReloadSignals(QObject):
+    reloaded = pyqtSignal(object, float)
+    failed = pyqtSignal(str)
+    done = pyqtSignal(object)
+
+
+class ReloadTask(QRunnable):
+    # parse فایل، مقایسه با ردیف‌های فعلی و به‌روزرسانی ایندکس‌ها در پس‌زمینه؛ جستجوها روی snapshot قبلی ادامه می‌دهند
+    def __init__(self, engine, seen_version):
+        super().__init__()
+        self.engine = engine
+        self.seen_version = seen_version
+        self.signals = ReloadSignals()
+
+    def run(self):
+        started = time.perf_counter()
+        catalog = self.engine.catalog
+        try:
+            if catalog.exists():
+                catalog.refresh()
+            error = getattr(catalog, "load_error", None)
+            if error:
+                self.signals.failed.emit(error)
+            elif catalog.version != self.seen_version:
+                # ممکن است جستجویی زودتر همین تغییر را بارگذاری کرده باشد؛ مقایسه با نسخه قبلی هر دو حالت را می‌پوشاند
+                # ایندکس‌هایی که به‌روز نشدند (ساختار فایل عوض شده) پیش از جستجوی بعدی ساخته می‌شوند
+                self.engine.warm_up()
+                if self.seen_version is not None:
+                    update = getattr(catalog, "last_update", None)
+                    self.signals.reloaded.emit(update, time.perf_counter() - started)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            self.signals.done.emit(catalog.version)
+
+
+class CatalogWatcher(QObject):
+    # فایل (یا پوشه shardها) و قواعد خانواده‌ها زیر نظرند؛ پوشه والد هم دیده می‌شود چون بیشتر ویرایشگرها
+    # فایل را با نوشتن فایل موقت و rename جایگزین می‌کنند و watcher فایل قبلی را از دست می‌دهد
+    reloaded = pyqtSignal(object, float)
+    failed = pyqtSignal(str)
+
+    def __init__(self, engine, pool, delay_ms=DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.pool = pool
+        self._running = False
+        self._pending = False
+        self._version = engine.catalog.version
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_changed)
+        self.watcher.directoryChanged.connect(self.on_changed)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.reload)
+        self.watch()
+
+    def paths(self):
+        catalog = self.engine.catalog
+        path = os.path.abspath(catalog.path)
+        paths = [path, os.path.dirname(path)]
+        if os.path.isdir(path):
+            paths += [os.path.join(path, name) for name in os.listdir(path)]
+        families = getattr(catalog, "families_path", None)
+        if families:
+            paths.append(os.path.abspath(families))
+        return [p for p in paths if os.path.exists(p)]
+
+    def sync(self):
+        # نسخه بارگذاری شده در warm-up مبنای اعلام بارگذاری‌های بعدی است؛ پیش از آن نسخه‌ای وجود ندارد
+        if not self._running:
+            self._version = self.engine.catalog.version
+
+    def watch(self):
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        missing = [p for p in self.paths() if p not in watched]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def on_changed(self, path):
+        # هر تغییر تازه زمان‌سنج را از نو شروع می‌کند؛ بارگذاری بعد از آرام شدن نوشتن‌ها انجام می‌شود
+        self.timer.start()
+
+    def reload(self):
+        self.watch()
+        if self._running:
+            self._pending = True
+            return
+        self._running = True
+        task = ReloadTask(self.engine, self._version)
+        task.signals.reloaded.connect(self.reloaded)
+        task.signals.failed.connect(self.on_failed)
+        task.signals.done.connect(self.on_done)
+        self.pool.start(task)
+
+    def on_failed(self, message):
+        # فایل نیمه‌نوشته یا خراب: snapshot فعلی می‌ماند تا ذخیره بعدی
+        log.warning("catalog reload failed: %s", message)
+        self.failed.emit(message)
+
+    def on_done(self, version):
+        self._version = version
+        self._running = False
+        if self._pending:
+            self._pending = False
+            self.timer.start()
@@ -0,0 +1,373 @@
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from catalog import (
+    DB_PATH,
+    DEFAULT_TOLERANCE,
+    NEAREST_K,
+    NEAREST_TOLERANCE,
+    SEARCH_FIELDS,
+    CatalogStore,
+    safe_float,
+)
+from model_index import normalize_model
+from query_trace import NO_TRACE
+
+SEARCH_TYPES = tuple(SEARCH_FIELDS) + ("model",)
+MODEL_LIMIT = 50
+RESULT_CACHE_SIZE = 256
+# ابعاد و tolerance پیش از جستجو به این تعداد رقم اعشار گرد می‌شوند تا "20"، "20.0" و "۲۰" یک کلید باشند
+QUANTIZE_DIGITS = 6
+
+# distance فقط در حالت نزدیک‌ترین اندازه‌ها مقدار دارد؛ alternatives تعداد مدل‌های دیگر با همان d/D/B است
+# و type برای شمارش و فیلتر نتایج بر اساس نوع (facets.py)
+ResultEntry = namedtuple("ResultEntry", "model desc distance d D B alternatives type", defaults=(None, None))
+
+
+def open_catalog(path=None):
+    # مسیر .sqlite/.db از backend SQLite استفاده می‌کند؛ بقیه مسیرها فایل JSON هستند
+    path = path or os.environ.get("BEARING_CATALOG") or DB_PATH
+    from catalog_sqlite import SqliteCatalogStore, is_sqlite_path
+
+    if is_sqlite_path(path):
+        return SqliteCatalogStore(path)
+    return CatalogStore(path)
+
+
+def open_engine(db_path=None, server=None):
+    # BEARING_SERVER=http://host:port: جستجوها به سرویس مشترک (query_server.py) فرستاده می‌شوند
+    server = server or os.environ.get("BEARING_SERVER")
+    if server:
+        from query_client import RemoteEngine
+
+        return RemoteEngine(server)
+    return SearchEngine(db_path=db_path)
+
+
+class SearchResult:
+    __slots__ = ("status", "entries")
+
+    # status: "found" | "closest" | "not_found" | "missing_input"
+    def __init__(self, status, entries=()):
+        self.status = status
+        self.entries = list(entries)
+
+    def to_dict(self):
+        results = []
+        for e in self.entries:
+            entry = {"model": e.model, "description": e.desc, "d": e.d, "D": e.D, "B": e.B}
+            if e.distance is not None:
+                entry["distance"] = round(e.distance, 4)
+            if e.alternatives is not None:
+                entry["alternatives"] = e.alternatives
+            if e.type is not None:
+                entry["type"] = e.type
+            results.append(entry)
+        return {"status": self.status, "results": results}
+
+
+class ResultCache:
+    # LRU نتایج آماده نمایش؛ نسخه محتوای کاتالوگ جزء کلید است و با تغییر آن همه چیز دور ریخته می‌شود
+    def __init__(self, capacity=RESULT_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _sync(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version, latest=None):
+        with self._lock:
+            # جستجویی که هنوز روی snapshot قدیمی‌تر pin شده، cache نسخه جدید را خالی و به عقب برنمی‌گرداند
+            if version != self._version and latest is not None and version != latest:
+                self.misses += 1
+                return None
+            self._sync(version)
+            result = self._entries.get((version,) + key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((version,) + key)
+            self.hits += 1
+            return result
+
+    def put(self, key, version, result):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            # نتیجه‌ای که روی نسخه قدیمی‌تر حساب شده، cache نسخه جدید را خالی نمی‌کند
+            if version != self._version:
+                return
+            self._entries[(version,) + key] = result
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "capacity": self.capacity,
+        }
+
+
+def quantize(value):
+    return round(value, QUANTIZE_DIGITS)
+
+
+class SearchEngine:
+    # منطق جستجو بدون وابستگی به Qt؛ هم GUI و هم ابزار خط فرمان از آن استفاده می‌کنند
+    def __init__(self, catalog=None, db_path=None, cache_size=RESULT_CACHE_SIZE):
+        self.catalog = catalog if catalog is not None else open_catalog(db_path)
+        self.cache = ResultCache(cache_size)
+
+    def warm_up(self):
+        if self.catalog.exists():
+            self.catalog.warm_up()
+
+    def parse_dimensions(self, search_type, raw):
+        values = tuple(safe_float(raw.get(field)) for field in SEARCH_FIELDS[search_type])
+        if any(v is None for v in values):
+            return None
+        return values
+
+    def parse_partial(self, search_type, raw):
+        # فقط فیلدهای پر شده؛ برای جستجوی همزمان با تایپ و فیلتر کلمات کلیدی
+        query = []
+        for field in SEARCH_FIELDS[search_type]:
+            value = safe_float(raw.get(field))
+            if value is not None:
+                query.append((field, value))
+        return tuple(query)
+
+    def lookup(
+        self,
+        search_type,
+        values,
+        lang="fa",
+        tolerance=DEFAULT_TOLERANCE,
+        nearest_k=NEAREST_K,
+        nearest_tolerance=NEAREST_TOLERANCE,
+        trace=NO_TRACE,
+    ):
+        with trace.stage("match"):
+            rows = self.catalog.search(search_type, values, tolerance)
+        trace.matched = len(rows)
+        with trace.stage("entries"):
+            entries = self.entries_for(rows, lang)
+        if entries:
+            return SearchResult("found", entries)
+
+        if nearest_k:
+            with trace.stage("nearest"):
+                closest = self.catalog.nearest(search_type, values, nearest_k, nearest_tolerance)
+            if closest:
+                trace.matched = len(closest)
+                with trace.stage("entries"):
+                    group_size = self.catalog.group_counter()
+                    entries = [self.entry(row, lang, dist, group_size) for row, dist in closest]
+                return SearchResult("closest", entries)
+
+        return SearchResult("not_found")
+
+    def entry(self, row, lang="fa", distance=None, group_size=None):
+        # group_size از catalog.group_counter() یک بار برای کل لیست نتایج گرفته می‌شود
+        alternatives = None
+        if row.d is not None and row.D is not None and row.B is not None:
+            group_size = group_size or self.catalog.group_size
+            alternatives = max(group_size((row.d, row.D, row.B)) - 1, 0)
+        row_type = None if row.type is None else str(row.type)
+        return ResultEntry(row.model, row.desc(lang), distance, row.d, row.D, row.B, alternatives, row_type)
+
+    def entries_for(self, rows, lang="fa"):
+        found = {}
+        for row in rows:
+            found.setdefault((row.model, row.desc(lang)), row)
+        group_size = self.catalog.group_counter() if found else None
+        entries = [self.entry(row, lang, None, group_size) for row in found.values()]
+        entries.sort(key=lambda e: (e.model, e.desc))
+        return entries
+
+    def lookup_model(self, query, lang="fa", limit=MODEL_LIMIT, trace=NO_TRACE):
+        # کد مدل: تطابق دقیق/پیشوندی "found" و تطابق تقریبی (با خطای تایپی) "closest" است
+        with trace.stage("match"):
+            hits = self.catalog.model_search(query, limit)
+        trace.matched = len(hits)
+        if not hits:
+            return SearchResult("not_found")
+
+        seen = set()
+        entries = []
+        with trace.stage("entries"):
+            group_size = self.catalog.group_counter()
+            for row, _edits in hits:
+                key = (row.model, row.desc(lang))
+                if key not in seen:
+                    seen.add(key)
+                    entries.append(self.entry(row, lang, None, group_size))
+        return SearchResult("found" if hits[0][1] == 0 else "closest", entries)
+
+    def lookup_keywords(self, search_type, query, values=(), lang="fa", tolerance=DEFAULT_TOLERANCE, trace=NO_TRACE):
+        # کلمه آخر پیشوندی است تا "seal" هم sealed و هم sealing را پیدا کند
+        with trace.stage("match"):
+            rows = self.catalog.text_search(search_type, query, dict(values), tolerance, prefix_last=True)
+        if rows is None:
+            return SearchResult("missing_input")
+        trace.matched = len(rows)
+        with trace.stage("entries"):
+            entries = self.entries_for(rows, lang)
+        return SearchResult("found" if entries else "not_found", entries)
+
+    def lookup_raw(self, search_type, raw, lang="fa", trace=NO_TRACE, **options):
+        # با trace زمان هر مرحله (بارگذاری فایل، خواندن ورودی، تطبیق، ساخت نتایج) ثبت می‌شود
+        started = time.perf_counter()
+        if self.catalog.refresh():
+            # فایل دوباره بارگذاری شد: خواندن، parse، تطبیق کلیدها (ingest) و تقسیم جدا گزارش می‌شوند
+            trace.update(self.catalog.load_stages)
+        else:
+            trace.add("refresh", time.perf_counter() - started)
+        trace.records = self.catalog.record_count
+        # اگر در میانه جستجو فایل دوباره بارگذاری شود، همه مراحل همچنان نسخه قبلی را می‌بینند
+        with self.catalog.snapshot():
+            result = self._lookup_raw(search_type, raw, lang, trace, options)
+        trace.status = result.status
+        trace.results = len(result.entries)
+        return result
+
+    def interchangeable(self, values, lang="fa", exclude=None, tolerance=DEFAULT_TOLERANCE):
+        # «این مدل موجود نیست، چه چیزی جایش می‌خورد؟»: همه مدل‌های دیگر با همان d/D/B
+        with self.catalog.snapshot():
+            rows = self.catalog.interchange_group(tuple(values), tolerance)
+            entries = [e for e in self.entries_for(rows, lang) if e.model != exclude]
+        return SearchResult("found" if entries else "not_found", entries)
+
+    def lookup_partial(self, search_type, raw, lang="fa", live=None):
+        # جستجوی همزمان با تایپ روی فیلدهای پر شده؛ live نتایج مراحل قبل را نگه می‌دارد
+        live = live or IncrementalSearch(self, search_type)
+        with self.catalog.snapshot():
+            rows = live.update(raw)
+            if rows is None:
+                return SearchResult("missing_input")
+            entries = self.entries_for(rows, lang)
+        return SearchResult("found" if entries else "not_found", entries)
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def _cached(self, key, trace, compute):
+        # نتیجه‌های cache شده بین فراخوان‌ها مشترک‌اند و نباید تغییر داده شوند
+        version = self.catalog.version
+        with trace.stage("cache"):
+            result = self.cache.get(key, version, self.catalog.latest_version)
+        trace.cache = "miss" if result is None else "hit"
+        if result is None:
+            result = compute()
+            self.cache.put(key, version, result)
+        return result
+
+    def _lookup_raw(self, search_type, raw, lang, trace, options):
+        if search_type == "model":
+            query = (raw.get("model") or "").strip()
+            if not query:
+                return SearchResult("missing_input")
+            key = (search_type, normalize_model(query), lang)
+            return self._cached(key, trace, lambda: self.lookup_model(query, lang, trace=trace))
+
+        options = {name: quantize(v) if isinstance(v, float) else v for name, v in options.items()}
+        keywords = (raw.get("keywords") or "").strip()
+        if keywords:
+            tolerance = options.get("tolerance", DEFAULT_TOLERANCE)
+            with trace.stage("parse"):
+                values = tuple((field, quantize(v)) for field, v in self.parse_partial(search_type, raw))
+            key = (search_type, "keywords", " ".join(keywords.split()), values, tolerance, lang)
+            return self._cached(
+                key, trace, lambda: self.lookup_keywords(search_type, keywords, values, lang, tolerance, trace)
+            )
+
+        with trace.stage("parse"):
+            values = self.parse_dimensions(search_type, raw)
+        if values is None:
+            return SearchResult("missing_input")
+        values = tuple(quantize(v) for v in values)
+        key = (search_type, values, lang, tuple(sorted(options.items())))
+        return self._cached(key, trace, lambda: self.lookup(search_type, values, lang, trace=trace, **options))
+
+
+class IncrementalSearch:
+    # جستجوی همزمان با تایپ: هر پرس‌وجوی جزئی (فیلدهای پر شده) نتایجش را نگه می‌دارد
+    # تا افزودن فیلد فقط نتایج قبلی را فیلتر کند و پاک کردن فیلد از نتایج ذخیره شده برگردد
+    def __init__(self, engine, search_type, tolerance=DEFAULT_TOLERANCE, capacity=32):
+        self.engine = engine
+        self.search_type = search_type
+        self.tolerance = tolerance
+        self.capacity = capacity
+        self._cache = OrderedDict()
+        self._version = None
+        self.last_source = None
+        # جستجوهای همزمان با تایپ در thread pool اجرا می‌شوند و یکی ممکن است هنوز در حال لغو باشد
+        self._lock = threading.Lock()
+
+    def parse(self, raw):
+        return self.engine.parse_partial(self.search_type, raw)
+
+    def update(self, raw):
+        query = self.parse(raw)
+        if not query:
+            return None
+        with self._lock:
+            return self._update(query)
+
+    def _update(self, query):
+        catalog = self.engine.catalog
+        catalog.refresh()
+        if catalog.version != self._version:
+            self._cache.clear()
+            self._version = catalog.version
+
+        rows = self._cache.get(query)
+        if rows is not None:
+            self._cache.move_to_end(query)
+            self.last_source = "cache"
+            return rows
+
+        parent = self._best_parent(query)
+        if parent is None:
+            field, value = query[0]
+            rows = catalog.field_search(self.search_type, field, value, self.tolerance)
+            remaining = query[1:]
+            self.last_source = "index"
+        else:
+            rows = self._cache[parent]
+            remaining = tuple(item for item in query if item not in parent)
+            self.last_source = "narrow"
+
+        tol = self.tolerance
+        for field, value in remaining:
+            rows = [r for r in rows if getattr(r, field) is not None and abs(getattr(r, field) - value) < tol]
+
+        self._cache[query] = rows
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return rows
+
+    def _best_parent(self, query):
+        # کوچک‌ترین مجموعه ذخیره شده‌ای که شرط‌هایش زیرمجموعه پرس‌وجوی فعلی است
+        items = set(query)
+        best = None
+        for cached, rows in self._cache.items():
+            if set(cached) <= items and (best is None or len(rows) < len(self._cache[best])):
+                best = cached
+        return best
@@ -0,0 +1,72 @@
+# نتایجی که نوع ندارند زیر یک کلید مشترک شمرده می‌شوند
+NO_TYPE = ""
+
+# شماره بیت‌های روشن هر بایت؛ تبدیل bitset به شماره نتایج بایت به بایت انجام می‌شود
+_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def entry_type(entry):
+    value = getattr(entry, "type", None)
+    return NO_TYPE if value is None else str(value)
+
+
+def positions(mask, offset=0):
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    found = []
+    for byte_no, byte in enumerate(data):
+        if byte:
+            base = offset + (byte_no << 3)
+            found.extend(base + bit for bit in _BITS[byte])
+    return found
+
+
+class TypeFacets:
+    # برای هر نوع یک bitset روی شماره نتایج (بیت i یعنی نتیجه i از این نوع است)؛ با رسیدن هر تکه نتایج
+    # فقط بیت‌های همان تکه روشن می‌شوند. تعداد هر نوع و فیلتر انتخاب کاربر با عملیات بیتی روی همین
+    # bitsetها حساب می‌شوند و نتایج دوباره پیمایش نمی‌شوند
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.size = 0
+        self._bits = {}
+        self._masks = {}
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._counts)
+
+    def add(self, entries):
+        bits = self._bits
+        counts = self._counts
+        for i, entry in enumerate(entries, self.size):
+            key = entry_type(entry)
+            field = bits.get(key)
+            if field is None:
+                field = bits[key] = bytearray()
+            byte = i >> 3
+            if len(field) <= byte:
+                field.extend(bytes(byte + 1 - len(field)))
+            field[byte] |= 1 << (i & 7)
+            counts[key] = counts.get(key, 0) + 1
+        self.size += len(entries)
+        self._masks.clear()
+
+    def counts(self):
+        return dict(self._counts)
+
+    def mask(self, key):
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._masks[key] = int.from_bytes(self._bits.get(key, b""), "little")
+        return mask
+
+    def visible(self, hidden, start=0):
+        # شماره نتایج (از start به بعد، به ترتیب) که نوعشان پنهان نشده است
+        hidden = [key for key in hidden if key in self._counts]
+        if not hidden:
+            return range(start, self.size)
+        mask = (1 << self.size) - 1
+        for key in hidden:
+            mask &= ~self.mask(key)
+        return positions(mask >> start, start)
@@ -0,0 +1,100 @@
+import math
+
+from catalog import DEFAULT_TOLERANCE
+
+# هر بعد در ۲۱ بیت از کلید عدد صحیح؛ برخورد کلیدها فقط هزینه دارد چون شرط دقیق دوباره بررسی می‌شود
+BITS = 21
+MASK = (1 << BITS) - 1
+CELL_FACTOR = 4
+
+
+class InterchangeIndex:
+    # جدول hash روی (d, D, B) کوانتیزه شده با خانه‌هایی به اندازه CELL_FACTOR×tolerance؛
+    # خانه همسایه فقط وقتی بررسی می‌شود که مقدار به مرز نزدیک‌تر از tolerance باشد (میانگین ۳ تا ۴ خانه به‌جای ۲۷)
+    def __init__(self, rows, tolerance=DEFAULT_TOLERANCE):
+        self.tolerance = tolerance
+        self.cell = CELL_FACTOR * tolerance
+        self.row_count = 0
+        self._buckets = {}
+        self._sizes = {}
+        for row in rows:
+            key = self._row_key(row)
+            if key is None:
+                continue
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = [row]
+            else:
+                bucket.append(row)
+            self.row_count += 1
+
+    def __len__(self):
+        return len(self._buckets)
+
+    @staticmethod
+    def _key(i, j, k):
+        return ((i & MASK) << (2 * BITS)) | ((j & MASK) << BITS) | (k & MASK)
+
+    def _row_key(self, row):
+        if row.d is None or row.D is None or row.B is None:
+            return None
+        return self._key(*(math.floor(v / self.cell) for v in (row.d, row.D, row.B)))
+
+    def updated(self, removed, added):
+        # فقط خانه‌های تغییر کرده کپی می‌شوند؛ نسخه قبلی برای جستجوهای در جریان دست نخورده می‌ماند
+        clone = InterchangeIndex.__new__(InterchangeIndex)
+        clone.tolerance = self.tolerance
+        clone.cell = self.cell
+        clone.row_count = self.row_count
+        clone._buckets = buckets = dict(self._buckets)
+        clone._sizes = {}
+        gone = {}
+        for row in removed:
+            key = self._row_key(row)
+            if key is not None:
+                gone.setdefault(key, set()).add(id(row))
+        for key, ids in gone.items():
+            bucket = buckets.get(key, ())
+            kept = [r for r in bucket if id(r) not in ids]
+            clone.row_count -= len(bucket) - len(kept)
+            if kept:
+                buckets[key] = kept
+            else:
+                buckets.pop(key, None)
+        for row in added:
+            key = self._row_key(row)
+            if key is not None:
+                buckets[key] = buckets.get(key, []) + [row]
+                clone.row_count += 1
+        return clone
+
+    def _cells(self, value, tol):
+        # خانه خود مقدار و در صورت نزدیکی به مرز، خانه همسایه همان طرف
+        cell = self.cell
+        lo = math.floor((value - tol) / cell)
+        hi = math.floor((value + tol) / cell)
+        return (lo,) if lo == hi else range(lo, hi + 1)
+
+    def group(self, values, tolerance=None):
+        # همه ردیف‌هایی که هر سه بعدشان کمتر از tolerance با values فاصله دارند
+        tol = self.tolerance if tolerance is None else tolerance
+        d, D, B = values
+        get = self._buckets.get
+        key = self._key
+        matches = []
+        for i in self._cells(d, tol):
+            for j in self._cells(D, tol):
+                for k in self._cells(B, tol):
+                    bucket = get(key(i, j, k))
+                    if bucket:
+                        for r in bucket:
+                            if abs(r.d - d) < tol and abs(r.D - D) < tol and abs(r.B - B) < tol:
+                                matches.append(r)
+        return matches
+
+    def group_size(self, values):
+        # تعداد مدل‌های متمایز هم‌اندازه؛ برای نمایش کنار هر نتیجه ذخیره می‌شود
+        size = self._sizes.get(values)
+        if size is None:
+            size = self._sizes[values] = len({row.model for row in self.group(values)})
+        return size
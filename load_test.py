@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from benchmark import make_queries, percentiles
+from catalog import DB_PATH, CatalogStore
+
+log = logging.getLogger("load_test")
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length)
+    return status, body
+
+
+def encode_request(host, query):
+    body = json.dumps(query, ensure_ascii=False).encode("utf-8")
+    head = (
+        "POST /search HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    )
+    return head.encode("ascii") + body
+
+
+async def run_client(host, port, queries, depth, latencies, errors):
+    # یک اتصال keep-alive؛ تا depth درخواست پیش از رسیدن پاسخ‌ها فرستاده می‌شود (pipelining)
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = []
+    next_query = 0
+    try:
+        while next_query < min(depth, len(queries)):
+            writer.write(encode_request(host, queries[next_query]))
+            sent.append(time.perf_counter())
+            next_query += 1
+        await writer.drain()
+        for done in range(len(queries)):
+            status, body = await read_response(reader)
+            latencies.append(time.perf_counter() - sent[done])
+            if status != 200 or "status" not in json.loads(body):
+                errors.append(status)
+            if next_query < len(queries):
+                writer.write(encode_request(host, queries[next_query]))
+                sent.append(time.perf_counter())
+                next_query += 1
+                await writer.drain()
+    finally:
+        writer.close()
+
+
+async def drive(host, port, workload, depth):
+    latencies = []
+    errors = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, queries, depth, latencies, errors) for queries in workload))
+    return time.perf_counter() - started, latencies, errors
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db, port, extra):
+    cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_server.py")]
+    cmd += ["--db", db, "--port", str(port)] + extra
+    server = subprocess.Popen(cmd, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"query server exited with code {server.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("query server did not start")
+
+
+def fetch_stats(host, port):
+    from query_client import QueryClient
+
+    client = QueryClient(f"{host}:{port}")
+    try:
+        return client.request("GET", "/stats")
+    finally:
+        client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive query_server.py from many concurrent keep-alive clients.")
+    parser.add_argument("--url", help="running server (host:port); default: start one on a free port")
+    parser.add_argument("--db", default=DB_PATH, help="catalog to sample queries from (and serve)")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--pipeline", type=int, default=4, help="requests in flight per connection")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--server-args", default="", help="extra arguments for the started server")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    catalog = CatalogStore(args.db)
+    rng = random.Random(args.seed)
+    pool = [
+        dict(raw, type=search_type, lang=rng.choice(("fa", "en")))
+        for _kind, search_type, raw in make_queries(catalog, max(20, args.requests // 5), args.seed)
+    ]
+    workload = [[rng.choice(pool) for _ in range(args.requests)] for _ in range(args.clients)]
+
+    server = None
+    if args.url:
+        host, _, port = args.url.split("://")[-1].rstrip("/").partition(":")
+        port = int(port or 8765)
+    else:
+        host, port = "127.0.0.1", free_port()
+        server = start_server(args.db, port, args.server_args.split())
+    try:
+        elapsed, latencies, errors = asyncio.run(drive(host, port, workload, args.pipeline))
+        stats = fetch_stats(host, port)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "clients": args.clients,
+        "pipeline": args.pipeline,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency": percentiles(latencies),
+        "cache": stats["cache"],
+        "server_requests": stats["requests"],
+    }
+    print(json.dumps(report, ensure_ascii=False))
+    lat = report["latency"]
+    log.info(
+        "%d requests from %d clients in %.2f s: %.0f req/s, p50 %.2f ms, p99 %.2f ms, %d errors",
+        report["requests"],
+        args.clients,
+        elapsed,
+        report["throughput_rps"] or 0,
+        lat["p50_ms"] or 0,
+        lat["p99_ms"] or 0,
+        report["errors"],
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
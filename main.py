@@ -1,15 +1,27 @@
-import json
+import logging
 import os
-import re
 import sys
-import unicodedata
-
-from PyQt5.QtCore import QEasingCurve, QPropertyAnimation, QSequentialAnimationGroup, Qt
-from PyQt5.QtGui import QColor, QFont, QKeySequence, QPixmap
-from PyQt5.QtWidgets import (
+import time
+from functools import partial
+
+# زمان شروع برنامه برای اندازه‌گیری زمان تا اولین فریم؛ ایمپورت‌های بعدی عمداً بعد از آن هستند
+# تا زمان بارگذاری PyQt هم جزء اندازه‌گیری باشد (E402)
+STARTED = time.perf_counter()
+
+from PyQt5.QtCore import (  # noqa: E402
+    QEasingCurve,
+    QPropertyAnimation,
+    QSequentialAnimationGroup,
+    Qt,
+    QThreadPool,
+    QTimer,
+)
+from PyQt5.QtGui import QFont, QKeySequence  # noqa: E402
+from PyQt5.QtWidgets import (  # noqa: E402
     QAbstractItemView,
     QApplication,
     QBoxLayout,
+    QComboBox,
     QFrame,
     QGraphicsOpacityEffect,
     QHBoxLayout,
@@ -21,10 +33,22 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QShortcut,
     QSizePolicy,
+    QStackedWidget,
     QVBoxLayout,
     QWidget,
 )
 
+from catalog_watch import CatalogWatcher  # noqa: E402
+from engine import IncrementalSearch, open_engine  # noqa: E402
+from query_trace import open_trace_log, write_trace  # noqa: E402
+from result_view import EntryRole, ResultListModel, ResultListView, SeparatorDelegate  # noqa: E402
+from search_worker import SearchTask, live_lookup  # noqa: E402
+from startup import ImageLoadTask, ScaledBackground, WarmUpTask  # noqa: E402
+
+log = logging.getLogger("main")
+
+BACKGROUND_PATH = os.path.join("assets", "background.jpg")
+
 # --- استایل بصری برنامه ---
 CARD_STYLE = """
 QWidget#CardFrame {
@@ -65,6 +89,12 @@ TEXTS = {
         "choose_search": "نوع جستجو را انتخاب کنید",
         "bearing": " جستجوی بلبرینگ",
         "housing": " جستجوی یاتاقان",
+        "model_search": " جستجوی کد مدل",
+        "model_code": "کد مدل (مثلاً 6204-2Z)",
+        "keywords": "کلمات کلیدی (اختیاری)",
+        "size_example": "مثال: 25.0 mm",
+        "model_example": "مثال: 6204-2Z",
+        "keywords_example": "مثال: 2Z لاستیکی",
         "check": "جستجو و بررسی",
         "clear": "پاکسازی",
         "back": "بازگشت",
@@ -73,12 +103,29 @@ TEXTS = {
         "width": "عرض (B)",
         "enter_all": "⚠️ لطفاً تمام ابعاد را وارد کنید",
         "enter_d": "⚠️ لطفاً قطر داخلی را وارد کنید",
+        "enter_model": "⚠️ لطفاً کد مدل را وارد کنید",
         "not_found": "❌ نتیجه‌ای یافت نشد",
         "db_missing": "❌ فایل دیتابیس (DataBase.json) پیدا نشد",
         "select_lang": "تغییر زبان",
         "results_found": "✅ نتیجه یافت شد:",
+        "closest_found": "🔎 نتیجه دقیقی یافت نشد؛ نزدیک‌ترین موارد:",
+        "closest_models": "🔎 کد دقیقی یافت نشد؛ کدهای مشابه:",
         "critical_error": "خطای بحرانی",
+        "sort_by": "مرتب‌سازی:",
+        "sort_relevance": "پیش‌فرض",
+        "sort_model": "مدل",
+        "sort_d": "قطر داخلی (d)",
+        "sort_D": "قطر خارجی (D)",
+        "sort_B": "عرض (B)",
         "searching": "در حال بررسی...",
+        "interchange": "قطعات جایگزین",
+        "pick_result": "⚠️ ابتدا یک نتیجه با ابعاد کامل (d، D، B) را انتخاب کنید",
+        "interchange_found": "⇄ قطعات هم‌اندازه با {model} ({size}):",
+        "no_interchange": "❌ قطعه دیگری با ابعاد {model} ({size}) یافت نشد",
+        "catalog_updated": "🔄 کاتالوگ به‌روز شد: {inserted} مدل جدید، {changed} تغییر، {deleted} حذف ({ms:.0f} ms)",
+        "catalog_reloaded": "🔄 کاتالوگ دوباره بارگذاری شد ({records} رکورد، {ms:.0f} ms)",
+        "catalog_reload_failed": "⚠️ فایل کاتالوگ خوانده نشد؛ نسخه قبلی استفاده می‌شود",
+        "facet_none": "بدون نوع",
     },
     "en": {
         "app_title": "Bearing & Housing Finder",
@@ -86,6 +133,12 @@ TEXTS = {
         "choose_search": "Select Search Type",
         "bearing": " Bearing Search",
         "housing": " Housing Search",
+        "model_search": " Model Code Search",
+        "model_code": "Model code (e.g. 6204-2Z)",
+        "keywords": "Keywords (optional)",
+        "size_example": "e.g. 25.0 mm",
+        "model_example": "e.g. 6204-2Z",
+        "keywords_example": "e.g. 2Z rubber",
         "check": "Search / Check",
         "clear": "Clear Fields",
         "back": "Go Back",
@@ -94,16 +147,48 @@ TEXTS = {
         "width": "Width (B)",
         "enter_all": "⚠️ Please enter d, D and B",
         "enter_d": "⚠️ Please enter inner diameter",
+        "enter_model": "⚠️ Please enter a model code",
         "not_found": "❌ No result found",
         "db_missing": "❌ DataBase.json not found",
         "select_lang": "Change Language",
         "results_found": "✅ Results Found:",
+        "closest_found": "🔎 No exact match; closest sizes:",
+        "closest_models": "🔎 No exact match; similar model codes:",
         "critical_error": "Critical Error",
+        "sort_by": "Sort by:",
+        "sort_relevance": "Default",
+        "sort_model": "Model",
+        "sort_d": "Inner (d)",
+        "sort_D": "Outer (D)",
+        "sort_B": "Width (B)",
         "searching": "Searching...",
+        "interchange": "Interchangeable Parts",
+        "pick_result": "⚠️ Select a result with full dimensions (d, D, B) first",
+        "interchange_found": "⇄ Parts interchangeable with {model} ({size}):",
+        "no_interchange": "❌ No other part with the dimensions of {model} ({size})",
+        "catalog_updated": "🔄 Catalog updated: {inserted} added, {changed} changed, {deleted} removed ({ms:.0f} ms)",
+        "catalog_reloaded": "🔄 Catalog reloaded ({records} records, {ms:.0f} ms)",
+        "catalog_reload_failed": "⚠️ Could not read the catalog file; still using the previous version",
+        "facet_none": "No type",
     },
 }
 
 
+class SearchScreen:
+    # ویجت‌ها و وضعیت یک حالت جستجو؛ یک بار ساخته و بین رفت‌وآمدها حفظ می‌شود
+    def __init__(self, mode):
+        self.mode = mode
+        self.inputs = []
+        self.input_map = {}
+        self.sort_combo = None
+        self.result_model = None
+        self.output = None
+        self.check_btn = None
+        self.live_search = None
+        self.facet_list = None
+        self.facet_items = {}
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -112,20 +197,66 @@ class MainWindow(QMainWindow):
         self.inputs = []
         self.input_map = {}
         self.current_screen = None
+        self.engine = open_engine()
+        self.search_pool = QThreadPool(self)
+        self.search_pool.setMaxThreadCount(2)
+        self.search_generation = 0
+        self._active_task = None
+        # آخرین جستجوی صفحه فعلی؛ بعد از بارگذاری دوباره کاتالوگ نتایج نمایش داده شده از نو حساب می‌شوند
+        self._last_search = None
+        self.live_search = None
+        self.screens = {}
+        self.search_screens = {}
+        self._i18n = []
+        self._anim_groups = {}
+        self.trace_log = open_trace_log()
+        self._render_time = 0.0
+
+        # ویرایش کاتالوگ در حین کار برنامه بدون راه‌اندازی دوباره اعمال می‌شود (نه برای کاتالوگ روی سرور)
+        self.catalog_watcher = None
+        if getattr(self.engine.catalog, "path", None):
+            self.catalog_watcher = CatalogWatcher(self.engine, self.search_pool, parent=self)
+            self.catalog_watcher.reloaded.connect(self.on_catalog_reloaded)
+            self.catalog_watcher.failed.connect(
+                lambda _message: self.status_bar.showMessage(self.t("catalog_reload_failed"), 8000)
+            )
+
+        # جستجوی همزمان با تایپ با کمی تأخیر (debounce) اجرا می‌شود
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(150)
+        self.live_timer.timeout.connect(self.run_live_search)
 
         self.setWindowTitle("Bearing Finder")
         self.setMinimumSize(960, 640)
+        self.setStyleSheet(CARD_STYLE)
 
         self.central = QWidget()
         self.setCentralWidget(self.central)
         self.main_layout = QVBoxLayout(self.central)
 
+        # زمان هر مرحله آخرین جستجو در نوار وضعیت نمایش داده می‌شود
+        self.status_bar = self.statusBar()
+        self.status_bar.setStyleSheet("QStatusBar { color: #ecf0f1; background: rgba(0, 0, 0, 180); }")
+
+        # تصویر پس‌زمینه در thread جدا decode می‌شود و برای هر اندازه پنجره یک بار مقیاس می‌خورد
         self.bg_label = QLabel(self.central)
-        if os.path.exists("assets/background.jpg"):
-            self.bg_pixmap = QPixmap("assets/background.jpg")
-            self.bg_label.setPixmap(self.bg_pixmap)
-            self.bg_label.setScaledContents(True)
         self.bg_label.lower()
+        self.background = ScaledBackground()
+        self.bg_timer = QTimer(self)
+        self.bg_timer.setSingleShot(True)
+        self.bg_timer.setInterval(60)
+        self.bg_timer.timeout.connect(self.update_background)
+        if os.path.exists(BACKGROUND_PATH):
+            task = ImageLoadTask(BACKGROUND_PATH)
+            task.signals.image_loaded.connect(self.on_background_loaded)
+            task.signals.failed.connect(lambda message: log.warning("background: %s", message))
+            self.search_pool.start(task)
+        self._first_frame = False
+
+        # صفحه‌ها فقط یک بار ساخته می‌شوند و بین آن‌ها فقط جابه‌جا می‌شویم
+        self.stack = QStackedWidget()
+        self.main_layout.addWidget(self.stack)
         self.init_shortcuts()
         self.apply_language_ui()
 
@@ -135,15 +266,81 @@ class MainWindow(QMainWindow):
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.bg_label.setGeometry(self.central.rect())
+        # هنگام تغییر اندازه پشت سر هم، فقط اندازه نهایی مقیاس داده می‌شود
+        self.bg_timer.start()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_frame:
+            self._first_frame = True
+            QTimer.singleShot(0, self.on_first_frame)
+
+    def on_first_frame(self):
+        log.info("time to first frame: %.1f ms", (time.perf_counter() - STARTED) * 1000)
+        # کاتالوگ و ایندکس‌ها بعد از نمایش صفحه اول و تا رسیدن کاربر به صفحه جستجو آماده می‌شوند
+        task = WarmUpTask(self.engine)
+        task.signals.warmed.connect(lambda elapsed: log.info("catalog ready in %.1f ms", elapsed * 1000))
+        if self.catalog_watcher is not None:
+            task.signals.warmed.connect(lambda _elapsed: self.catalog_watcher.sync())
+        task.signals.failed.connect(lambda message: log.warning("catalog warm-up failed: %s", message))
+        self.search_pool.start(task)
+
+    def on_catalog_reloaded(self, update, elapsed):
+        if update:
+            text = self.t("catalog_updated").format(ms=elapsed * 1000, **update)
+        else:
+            text = self.t("catalog_reloaded").format(records=self.engine.catalog.record_count, ms=elapsed * 1000)
+        self.status_bar.showMessage(text, 8000)
+        if self.current_screen == "search" and self._last_search is not None and self._active_task is None:
+            raw, lookup, on_started = self._last_search
+            if lookup is None:
+                # بدون trace تا پیام بارگذاری در نوار وضعیت بماند
+                lookup = partial(self.engine.lookup_raw, self.search_type, raw, self.lang)
+            self.start_task(raw, lookup, on_started)
+
+    def on_background_loaded(self, image):
+        self.background.set_image(image)
+        self.update_background()
+
+    def update_background(self):
+        pixmap = self.background.pixmap(self.central.size())
+        if pixmap is not None:
+            self.bg_label.setPixmap(pixmap)
 
     def t(self, key):
         return TEXTS[self.lang].get(key, key)
 
-    def clear_layout(self):
-        while self.main_layout.count():
-            item = self.main_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+    def bind_text(self, setter, key):
+        # متن‌های وابسته به زبان ثبت می‌شوند تا تغییر زبان بدون ساخت دوباره ویجت‌ها انجام شود
+        self._i18n.append((setter, key))
+        setter(self.t(key))
+
+    def retranslate(self):
+        for setter, key in self._i18n:
+            setter(self.t(key))
+
+    def leave_screen(self):
+        self._last_search = None
+        if self._active_task is not None:
+            self.cancel_search()
+            self.finish_search()
+        self.live_timer.stop()
+
+    def switch_screen(self, name, build):
+        self.leave_screen()
+        page = self.screens.get(name)
+        if page is None:
+            card = build()
+            page = QWidget()
+            layout = QVBoxLayout(page)
+            layout.setContentsMargins(0, 0, 0, 0)
+            layout.addStretch()
+            layout.addWidget(card, alignment=Qt.AlignCenter)
+            layout.addStretch()
+            self.screens[name] = page
+            self.stack.addWidget(page)
+        self.stack.setCurrentWidget(page)
+        return page
 
     def init_shortcuts(self):
         self.shortcut_back = QShortcut(QKeySequence("Esc"), self)
@@ -163,27 +360,36 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(self.t("app_title"))
 
     def set_output_message(self, text, color="#f1c40f"):
-        self.output.clear()
-        item = QListWidgetItem(text)
-        item.setForeground(QColor(color))
-        self.output.addItem(item)
+        self.result_model.set_message(text, color)
 
     def animate_widgets(self, widgets, duration=180):
-        # نگهداری رفرنس انیمیشن‌ها برای جلوگیری از garbage collection
-        self._active_anim_group = QSequentialAnimationGroup(self)
-        for w in widgets:
-            effect = QGraphicsOpacityEffect(w)
-            w.setGraphicsEffect(effect)
-            effect.setOpacity(0.0)
-
-            anim = QPropertyAnimation(effect, b"opacity", self)
-            anim.setDuration(duration)
-            anim.setStartValue(0.0)
-            anim.setEndValue(1.0)
-            anim.setEasingCurve(QEasingCurve.OutCubic)
-            self._active_anim_group.addAnimation(anim)
-
-        self._active_anim_group.start()
+        # افکت‌ها و انیمیشن‌های هر گروه ویجت یک بار ساخته و در نمایش‌های بعدی دوباره اجرا می‌شوند
+        key = tuple(id(w) for w in widgets)
+        group = self._anim_groups.get(key)
+        if group is None:
+            group = QSequentialAnimationGroup(self)
+            for w in widgets:
+                effect = QGraphicsOpacityEffect(w)
+                w.setGraphicsEffect(effect)
+                anim = QPropertyAnimation(effect, b"opacity", group)
+                anim.setDuration(duration)
+                anim.setStartValue(0.0)
+                anim.setEndValue(1.0)
+                anim.setEasingCurve(QEasingCurve.OutCubic)
+                group.addAnimation(anim)
+            # بعد از پایان، افکت غیرفعال می‌شود تا ویجت‌ها بدون لایه اضافه رسم شوند
+            group.finished.connect(lambda g=group: self._set_effects_enabled(g, False))
+            self._anim_groups[key] = group
+
+        group.stop()
+        self._set_effects_enabled(group, True)
+        for i in range(group.animationCount()):
+            group.animationAt(i).targetObject().setOpacity(0.0)
+        group.start()
+
+    def _set_effects_enabled(self, group, enabled):
+        for i in range(group.animationCount()):
+            group.animationAt(i).targetObject().setEnabled(enabled)
 
     def handle_back_shortcut(self):
         if self.current_screen == "search":
@@ -193,10 +399,10 @@ class MainWindow(QMainWindow):
 
     # --- صفحات برنامه ---
     def show_language_screen(self):
-        self.clear_layout()
+        self.switch_screen("language", self.build_language_screen)
         self.current_screen = "language"
-        self.setStyleSheet(CARD_STYLE)
 
+    def build_language_screen(self):
         card = QFrame()
         card.setObjectName("CardFrame")
         card.setMinimumSize(520, 320)
@@ -227,18 +433,24 @@ class MainWindow(QMainWindow):
         en_btn.clicked.connect(lambda: self.set_language("en"))
 
         v.addLayout(h)
-        self.main_layout.addStretch()
-        self.main_layout.addWidget(card, alignment=Qt.AlignCenter)
-        self.main_layout.addStretch()
+        return card
 
     def set_language(self, lang):
-        self.lang = lang
-        self.apply_language_ui()
+        if lang != self.lang:
+            self.lang = lang
+            self.apply_language_ui()
+            self.retranslate()
+            # توضیحات نتایج قبلی به زبان قبلی هستند
+            for screen in self.search_screens.values():
+                screen.result_model.clear()
         self.show_start_screen()
 
     def show_start_screen(self):
-        self.clear_layout()
+        self.switch_screen("start", self.build_start_screen)
         self.current_screen = "start"
+        self.animate_widgets(self.start_widgets)
+
+    def build_start_screen(self):
         card = QFrame()
         card.setObjectName("CardFrame")
         card.setMinimumSize(600, 460)
@@ -249,22 +461,26 @@ class MainWindow(QMainWindow):
         v.setContentsMargins(50, 50, 50, 50)
         v.setSpacing(20)
 
-        title = QLabel(self.t("choose_search"))
+        title = QLabel()
+        self.bind_text(title.setText, "choose_search")
         title.setFont(QFont("B Nazanin", 24, QFont.Bold))
         title.setStyleSheet("color: white; border: none;")
         title.setAlignment(Qt.AlignCenter)
         v.addWidget(title)
 
-        b_btn = QPushButton(self.t("bearing"))
-        h_btn = QPushButton(self.t("housing"))
-        l_btn = QPushButton(self.t("select_lang"))
+        b_btn = QPushButton()
+        h_btn = QPushButton()
+        m_btn = QPushButton()
+        l_btn = QPushButton()
 
         menu_buttons = []
-        for btn, style in [
-            (b_btn, SECONDARY_BUTTON_STYLE),
-            (h_btn, SECONDARY_BUTTON_STYLE),
-            (l_btn, SECONDARY_BUTTON_STYLE),
+        for btn, key, style in [
+            (b_btn, "bearing", SECONDARY_BUTTON_STYLE),
+            (h_btn, "housing", SECONDARY_BUTTON_STYLE),
+            (m_btn, "model_search", SECONDARY_BUTTON_STYLE),
+            (l_btn, "select_lang", SECONDARY_BUTTON_STYLE),
         ]:
+            self.bind_text(btn.setText, key)
             btn.setMinimumHeight(80)
             btn.setFont(QFont("B Nazanin", 18, QFont.Bold))
             btn.setStyleSheet(style)
@@ -274,16 +490,13 @@ class MainWindow(QMainWindow):
 
         b_btn.clicked.connect(lambda: self.start_search("bearing"))
         h_btn.clicked.connect(lambda: self.start_search("housing"))
+        m_btn.clicked.connect(lambda: self.start_search("model"))
         l_btn.clicked.connect(self.show_language_screen)
 
-        self.main_layout.addStretch()
-        self.main_layout.addWidget(card, alignment=Qt.AlignCenter)
-        self.main_layout.addStretch()
-        self.animate_widgets([title] + menu_buttons)
+        self.start_widgets = [title] + menu_buttons
+        return card
 
-    def show_search_screen(self):
-        self.clear_layout()
-        self.current_screen = "search"
+    def build_search_screen(self, screen):
         card = QFrame()
         card.setObjectName("CardFrame")
         card.setMinimumWidth(1080)
@@ -297,17 +510,18 @@ class MainWindow(QMainWindow):
 
         fields_layout = QHBoxLayout()
         fields_layout.setDirection(QBoxLayout.LeftToRight)
-        self.inputs = []
-        self.input_map = {}
 
-        if self.search_type == "bearing":
-            configs = [("d", self.t("inner")), ("D", self.t("outer")), ("B", self.t("width"))]
+        if screen.mode == "bearing":
+            configs = [("d", "inner"), ("D", "outer"), ("B", "width")]
+        elif screen.mode == "model":
+            configs = [("model", "model_code")]
         else:
-            configs = [("d", self.t("inner"))]
+            configs = [("d", "inner")]
 
-        for eng, title in configs:
+        for eng, title_key in configs:
             box = QVBoxLayout()
-            lbl = QLabel(title)
+            lbl = QLabel()
+            self.bind_text(lbl.setText, title_key)
             lbl.setStyleSheet("color: white; border: none;")
             lbl.setFont(QFont("B Nazanin", 14, QFont.Bold))
 
@@ -318,74 +532,147 @@ class MainWindow(QMainWindow):
             edit.setLayoutDirection(Qt.LeftToRight)
             edit.setStyleSheet("border-radius:10px; background:white;")
             edit.setMinimumWidth(220)
-            edit.setPlaceholderText("مثال: 25.0 mm" if self.lang == "fa" else "e.g. 25.0 mm")
+            self.bind_text(edit.setPlaceholderText, "model_example" if eng == "model" else "size_example")
 
             box.addWidget(lbl)
             box.addWidget(edit)
             fields_layout.addLayout(box)
-            self.inputs.append(edit)
-            self.input_map[eng] = edit
+            screen.inputs.append(edit)
+            screen.input_map[eng] = edit
 
         v.addLayout(fields_layout)
 
-        if self.inputs:
-            self.inputs[0].setFocus()
-            for i, inp in enumerate(self.inputs):
-                inp.returnPressed.connect(lambda i=i: self.on_return_pressed(i))
-
-        self.output = QListWidget()
-        self.output.setMinimumHeight(250)
-        self.output.setFont(QFont("Consolas", 12))
-        self.output.setSelectionMode(QAbstractItemView.ExtendedSelection)
-        self.output.setAlternatingRowColors(False)
-        self.output.setStyleSheet(
+        if screen.mode != "model":
+            # جستجوی متنی روی توضیحات؛ با ابعاد وارد شده (حتی ناقص) ترکیب می‌شود
+            kw_lbl = QLabel()
+            self.bind_text(kw_lbl.setText, "keywords")
+            kw_lbl.setStyleSheet("color: white; border: none;")
+            kw_lbl.setFont(QFont("B Nazanin", 14, QFont.Bold))
+            kw_edit = QLineEdit()
+            kw_edit.setMinimumHeight(50)
+            kw_edit.setFont(QFont("Arial", 16))
+            kw_edit.setStyleSheet("border-radius:10px; background:white;")
+            self.bind_text(kw_edit.setPlaceholderText, "keywords_example")
+            v.addWidget(kw_lbl)
+            v.addWidget(kw_edit)
+            screen.inputs.append(kw_edit)
+            screen.input_map["keywords"] = kw_edit
+
+        for i, inp in enumerate(screen.inputs):
+            inp.returnPressed.connect(lambda i=i: self.on_return_pressed(i))
+            inp.textChanged.connect(lambda _text: self.live_timer.start())
+        if screen.mode != "model":
+            screen.live_search = IncrementalSearch(self.engine, screen.mode)
+
+        sort_h = QHBoxLayout()
+        sort_lbl = QLabel()
+        self.bind_text(sort_lbl.setText, "sort_by")
+        sort_lbl.setStyleSheet("color: white; border: none;")
+        sort_lbl.setFont(QFont("B Nazanin", 12, QFont.Bold))
+        screen.sort_combo = QComboBox()
+        screen.sort_combo.setMinimumWidth(200)
+        sort_keys = ["relevance", "model", "d"] + (["D", "B"] if screen.mode == "bearing" else [])
+        for i, key in enumerate(sort_keys):
+            screen.sort_combo.addItem("", key)
+            self.bind_text(lambda text, i=i, combo=screen.sort_combo: combo.setItemText(i, text), f"sort_{key}")
+        screen.sort_combo.currentIndexChanged.connect(self.on_sort_changed)
+        sort_h.addWidget(sort_lbl)
+        sort_h.addWidget(screen.sort_combo)
+        sort_h.addStretch()
+        v.addLayout(sort_h)
+
+        # لیست نتایج مجازی: مدل روی آرایه خام نتایج، جداکننده‌ها با delegate کشیده می‌شوند
+        screen.result_model = ResultListModel(self)
+
+        # نوع‌های موجود در نتایج با تعدادشان؛ برداشتن تیک هر نوع نتایج آن نوع را پنهان می‌کند
+        facet_list = screen.facet_list = QListWidget()
+        facet_list.setFlow(QListWidget.LeftToRight)
+        facet_list.setWrapping(True)
+        facet_list.setResizeMode(QListWidget.Adjust)
+        facet_list.setSortingEnabled(True)
+        facet_list.setMaximumHeight(90)
+        facet_list.setFont(QFont("Arial", 11))
+        facet_list.setStyleSheet("QListWidget { background: transparent; color: white; border: none; }")
+        facet_list.setVisible(False)
+        facet_list.itemChanged.connect(lambda _item: self.on_facet_toggled(screen))
+        screen.result_model.facets_changed.connect(lambda: self.update_facets(screen))
+        v.addWidget(facet_list)
+
+        output = screen.output = ResultListView()
+        output.setModel(screen.result_model)
+        output.setItemDelegate(SeparatorDelegate(output))
+        output.setUniformItemSizes(True)
+        output.setMinimumHeight(250)
+        output.setFont(QFont("Consolas", 12))
+        output.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        output.setAlternatingRowColors(False)
+        output.setStyleSheet(
             """
-            QListWidget {
+            QListView {
                 background: rgba(255,255,255,0.1);
                 color: #f1c40f;
                 border-radius: 15px;
                 border: 1px solid rgba(255,255,255,0.2);
                 padding: 6px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 8px;
                 border-radius: 8px;
                 background: transparent;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background: rgba(241, 196, 15, 0.28);
                 color: #ffffff;
             }
             """
         )
-        v.addWidget(self.output)
+        v.addWidget(output)
+
+        buttons = [("check", PRIMARY_BUTTON_STYLE, self.check_result)]
+        if screen.mode != "housing":
+            # دوبار کلیک روی نتیجه یا دکمه: همه مدل‌های دیگر با همان d/D/B
+            output.doubleClicked.connect(self.show_interchangeable)
+            buttons.append(("interchange", SECONDARY_BUTTON_STYLE, lambda: self.show_interchangeable()))
+        buttons += [
+            ("clear", SECONDARY_BUTTON_STYLE, self.clear_inputs),
+            ("back", SECONDARY_BUTTON_STYLE, self.show_start_screen),
+        ]
 
         btn_h = QHBoxLayout()
-        for text, style, func in [
-            (self.t("check"), PRIMARY_BUTTON_STYLE, self.check_result),
-            (self.t("clear"), SECONDARY_BUTTON_STYLE, self.clear_inputs),
-            (self.t("back"), SECONDARY_BUTTON_STYLE, self.show_start_screen),
-        ]:
-            b = QPushButton(text)
+        for key, style, func in buttons:
+            b = QPushButton()
+            self.bind_text(b.setText, key)
             b.setMinimumHeight(70)
             b.setFont(QFont("Arial", 16, QFont.Bold))
             b.setStyleSheet(style)
             b.clicked.connect(func)
             btn_h.addWidget(b)
             if func == self.check_result:
-                self.check_btn = b
+                screen.check_btn = b
 
-        self.check_btn.setDefault(True)
-        self.check_btn.setAutoDefault(True)
+        screen.check_btn.setDefault(True)
+        screen.check_btn.setAutoDefault(True)
 
         v.addLayout(btn_h)
-        self.main_layout.addStretch()
-        self.main_layout.addWidget(card, alignment=Qt.AlignCenter)
-        self.main_layout.addStretch()
+        return card
 
     def start_search(self, mode):
+        screen = self.search_screens.get(mode)
+        if screen is None:
+            screen = self.search_screens[mode] = SearchScreen(mode)
+        self.switch_screen(f"search_{mode}", lambda: self.build_search_screen(screen))
+
+        self.current_screen = "search"
         self.search_type = mode
-        self.show_search_screen()
+        self.inputs = screen.inputs
+        self.input_map = screen.input_map
+        self.sort_combo = screen.sort_combo
+        self.result_model = screen.result_model
+        self.output = screen.output
+        self.check_btn = screen.check_btn
+        self.live_search = screen.live_search
+        if self.inputs:
+            self.inputs[0].setFocus()
 
     def on_return_pressed(self, index):
         if index < len(self.inputs) - 1:
@@ -394,229 +681,178 @@ class MainWindow(QMainWindow):
             self.check_result()
 
     def clear_inputs(self):
+        self._last_search = None
         for field in self.inputs:
             field.clear()
-        if hasattr(self, "output"):
-            self.output.clear()
+        if hasattr(self, "result_model"):
+            self.result_model.clear()
         if self.inputs:
             self.inputs[0].setFocus()
 
-    def safe_float(self, value):
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            return float(value)
-
-        txt = str(value).strip()
-        if not txt:
-            return None
-
-        # نرمال‌سازی برای حذف علائم کنترلی RTL/LTR و اختلاف‌های یونیکدی
-        txt = unicodedata.normalize("NFKC", txt)
-        txt = re.sub(r"[\u200e\u200f\u202a-\u202e\u2066-\u2069]", "", txt)
-
-        # ارقام فارسی/عربی + جداکننده‌های اعشاری رایج
-        trans = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩٫٬،", "01234567890123456789.,,")
-        txt = txt.translate(trans)
-        txt = txt.replace(",", ".").replace("/", ".").replace("\\", ".")
-        txt = re.sub(r"\s+", "", txt)
-        txt = re.sub(r"[^0-9.+-]", "", txt)
-
-        # اگر چند نقطه وجود داشت، فقط اولین نقطه نگه داشته شود
-        if txt.count(".") > 1:
-            first = txt.find(".")
-            txt = txt[: first + 1] + txt[first + 1 :].replace(".", "")
-
-        match = re.search(r"[-+]?(?:\d+\.\d+|\d+|\.\d+)", txt)
-        if not match:
-            return None
-
-        try:
-            return float(match.group(0))
-        except ValueError:
-            return None
-
-    def _norm_key(self, key):
-        return re.sub(r"[^a-z0-9]", "", str(key).strip().lower())
-
-    def _get_by_keys(self, item, exact_keys, normalized_keys):
-        # exact case-sensitive match اولویت دارد تا d و D قاطی نشوند
-        for key in exact_keys:
-            if key in item and item[key] is not None:
-                return item[key]
-
-        exact_map = {str(k).strip().lower(): v for k, v in item.items() if v is not None}
-        for key in exact_keys:
-            hit = exact_map.get(str(key).strip().lower())
-            if hit is not None:
-                return hit
-
-        normalized_candidates = {self._norm_key(k) for k in normalized_keys}
-        for k, v in item.items():
-            if v is None:
-                continue
-            if self._norm_key(k) in normalized_candidates:
-                return v
-
-        return None
-
-    def _get_localized_desc(self, item):
-        if self.lang == "en":
-            primary = self._get_by_keys(
-                item,
-                ["purpose_en", "description_en", "special_features_en"],
-                ["purposeen", "descriptionen", "specialfeaturesen"],
-            )
-            if primary:
-                return primary
+    def begin_results(self, header_text, header_color="#2ecc71"):
+        self.result_model.set_message(header_text, header_color)
+        self.result_model.sort_by(self.sort_combo.currentData())
+
+    def append_results(self, entries):
+        self.result_model.append(entries)
+
+    def on_sort_changed(self, _index):
+        self.result_model.sort_by(self.sort_combo.currentData())
+
+    def update_facets(self, screen):
+        # تعدادها از bitsetهای مدل نتایج می‌آیند؛ با هر تکه نتایج فقط متن چک‌باکس‌ها عوض می‌شود
+        counts = screen.result_model.facets.counts()
+        hidden = screen.result_model.hidden_types()
+        facet_list = screen.facet_list
+        facet_list.blockSignals(True)
+        if any(key not in counts for key in screen.facet_items):
+            # نتایج جدید: clear() آیتم‌های قبلی را حذف می‌کند و لیست از نو ساخته می‌شود
+            facet_list.clear()
+            screen.facet_items.clear()
+        for key, count in counts.items():
+            item = screen.facet_items.get(key)
+            if item is None:
+                item = screen.facet_items[key] = QListWidgetItem()
+                item.setData(Qt.UserRole, key)
+                item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+                item.setCheckState(Qt.Unchecked if key in hidden else Qt.Checked)
+                facet_list.addItem(item)
+            text = f"{key or self.t('facet_none')} ({count})"
+            if item.text() != text:
+                item.setText(text)
+        facet_list.blockSignals(False)
+        facet_list.setVisible(bool(counts))
+
+    def on_facet_toggled(self, screen):
+        model = screen.result_model
+        hidden = {key for key, item in screen.facet_items.items() if item.checkState() != Qt.Checked}
+        # نوع پنهانی که در نتایج فعلی نیست، برای جستجوهای بعدی پنهان می‌ماند
+        hidden.update(key for key in model.hidden_types() if key not in screen.facet_items)
+        model.set_hidden_types(hidden)
+
+    def run_live_search(self):
+        if self.current_screen != "search":
+            return
+        if self._active_task is not None:
+            self.cancel_search()
+            self.finish_search()
+
+        raw = {field: edit.text() for field, edit in self.input_map.items()}
+        # مثل جستجوی کامل در thread pool (بارگذاری فایل یا ساخت ایندکس رابط را قفل نمی‌کند)؛
+        # نتیجه فقط وقتی رسم می‌شود که نسل جستجو عوض نشده باشد
+        lookup = partial(live_lookup, self.engine, self.search_type, raw, self.lang, self.live_search)
+        self.start_task(raw, lookup)
+
+    def show_interchangeable(self, index=None):
+        if index is None:
+            index = self.output.currentIndex()
+        entry = index.data(EntryRole) if index.isValid() else None
+        if entry is None or None in (entry.d, entry.D, entry.B):
+            self.status_bar.showMessage(self.t("pick_result"), 5000)
+            return
+        if self._active_task is not None:
+            self.cancel_search()
+            self.finish_search()
+
+        values = (entry.d, entry.D, entry.B)
+        size = " × ".join(f"{v:g}" for v in values)
+        # با BEARING_SERVER این هم یک درخواست شبکه است؛ مثل بقیه جستجوها در thread pool اجرا می‌شود
+        lookup = partial(self.engine.interchangeable, values, self.lang, exclude=entry.model)
+        self.start_task({}, lookup, partial(self.on_interchange_started, entry.model, size))
+
+    def on_interchange_started(self, model, size, generation, status):
+        if generation != self.search_generation:
+            return
+        if status == "found":
+            self.begin_results(self.t("interchange_found").format(model=model, size=size))
+        elif status == "db_missing":
+            self.show_status(status)
+        else:
+            self.set_output_message(self.t("no_interchange").format(model=model, size=size), "#ff8a80")
 
-        if self.lang == "fa":
-            primary = self._get_by_keys(
-                item,
-                ["purpose", "description", "special_features"],
-                ["purpose", "description", "specialfeatures"],
-            )
-            if primary:
-                return primary
-
-        fallback = self._get_by_keys(
-            item,
-            [
-                "purpose",
-                "purpose_en",
-                "description",
-                "description_en",
-                "special_features",
-                "special_features_en",
-            ],
-            [
-                "purpose",
-                "purposeen",
-                "description",
-                "descriptionen",
-                "specialfeatures",
-                "specialfeaturesen",
-            ],
-        )
-        return fallback or ""
+    def cancel_search(self):
+        # جستجوی در حال اجرا لغو می‌شود و سیگنال‌های بعدی آن با شماره نسل قدیمی نادیده گرفته می‌شوند
+        self.search_generation += 1
+        if self._active_task is not None:
+            self._active_task.cancel()
+            self._active_task = None
 
     def check_result(self):
-        db_path = "DataBase/DataBase.json"
+        # جستجوی همزمان با تایپ که هنوز در انتظار debounce است نباید جستجوی کامل را لغو کند
+        self.live_timer.stop()
         self.check_btn.setEnabled(False)
         self.check_btn.setText(self.t("searching"))
-        QApplication.processEvents()
-
-        try:
-            if not os.path.exists(db_path):
-                self.set_output_message(self.t("db_missing"), "#ff8a80")
-                return
-
-            with open(db_path, "r", encoding="utf-8") as f:
-                raw_data = json.load(f)
-
-            if isinstance(raw_data, list):
-                items = raw_data
-            elif isinstance(raw_data, dict):
-                key = "bearings" if self.search_type == "bearing" else "housings"
-                items = raw_data.get(key, [])
-                if not items:
-                    items = next((v for v in raw_data.values() if isinstance(v, list)), [])
-            else:
-                items = []
-
-            if self.search_type == "bearing":
-                user_d = self.safe_float(self.input_map.get("d").text()) if self.input_map.get("d") else None
-                user_D = self.safe_float(self.input_map.get("D").text()) if self.input_map.get("D") else None
-                user_B = self.safe_float(self.input_map.get("B").text()) if self.input_map.get("B") else None
-                missing_input = any(v is None for v in (user_d, user_D, user_B))
-            else:
-                user_d = self.safe_float(self.input_map.get("d").text()) if self.input_map.get("d") else None
-                user_D = None
-                user_B = None
-                missing_input = user_d is None
-
-            if missing_input:
-                msg = self.t("enter_all") if self.search_type == "bearing" else self.t("enter_d")
-                self.set_output_message(msg, "#ffd180")
-                return
-
-            found_models = []
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-
-                d_val = self.safe_float(
-                    self._get_by_keys(
-                        item,
-                        exact_keys=["d"],
-                        normalized_keys=["inner_diameter", "inner", "di", "id", "innerdiameter"],
-                    )
-                )
-
-                if self.search_type == "bearing":
-                    D_val = self.safe_float(
-                        self._get_by_keys(
-                            item,
-                            exact_keys=["D"],
-                            normalized_keys=["outer_diameter", "outer", "od", "douter", "outerdiameter", "de"],
-                        )
-                    )
-                    B_val = self.safe_float(
-                        self._get_by_keys(
-                            item,
-                            exact_keys=["B", "b"],
-                            normalized_keys=["width", "w"],
-                        )
-                    )
-
-                    if d_val is None or D_val is None or B_val is None:
-                        continue
-
-                    if (
-                        abs(d_val - user_d) < 0.1
-                        and abs(D_val - user_D) < 0.1
-                        and abs(B_val - user_B) < 0.1
-                    ):
-                        model = self._get_by_keys(item, ["model", "Model"], ["model"]) or "N/A"
-                        desc = self._get_localized_desc(item)
-                        found_models.append((str(model), str(desc)))
-
-                elif self.search_type == "housing":
-                    if d_val is None:
-                        continue
-
-                    if abs(d_val - user_d) < 0.1:
-                        model = self._get_by_keys(item, ["model", "Model"], ["model"]) or "N/A"
-                        desc = self._get_localized_desc(item)
-                        found_models.append((str(model), str(desc)))
-
-            self.output.clear()
-            if found_models:
-                unique = sorted(set(found_models), key=lambda x: x[0])
-                header = QListWidgetItem(self.t("results_found"))
-                header.setForeground(QColor("#2ecc71"))
-                self.output.addItem(header)
-                for idx, (model, desc) in enumerate(unique):
-                    text = f"• {model} — {desc}" if desc else f"• {model}"
-                    item = QListWidgetItem(text)
-                    item.setForeground(QColor("#f1c40f"))
-                    self.output.addItem(item)
-                    if idx < len(unique) - 1:
-                        sep = QListWidgetItem("-" * 52)
-                        sep.setForeground(QColor("#95a5a6"))
-                        sep.setFlags(Qt.NoItemFlags)
-                        self.output.addItem(sep)
-            else:
-                self.set_output_message(self.t("not_found"), "#ff8a80")
-
-        except Exception as e:
-            self.set_output_message(f"{self.t('critical_error')}: {e}", "#ff8a80")
-        finally:
-            self.check_btn.setEnabled(True)
-            self.check_btn.setText(self.t("check"))
+
+        raw = {field: edit.text() for field, edit in self.input_map.items()}
+        self.start_task(raw)
+
+    def start_task(self, raw, lookup=None, on_started=None):
+        self.cancel_search()
+        self._last_search = (raw, lookup, on_started)
+        task = SearchTask(self.engine, self.search_generation, self.search_type, raw, self.lang, lookup=lookup)
+        task.signals.started.connect(on_started or self.on_search_started)
+        task.signals.chunk.connect(self.on_search_chunk)
+        task.signals.finished.connect(self.on_search_finished)
+        task.signals.failed.connect(self.on_search_failed)
+        task.signals.traced.connect(self.on_search_traced)
+        self._render_time = 0.0
+        self._active_task = task
+        self.search_pool.start(task)
+
+    def on_search_started(self, generation, status):
+        if generation == self.search_generation:
+            started = time.perf_counter()
+            self.show_status(status)
+            self._render_time += time.perf_counter() - started
+
+    def show_status(self, status):
+        if status == "idle":
+            self.result_model.clear()
+        elif status == "db_missing":
+            self.set_output_message(self.t("db_missing"), "#ff8a80")
+        elif status == "missing_input":
+            msg = {"bearing": "enter_all", "model": "enter_model"}.get(self.search_type, "enter_d")
+            self.set_output_message(self.t(msg), "#ffd180")
+        elif status == "found":
+            self.begin_results(self.t("results_found"))
+        elif status == "closest":
+            # حالت نزدیک‌ترین اندازه‌ها برای شفت ساییده یا اندازه‌گیری نادقیق
+            header = "closest_models" if self.search_type == "model" else "closest_found"
+            self.begin_results(self.t(header), "#ffd180")
+        else:
+            self.set_output_message(self.t("not_found"), "#ff8a80")
+
+    def on_search_chunk(self, generation, entries):
+        if generation == self.search_generation:
+            started = time.perf_counter()
+            self.append_results(entries)
+            self._render_time += time.perf_counter() - started
+
+    def on_search_traced(self, generation, trace):
+        if generation != self.search_generation:
+            return
+        trace.add("render", self._render_time)
+        write_trace(self.trace_log, trace)
+        self.status_bar.showMessage(trace.summary())
+
+    def on_search_finished(self, generation, status):
+        if generation == self.search_generation:
+            self.finish_search()
+
+    def on_search_failed(self, generation, message):
+        if generation != self.search_generation:
+            return
+        self.set_output_message(f"{self.t('critical_error')}: {message}", "#ff8a80")
+        self.finish_search()
+
+    def finish_search(self):
+        self._active_task = None
+        self.check_btn.setEnabled(True)
+        self.check_btn.setText(self.t("check"))
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
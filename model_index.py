@@ -0,0 +1,219 @@
+import bisect
+import re
+from array import array
+from collections import Counter
+
+from catalog import normalize_digits
+
+try:
+    import numpy as np
+except ImportError:  # بدون NumPy شمارش trigramها با Counter انجام می‌شود
+    np = None
+
+MAX_EDITS = 2
+_NOISE = re.compile(r"[^0-9A-Z.]")
+
+
+def normalize_model(text):
+    # "6204-2Z"، "6204 2z" و "۶۲۰۴-۲Z" همه به "62042Z" تبدیل می‌شوند؛ نقطه اعشار (618/1.5) حفظ می‌شود
+    if text is None:
+        return ""
+    return _NOISE.sub("", normalize_digits(str(text)).upper())
+
+
+def trigrams(key):
+    padded = f"$${key}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_edit_distance(a, b, limit):
+    # Levenshtein با خروج زودهنگام وقتی کمینه هر سطر از حد بیشتر شود
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        best = i
+        for j, cb in enumerate(b, 1):
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current.append(cost)
+            if cost < best:
+                best = cost
+        if best > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ModelIndex:
+    # آرایه مرتب کلیدهای نرمال‌شده نقش trie فشرده را دارد (بازه پیشوند با bisect)
+    # و ایندکس trigram کاندیدهای جستجوی تقریبی را می‌دهد
+    def __init__(self, pairs):
+        groups = {}
+        for model, handle in pairs:
+            key = normalize_model(model)
+            if key:
+                groups.setdefault(key, []).append(handle)
+
+        self.keys = sorted(groups)
+        self.handles = [groups[k] for k in self.keys]
+
+        postings = {}
+        for key_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array("I")
+                ids.append(key_id)
+        if np is not None:
+            postings = {gram: np.frombuffer(ids, dtype=np.uint32) for gram, ids in postings.items()}
+        self._postings = postings
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _position(self, key):
+        pos = bisect.bisect_left(self.keys, key)
+        return pos if pos < len(self.keys) and self.keys[pos] == key else None
+
+    def updated(self, removed, added):
+        # نسخه جدید با (model, handle)های حذف و اضافه شده؛ trigramها فقط برای کلیدهای جدید ساخته می‌شوند.
+        # شناسه هر کلید جایگاهش در ترتیب مرتب است، پس با کلید جدید/حذف شده شناسه‌های لیست‌ها جابه‌جا می‌شوند
+        touched = {}
+        for pairs, keep in ((removed, False), (added, True)):
+            for model, handle in pairs:
+                key = normalize_model(model)
+                if not key:
+                    continue
+                handles = touched.get(key)
+                if handles is None:
+                    pos = self._position(key)
+                    handles = touched[key] = list(self.handles[pos]) if pos is not None else []
+                if keep:
+                    handles.append(handle)
+                else:
+                    handles[:] = [h for h in handles if h is not handle]
+
+        dead = sorted(k for k, handles in touched.items() if not handles and self._position(k) is not None)
+        fresh = sorted(k for k, handles in touched.items() if handles and self._position(k) is None)
+        clone = ModelIndex.__new__(ModelIndex)
+        if not dead and not fresh:
+            # فقط ردیف‌های مدل‌های موجود عوض شده‌اند
+            clone.keys = self.keys
+            clone.handles = list(self.handles)
+            clone._postings = self._postings
+            for key, handles in touched.items():
+                if handles:
+                    clone.handles[self._position(key)] = handles
+            return clone
+        if np is None:
+            return None
+
+        count = len(self.keys)
+        dead_ids = np.array([self._position(k) for k in dead], dtype=np.int64)
+        at = np.array([bisect.bisect_left(self.keys, k) for k in fresh], dtype=np.int64)
+        old_ids = np.arange(count, dtype=np.int64)
+        new_ids = (old_ids - np.searchsorted(dead_ids, old_ids) + np.searchsorted(at, old_ids, side="right")).astype(
+            np.uint32
+        )
+
+        keys, handles = [], []
+        start = 0
+        for pos in dead_ids.tolist() + [count]:
+            keys.extend(self.keys[start:pos])
+            handles.extend(self.handles[start:pos])
+            start = pos + 1
+        clone.keys, clone.handles = [], []
+        start = 0
+        for key in fresh:
+            pos = bisect.bisect_left(keys, key, start)
+            clone.keys.extend(keys[start:pos])
+            clone.handles.extend(handles[start:pos])
+            clone.keys.append(key)
+            clone.handles.append(touched[key])
+            start = pos
+        clone.keys.extend(keys[start:])
+        clone.handles.extend(handles[start:])
+        for key, key_handles in touched.items():
+            if key_handles:
+                clone.handles[clone._position(key)] = key_handles
+
+        extra = {}
+        for key in fresh:
+            key_id = clone._position(key)
+            for gram in trigrams(key):
+                extra.setdefault(gram, []).append(key_id)
+        alive = None
+        if dead:
+            alive = np.ones(count, dtype=bool)
+            alive[dead_ids] = False
+        postings = {}
+        for gram, ids in self._postings.items():
+            if alive is not None:
+                ids = ids[alive[ids]]
+            ids = new_ids[ids]
+            more = extra.pop(gram, None)
+            if more:
+                ids = np.sort(np.concatenate((ids, np.array(more, dtype=np.uint32))))
+            if len(ids):
+                postings[gram] = ids
+        for gram, more in extra.items():
+            postings[gram] = np.array(sorted(more), dtype=np.uint32)
+        clone._postings = postings
+        return clone
+
+    def prefix_range(self, key):
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_left(self.keys, key + "\uffff", lo)
+        return lo, hi
+
+    def _fuzzy_candidates(self, key, max_edits, limit):
+        grams = trigrams(key)
+        # هر ویرایش حداکثر ۳ trigram را خراب می‌کند (q-gram lemma)
+        threshold = max(1, len(grams) - 3 * max_edits)
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if not lists:
+            return []
+
+        if np is not None:
+            counts = np.bincount(np.concatenate(lists), minlength=len(self.keys))
+            hits = np.flatnonzero(counts >= threshold)
+            if len(hits) > limit:
+                hits = hits[np.argpartition(-counts[hits], limit - 1)[:limit]]
+            return hits.tolist()
+
+        counts = Counter()
+        for ids in lists:
+            counts.update(ids)
+        return [key_id for key_id, count in counts.most_common(limit) if count >= threshold]
+
+    def search(self, query, limit=20, max_edits=MAX_EDITS):
+        key = normalize_model(query)
+        if not key:
+            return []
+
+        ranked = {}
+        lo, hi = self.prefix_range(key)
+        # پیشوندهای کوتاه‌تر (نزدیک‌تر به کد وارد شده) اول می‌آیند
+        for key_id in range(lo, min(hi, lo + limit * 50)):
+            ranked[key_id] = (0, len(self.keys[key_id]) - len(key), self.keys[key_id])
+
+        if len(ranked) < limit and max_edits > 0:
+            for key_id in self._fuzzy_candidates(key, max_edits, limit * 20):
+                if key_id in ranked:
+                    continue
+                candidate = self.keys[key_id]
+                # کدهایی که با حذف پسوند به پرس‌وجو می‌رسند هم تقریبی حساب می‌شوند
+                edits = min(
+                    bounded_edit_distance(key, candidate, max_edits),
+                    bounded_edit_distance(key, candidate[: len(key)], max_edits),
+                )
+                if edits <= max_edits:
+                    ranked[key_id] = (edits, abs(len(candidate) - len(key)), candidate)
+
+        order = sorted(ranked, key=ranked.get)[:limit]
+        return [(handle, ranked[key_id][0]) for key_id in order for handle in self.handles[key_id]]
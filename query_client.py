@@ -0,0 +1,144 @@
+import http.client
+import json
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from engine import ResultEntry, SearchResult
+from query_trace import NO_TRACE
+
+log = logging.getLogger("query_client")
+
+DEFAULT_PORT = 8765
+RETRY_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError)
+
+
+class QueryClient:
+    # برای هر thread یک اتصال keep-alive؛ اگر سرور اتصال بیکار را بسته باشد یک بار دوباره وصل می‌شود
+    def __init__(self, url, timeout=10.0):
+        parts = urlsplit(url if "://" in url else f"http://{url}")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or DEFAULT_PORT
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def _drop(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def request(self, method, path, payload=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in (0, 1):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except RETRY_ERRORS:
+                # همه درخواست‌ها فقط خواندنی هستند و تکرارشان بی‌خطر است
+                self._drop()
+                if attempt:
+                    raise
+        if (response.getheader("Connection") or "").lower() == "close":
+            self._drop()
+
+        result = json.loads(data.decode("utf-8"))
+        if response.status != 200:
+            raise RuntimeError(f"{self.host}:{self.port}: {result.get('error', response.reason)}")
+        return result
+
+    def close(self):
+        self._drop()
+
+
+class RemoteCatalog:
+    # کاتالوگ روی سرور است؛ بودن فایل و بارگذاری دوباره آن را سرور بررسی می‌کند
+    def __init__(self, client):
+        self.client = client
+        self.source = "server"
+        self.version = None
+        self.record_count = 0
+        self.load_stages = {}
+
+    def exists(self):
+        return True
+
+    def refresh(self):
+        return False
+
+    def stats(self):
+        return self.client.request("GET", "/stats")["catalog"]
+
+
+class RemoteEngine:
+    # همان رابط SearchEngine که MainWindow استفاده می‌کند، روی query_server.py
+    def __init__(self, url, timeout=10.0):
+        self.url = url
+        self.client = QueryClient(url, timeout)
+        self.catalog = RemoteCatalog(self.client)
+        log.info("searching through %s:%d", self.client.host, self.client.port)
+
+    def warm_up(self):
+        # اتصال keep-alive از همین حالا باز می‌شود
+        health = self.client.request("GET", "/health")
+        self.catalog.record_count = health.get("records", 0)
+        self.catalog.version = health.get("version")
+
+    def search(self, query, trace=NO_TRACE):
+        started = time.perf_counter()
+        data = self.client.request("POST", "/search", query)
+        elapsed = time.perf_counter() - started
+
+        server = {name: ms / 1000 for name, ms in (data.get("stages_ms") or {}).items()}
+        trace.update(server)
+        trace.add("network", max(0.0, elapsed - sum(server.values())))
+        trace.records = data.get("records", 0)
+        trace.matched = data.get("matched", 0)
+        trace.cache = data.get("cache")
+
+        entries = [
+            ResultEntry(
+                r["model"],
+                r["description"],
+                r.get("distance"),
+                r["d"],
+                r["D"],
+                r["B"],
+                r.get("alternatives"),
+                r.get("type"),
+            )
+            for r in data.get("results", ())
+        ]
+        result = SearchResult(data["status"], entries)
+        trace.status = result.status
+        trace.results = len(entries)
+        return result
+
+    def lookup_raw(self, search_type, raw, lang="fa", trace=NO_TRACE, **options):
+        return self.search(dict(raw, type=search_type, lang=lang, **options), trace)
+
+    def lookup_model(self, query, lang="fa", trace=NO_TRACE):
+        return self.lookup_raw("model", {"model": query}, lang, trace)
+
+    def lookup_partial(self, search_type, raw, lang="fa", live=None):
+        # نتایج مراحل قبل روی سرور نگه داشته می‌شوند؛ live محلی استفاده نمی‌شود
+        return self.lookup_raw(search_type, dict(raw, partial=True), lang)
+
+    def interchangeable(self, values, lang="fa", exclude=None):
+        d, D, B = values
+        query = {"type": "bearing", "interchange": True, "d": d, "D": D, "B": B, "exclude": exclude, "lang": lang}
+        return self.search(query)
+
+    def cache_stats(self):
+        return self.client.request("GET", "/stats")["cache"]
@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from catalog import DB_PATH, SEARCH_FIELDS
+from engine import RESULT_CACHE_SIZE, SEARCH_TYPES, IncrementalSearch, SearchEngine, open_catalog
+from query_trace import QueryTrace
+
+log = logging.getLogger("query_server")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_HEADER = 16 * 1024
+MAX_BODY = 64 * 1024
+OPTION_TYPES = {"tolerance": float, "nearest_k": int, "nearest_tolerance": float}
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def encode_response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("ascii") + body
+
+
+async def read_request(reader):
+    # None یعنی کلاینت اتصال را بین دو درخواست بست
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise HttpError(400, "incomplete request")
+    except asyncio.LimitOverrunError:
+        raise HttpError(400, "request header too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    if "transfer-encoding" in headers:
+        raise HttpError(400, "chunked request bodies are not supported")
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "invalid Content-Length")
+    if length > MAX_BODY:
+        raise HttpError(413, f"request body larger than {MAX_BODY} bytes")
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        raise HttpError(400, "incomplete request body")
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, target, body, keep_alive
+
+
+class QueryService:
+    # یک نسخه کاتالوگ و ایندکس‌ها برای همه کلاینت‌ها؛ جستجوها در thread pool با سقف همزمانی اجرا می‌شوند
+    def __init__(self, engine, max_inflight=4, pipeline_depth=16, max_connections=256):
+        self.engine = engine
+        self.max_inflight = max_inflight
+        self.pipeline_depth = pipeline_depth
+        self.max_connections = max_connections
+        self.connections = 0
+        self.requests = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_inflight, thread_name_prefix="query")
+        self._inflight = None
+        self._live = {search_type: IncrementalSearch(engine, search_type) for search_type in SEARCH_FIELDS}
+        self._live_lock = threading.Lock()
+
+    # --- درخواست‌ها (در thread pool اجرا می‌شوند) ---
+
+    def handle(self, method, target, body):
+        path, _, query_string = target.partition("?")
+        if path == "/health":
+            return self.health()
+        if path == "/stats":
+            return self.stats()
+        if path != "/search":
+            raise HttpError(404, f"unknown path: {path}")
+
+        if method == "GET":
+            query = dict(parse_qsl(query_string))
+        elif method == "POST":
+            try:
+                query = json.loads(body or b"{}")
+            except ValueError as e:
+                raise HttpError(400, f"invalid JSON: {e}")
+            if not isinstance(query, dict):
+                raise HttpError(400, "query must be a JSON object")
+        else:
+            raise HttpError(405, f"{method} not allowed")
+        return self.search(query)
+
+    def search(self, query):
+        search_type = query.get("type") or "bearing"
+        if search_type not in SEARCH_TYPES:
+            raise HttpError(400, f"unknown search type: {search_type}")
+        lang = query.get("lang") or "fa"
+        if not self.engine.catalog.exists():
+            return {"type": search_type, "status": "db_missing", "results": []}
+
+        options = {}
+        for name, cast in OPTION_TYPES.items():
+            if query.get(name) not in (None, ""):
+                try:
+                    options[name] = cast(query[name])
+                except (TypeError, ValueError):
+                    raise HttpError(400, f"invalid {name}: {query[name]!r}")
+
+        trace = QueryTrace(search_type, lang)
+        if query.get("interchange"):
+            values = self.engine.parse_dimensions("bearing", query)
+            if values is None:
+                raise HttpError(400, "interchange needs d, D and B")
+            result = self.engine.interchangeable(values, lang, query.get("exclude"))
+        elif query.get("partial") and search_type in SEARCH_FIELDS:
+            # IncrementalSearch امن برای چند thread نیست
+            with self._live_lock:
+                result = self.engine.lookup_partial(search_type, query, lang, self._live[search_type])
+        else:
+            result = self.engine.lookup_raw(search_type, query, lang, trace=trace, **options)
+
+        response = {"type": search_type}
+        response.update(result.to_dict())
+        response.update(
+            records=trace.records,
+            matched=trace.matched,
+            cache=trace.cache,
+            stages_ms={name: round(seconds * 1000, 3) for name, seconds in trace.stages.items()},
+        )
+        return response
+
+    def health(self):
+        catalog = self.engine.catalog
+        exists = catalog.exists()
+        if exists:
+            catalog.refresh()
+        return {
+            "status": "ok" if exists else "db_missing",
+            "records": catalog.record_count,
+            "version": catalog.version,
+            "source": catalog.source,
+        }
+
+    def stats(self):
+        return {
+            "catalog": self.engine.catalog.stats(),
+            "cache": self.engine.cache_stats(),
+            "connections": self.connections,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "max_inflight": self.max_inflight,
+            "pipeline_depth": self.pipeline_depth,
+        }
+
+    def _handle_encoded(self, method, target, body, keep_alive):
+        # JSON پاسخ هم در thread pool ساخته می‌شود تا حلقه asyncio آزاد بماند
+        return encode_response(200, self.handle(method, target, body), keep_alive)
+
+    # --- اتصال‌ها (در حلقه asyncio) ---
+
+    async def dispatch(self, method, target, body, keep_alive):
+        async with self._inflight:
+            self.requests += 1
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self._executor, self._handle_encoded, method, target, body, keep_alive
+                )
+            except HttpError as e:
+                return encode_response(e.status, {"error": e.message}, keep_alive)
+            except Exception as e:
+                log.exception("query failed: %s %s", method, target)
+                return encode_response(500, {"error": str(e)}, keep_alive)
+
+    async def send_responses(self, writer, pending):
+        # pipelining: پاسخ‌ها به همان ترتیب درخواست‌ها نوشته می‌شوند، هرچند موازی محاسبه شده باشند
+        closed = False
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            response, keep_alive = item
+            data = await response
+            if closed:
+                continue
+            try:
+                writer.write(data)
+                await writer.drain()
+            except ConnectionError:
+                closed = True
+            if not keep_alive:
+                closed = True
+
+    async def serve_client(self, reader, writer):
+        if self.connections >= self.max_connections:
+            self.rejected += 1
+            writer.write(encode_response(503, {"error": "too many connections"}, False))
+            await writer.drain()
+            writer.close()
+            return
+
+        self.connections += 1
+        loop = asyncio.get_running_loop()
+        # صف محدود: وقتی pipeline_depth درخواست در جریان است، خواندن درخواست بعدی صبر می‌کند
+        pending = asyncio.Queue(self.pipeline_depth)
+        sender = loop.create_task(self.send_responses(writer, pending))
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    failed = loop.create_future()
+                    failed.set_result(encode_response(e.status, {"error": e.message}, False))
+                    await pending.put((failed, False))
+                    break
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                await pending.put((loop.create_task(self.dispatch(method, target, body, keep_alive)), keep_alive))
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            await pending.put(None)
+            await sender
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        server = await asyncio.start_server(self.serve_client, host, port, limit=MAX_HEADER)
+        log.info("listening on http://%s:%d (%d records)", host, port, self.engine.catalog.record_count)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve bearing/housing/model queries over HTTP/JSON.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="bind address (default: localhost only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=os.environ.get("BEARING_CATALOG") or DB_PATH, help="catalog path")
+    parser.add_argument("--max-inflight", type=int, default=4, help="searches running at once")
+    parser.add_argument("--pipeline-depth", type=int, default=16, help="pipelined requests per connection")
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--cache-size", type=int, default=RESULT_CACHE_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    engine = SearchEngine(open_catalog(args.db), cache_size=args.cache_size)
+    # ایندکس‌ها پیش از پذیرفتن اولین اتصال ساخته می‌شوند
+    engine.warm_up()
+    service = QueryService(engine, args.max_inflight, args.pipeline_depth, args.max_connections)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import cProfile
+import io
+import itertools
+import json
+import logging
+import os
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+from logging.handlers import RotatingFileHandler
+
+log = logging.getLogger("query_trace")
+
+TRACE_PATH = os.path.join("logs", "query_trace.jsonl")
+PROFILE_DIR = os.path.join("logs", "profiles")
+TRACE_MAX_BYTES = 2 * 1024 * 1024
+TRACE_BACKUPS = 3
+
+_profile_ids = itertools.count(1)
+
+
+class QueryTrace:
+    # زمان هر مرحله یک جستجو (ثانیه) به ترتیب اجرا و شمار ردیف‌ها
+    def __init__(self, search_type, lang):
+        self.search_type = search_type
+        self.lang = lang
+        self.timestamp = time.time()
+        self.stages = {}
+        self.status = None
+        self.records = 0
+        self.matched = 0
+        self.results = 0
+        self.cache = None
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def update(self, stages):
+        for name, seconds in stages.items():
+            self.add(name, seconds)
+
+    def total(self):
+        return sum(self.stages.values())
+
+    def to_dict(self):
+        return {
+            "ts": round(self.timestamp, 3),
+            "type": self.search_type,
+            "lang": self.lang,
+            "status": self.status,
+            "records": self.records,
+            "matched": self.matched,
+            "results": self.results,
+            "cache": self.cache,
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            "total_ms": round(self.total() * 1000, 3),
+        }
+
+    def summary(self):
+        stages = "  ·  ".join(f"{name} {seconds * 1000:.2f} ms" for name, seconds in self.stages.items())
+        if self.cache == "hit":
+            return f"{stages}  |  total {self.total() * 1000:.2f} ms  |  cache hit  |  {self.results} results"
+        return f"{stages}  |  total {self.total() * 1000:.2f} ms  |  {self.matched} / {self.records} records"
+
+
+class _NoTrace:
+    # وقتی کسی زمان‌ها را نمی‌خواهد (خط فرمان، جستجوی همزمان با تایپ) هزینه‌ای ندارد
+    def stage(self, name):
+        return nullcontext()
+
+    def add(self, name, seconds):
+        pass
+
+    def update(self, stages):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NO_TRACE = _NoTrace()
+
+
+def open_trace_log(path=TRACE_PATH, max_bytes=TRACE_MAX_BYTES, backups=TRACE_BACKUPS):
+    # هر جستجو یک خط JSON؛ با رسیدن به max_bytes فایل چرخانده می‌شود (query_trace.jsonl.1 ...)
+    path = os.environ.get("BEARING_TRACE", path)
+    logger = logging.getLogger("query_trace.jsonl")
+    logger.propagate = False
+    if path and not logger.handlers:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+def write_trace(logger, trace):
+    if logger.handlers:
+        logger.info(json.dumps(trace.to_dict(), ensure_ascii=False))
+
+
+def profiling_enabled():
+    return os.environ.get("BEARING_PROFILE", "").lower() not in ("", "0", "false", "no")
+
+
+def run_profiled(name, func, *args, **kwargs):
+    # BEARING_PROFILE=1: جستجو زیر cProfile اجرا و آمار در logs/profiles ذخیره می‌شود (قابل باز کردن با pstats/snakeviz)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{next(_profile_ids)}-{name}.prof")
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(15)
+        log.info("profile written to %s\n%s", path, out.getvalue())
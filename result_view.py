@@ -0,0 +1,216 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QKeySequence, QPen
+from PyQt5.QtWidgets import QApplication, QListView, QStyledItemDelegate
+
+from facets import TypeFacets
+
+ENTRY_COLOR = QColor("#f1c40f")
+SEPARATOR_COLOR = QColor("#95a5a6")
+
+# کلیدهای مرتب‌سازی؛ "relevance" همان ترتیب خروجی موتور جستجو است
+SORT_KEYS = {
+    "relevance": None,
+    "model": lambda e: (e.model, e.desc),
+    "d": lambda e: (e.d is None, e.d or 0.0, e.model),
+    "D": lambda e: (e.D is None, e.D or 0.0, e.model),
+    "B": lambda e: (e.B is None, e.B or 0.0, e.model),
+}
+
+EntryRole = Qt.UserRole + 1
+SeparatorRole = Qt.UserRole + 2
+
+
+def entry_text(entry):
+    text = f"• {entry.model} — {entry.desc}" if entry.desc else f"• {entry.model}"
+    if entry.distance is not None:
+        text += f"  (Δ {entry.distance:.2f} mm)"
+    if entry.alternatives:
+        # تعداد مدل‌های جایگزین با همان d/D/B
+        text += f"  ⇄ {entry.alternatives}"
+    return text
+
+
+class ResultListModel(QAbstractListModel):
+    # مدل روی آرایه خام نتایج؛ ردیف‌ها به‌تدریج با fetchMore به view داده می‌شوند
+    # تعداد نتایج هر نوع تغییر کرده است (نتایج جدید یا جستجوی تازه)
+    facets_changed = pyqtSignal()
+
+    def __init__(self, parent=None, batch_size=200):
+        super().__init__(parent)
+        self.batch_size = batch_size
+        self._header = None
+        self._entries = []
+        self._order = []
+        self._loaded = 0
+        self._sort_key = "relevance"
+        self.facets = TypeFacets()
+        # نوع‌های پنهان بین جستجوهای یک صفحه حفظ می‌شوند
+        self._hidden = frozenset()
+
+    def _offset(self):
+        return 1 if self._header is not None else 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._offset() + self._loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._order)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self._order) - self._loaded)
+        if count <= 0:
+            return
+        first = self._offset() + self._loaded
+        self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def entry(self, row):
+        pos = row - self._offset()
+        if 0 <= pos < self._loaded:
+            return self._entries[self._order[pos]]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if row == 0 and self._header is not None:
+            text, color = self._header
+            if role == Qt.DisplayRole:
+                return text
+            if role == Qt.ForegroundRole:
+                return QColor(color)
+            return None
+
+        entry = self.entry(row)
+        if entry is None:
+            return None
+        if role == Qt.DisplayRole:
+            return entry_text(entry)
+        if role == Qt.ForegroundRole:
+            return ENTRY_COLOR
+        if role == EntryRole:
+            return entry
+        if role == SeparatorRole:
+            return row - self._offset() < len(self._order) - 1
+        return None
+
+    def set_message(self, text, color):
+        self.beginResetModel()
+        self._header = (text, color)
+        self._entries = []
+        self._order = []
+        self._loaded = 0
+        self.facets.clear()
+        self.endResetModel()
+        self.facets_changed.emit()
+
+    def clear(self):
+        self.beginResetModel()
+        self._header = None
+        self._entries = []
+        self._order = []
+        self._loaded = 0
+        self.facets.clear()
+        self.endResetModel()
+        self.facets_changed.emit()
+
+    def append(self, entries):
+        # نتایج تکه‌تکه از worker می‌رسند؛ فقط آرایه خام بزرگ می‌شود و view با fetchMore ردیف می‌گیرد
+        if not entries:
+            return
+        start = len(self._entries)
+        self._entries.extend(entries)
+        self.facets.add(entries)
+        if SORT_KEYS[self._sort_key] is None:
+            self._order.extend(self.facets.visible(self._hidden, start))
+            if self._loaded:
+                last = self.index(self._offset() + self._loaded - 1)
+                self.dataChanged.emit(last, last, [SeparatorRole])
+        else:
+            self._resort()
+        # صفحه اول بلافاصله نمایش داده می‌شود؛ بقیه وقتی view به انتهای لیست برسد
+        if self._loaded < self.batch_size:
+            self.fetchMore()
+        self.facets_changed.emit()
+
+    def hidden_types(self):
+        return self._hidden
+
+    def set_hidden_types(self, types):
+        # فیلتر نوع فقط آرایه اندیس‌ها را از روی bitsetها دوباره می‌سازد؛ لیست از صفحه اول نمایش داده می‌شود
+        hidden = frozenset(types)
+        if hidden == self._hidden:
+            return
+        self.beginResetModel()
+        self._hidden = hidden
+        self._order = self._ordered()
+        self._loaded = 0
+        self.endResetModel()
+        self.fetchMore()
+
+    def sort_by(self, key):
+        self._sort_key = key if key in SORT_KEYS else "relevance"
+        self._resort()
+
+    def _resort(self):
+        # فقط آرایه اندیس‌ها جابه‌جا می‌شود؛ هیچ آیتمی دوباره ساخته نمی‌شود
+        self.layoutAboutToBeChanged.emit()
+        offset = self._offset()
+        persistent = self.persistentIndexList()
+        moved = [self._order[i.row() - offset] if i.row() >= offset else None for i in persistent]
+
+        self._order = self._ordered()
+
+        # انتخاب کاربر بعد از مرتب‌سازی روی همان نتایج باقی می‌ماند
+        if persistent:
+            position = {entry_id: pos for pos, entry_id in enumerate(self._order)}
+            targets = []
+            for index, entry_id in zip(persistent, moved):
+                if entry_id is None:
+                    targets.append(index)
+                    continue
+                pos = position[entry_id]
+                targets.append(self.index(pos + offset) if pos < self._loaded else QModelIndex())
+            self.changePersistentIndexList(persistent, targets)
+        self.layoutChanged.emit()
+
+    def _ordered(self):
+        key = SORT_KEYS[self._sort_key]
+        order = self.facets.visible(self._hidden)
+        if key is None:
+            return list(order)
+        entries = self._entries
+        return sorted(order, key=lambda i: key(entries[i]))
+
+    def texts(self, rows):
+        return [self.data(self.index(row), Qt.DisplayRole) for row in sorted(rows)]
+
+
+class SeparatorDelegate(QStyledItemDelegate):
+    # به‌جای آیتم‌های جداکننده جدا، یک خط زیر هر نتیجه کشیده می‌شود
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        if index.data(SeparatorRole):
+            painter.save()
+            painter.setPen(QPen(SEPARATOR_COLOR, 1, Qt.DashLine))
+            rect = option.rect
+            painter.drawLine(rect.left() + 8, rect.bottom(), rect.right() - 8, rect.bottom())
+            painter.restore()
+
+
+class ResultListView(QListView):
+    def keyPressEvent(self, event):
+        # کپی همه ردیف‌های انتخاب شده (نه فقط ردیف جاری) با Ctrl+C
+        if event.matches(QKeySequence.Copy) and self.model() is not None:
+            rows = {index.row() for index in self.selectionModel().selectedIndexes()}
+            if rows:
+                QApplication.clipboard().setText("\n".join(self.model().texts(rows)))
+                event.accept()
+                return
+        super().keyPressEvent(event)
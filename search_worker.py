@@ -0,0 +1,93 @@
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from query_trace import QueryTrace, profiling_enabled, run_profiled
+
+
+class SearchSignals(QObject):
+    # همه سیگنال‌ها شماره نسل جستجو را دارند تا نتایج جستجوهای قدیمی نادیده گرفته شوند
+    started = pyqtSignal(int, str)
+    chunk = pyqtSignal(int, list)
+    finished = pyqtSignal(int, str)
+    failed = pyqtSignal(int, str)
+    # QueryTrace پیش از finished فرستاده می‌شود تا زمان رسم نتایج هم به آن اضافه شود
+    traced = pyqtSignal(int, object)
+
+
+def live_lookup(engine, search_type, raw, lang, live):
+    # جستجوی همزمان با تایپ (در thread جستجو)؛ None یعنی هنوز فیلدی پر نشده و لیست خالی می‌شود
+    if search_type == "model":
+        query = raw["model"].strip()
+        return engine.lookup_model(query, lang) if query else None
+    if raw["keywords"].strip():
+        # کلمات کلیدی همراه با ابعاد پر شده؛ همان مسیر (و cache) جستجوی کامل
+        return engine.lookup_raw(search_type, raw, lang)
+    result = engine.lookup_partial(search_type, raw, lang, live)
+    return None if result.status == "missing_input" else result
+
+
+class SearchTask(QRunnable):
+    def __init__(self, engine, generation, search_type, raw, lang, chunk_size=100, lookup=None):
+        super().__init__()
+        self.engine = engine
+        self.generation = generation
+        self.search_type = search_type
+        self.raw = raw
+        self.lang = lang
+        self.chunk_size = chunk_size
+        # lookup جایگزین جستجوی کامل (مثلاً جستجوی همزمان با تایپ)؛ برای آن trace ثبت نمی‌شود
+        self.lookup = lookup
+        self.signals = SearchSignals()
+        self._cancelled = threading.Event()
+        self.setAutoDelete(True)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        status = "cancelled"
+        trace = QueryTrace(self.search_type, self.lang)
+        try:
+            if self.cancelled:
+                return
+            if not self.engine.catalog.exists():
+                status = trace.status = "db_missing"
+                self.signals.started.emit(self.generation, status)
+                return
+
+            if self.lookup is not None:
+                result = self.lookup()
+                if result is None:
+                    status = "idle"
+                    self.signals.started.emit(self.generation, status)
+                    return
+            elif profiling_enabled():
+                result = run_profiled(
+                    self.search_type, self.engine.lookup_raw, self.search_type, self.raw, self.lang, trace=trace
+                )
+            else:
+                result = self.engine.lookup_raw(self.search_type, self.raw, self.lang, trace=trace)
+            if self.cancelled:
+                return
+
+            self.signals.started.emit(self.generation, result.status)
+            entries = result.entries
+            with trace.stage("emit"):
+                for start in range(0, len(entries), self.chunk_size):
+                    if self.cancelled:
+                        return
+                    self.signals.chunk.emit(self.generation, entries[start : start + self.chunk_size])
+            status = result.status
+        except Exception as e:
+            status = trace.status = "failed"
+            self.signals.failed.emit(self.generation, str(e))
+        finally:
+            if status != "cancelled" and self.lookup is None:
+                self.signals.traced.emit(self.generation, trace)
+            if status != "failed":
+                self.signals.finished.emit(self.generation, status)
@@ -0,0 +1,72 @@
+import logging
+import time
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+log = logging.getLogger("startup")
+
+
+class StartupSignals(QObject):
+    image_loaded = pyqtSignal(QImage)
+    warmed = pyqtSignal(float)
+    failed = pyqtSignal(str)
+
+
+class ImageLoadTask(QRunnable):
+    # QImage (برخلاف QPixmap) در thread غیر اصلی قابل استفاده است؛ decode فایل JPEG اینجا انجام می‌شود
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.signals = StartupSignals()
+
+    def run(self):
+        image = QImage(self.path)
+        if image.isNull():
+            self.signals.failed.emit(f"cannot decode {self.path}")
+        else:
+            self.signals.image_loaded.emit(image)
+
+
+class WarmUpTask(QRunnable):
+    # بارگذاری کاتالوگ و ساخت ایندکس‌ها در پس‌زمینه تا اولین جستجو منتظر نماند
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self.signals = StartupSignals()
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            self.engine.warm_up()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.warmed.emit(time.perf_counter() - started)
+
+
+class ScaledBackground:
+    # برای هر اندازه پنجره فقط یک بار تصویر مقیاس داده می‌شود
+    def __init__(self, capacity=4):
+        self.capacity = capacity
+        self.image = None
+        self._cache = OrderedDict()
+
+    def set_image(self, image):
+        self.image = image
+        self._cache.clear()
+
+    def pixmap(self, size):
+        if self.image is None or size.isEmpty():
+            return None
+        key = (size.width(), size.height())
+        pixmap = self._cache.get(key)
+        if pixmap is None:
+            scaled = self.image.scaled(QSize(*key), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            pixmap = self._cache[key] = QPixmap.fromImage(scaled)
+            if len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return pixmap
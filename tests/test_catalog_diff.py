@@ -0,0 +1,143 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import model_index  # noqa: E402
+import text_index  # noqa: E402
+from benchmark import synthetic_records  # noqa: E402
+from catalog import FAMILIES_FILE, SEARCH_FIELDS, CatalogStore, DimensionIndex  # noqa: E402
+from catalog_diff import _text_documents  # noqa: E402
+from interchange import InterchangeIndex  # noqa: E402
+
+RECORDS = 3000
+
+
+def edited(records):
+    # حذف، تغییر ابعاد/توضیحات و افزودن چند مدل؛ کمتر از REBUILD_FRACTION تا به‌روزرسانی تکه‌ای انجام شود
+    records = [dict(r) for r in records]
+    kept = [r for i, r in enumerate(records) if i % 97 != 5]
+    for i, record in enumerate(kept):
+        if i % 89 == 3:
+            record["desc_en"] = f"changed {i}"
+        if i % 83 == 7:
+            for key in ("d", "inner_diameter", "bore", "shaft_diameter"):
+                if key in record:
+                    record[key] = 77
+    added = []
+    for i, record in enumerate(synthetic_records(40, seed=99)):
+        record["model"] = f"NEW {i:03d} {record['model']}"
+        added.append(record)
+    # یک مدل تکراری با همان ابعاد ردیف قبلی، تا گروه جایگزین موجود هم تغییر کند
+    twin = dict(kept[10])
+    twin["model"] = "NEW TWIN"
+    return kept + added + [twin]
+
+
+class CatalogDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "catalog.json")
+        shutil.copy(os.path.join(ROOT, "DataBase", FAMILIES_FILE), os.path.join(self.folder, FAMILIES_FILE))
+        self.records = list(synthetic_records(RECORDS))
+        self.write(self.records)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, records):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+        # mtime ثانیه‌ای ممکن است یکسان بماند؛ اندازه یا زمان جدید تغییر را قطعی می‌کند
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def reloaded(self):
+        store = CatalogStore(self.path, use_artifact=False)
+        store.warm_up()
+        previous = store._snapshot
+        before = {key: self.state(key, index) for key, index in previous.indexes.items()}
+        self.write(edited(self.records))
+        store.refresh()
+        self.assertTrue(store.last_update["incremental"])
+        self.assertGreater(store.last_update["inserted"], 0)
+        self.assertGreater(store.last_update["changed"], 0)
+        self.assertGreater(store.last_update["deleted"], 0)
+        # snapshot قبلی برای جستجوهای در جریان دست نخورده می‌ماند
+        self.assertEqual(before, {key: self.state(key, index) for key, index in previous.indexes.items()})
+        return store
+
+    def state(self, key, index):
+        if isinstance(index, DimensionIndex):
+            columns = index._columns
+            return (
+                [id(r) for r in index._rows],
+                list(index._keys),
+                None if columns is None else [c.tolist() for c in columns],
+            )
+        if isinstance(index, InterchangeIndex):
+            return index.row_count, {k: sorted(map(id, rows)) for k, rows in index._buckets.items()}
+        if isinstance(index, model_index.ModelIndex):
+            postings = {gram: list(map(int, ids)) for gram, ids in index._postings.items()}
+            return index.keys, [sorted(map(id, handles)) for handles in index.handles], postings
+        return index.doc_count, index.terms, list(index._ids), list(index._offsets)
+
+    def fresh(self, store, key):
+        # همان ایندکس از صفر روی ردیف‌های snapshot جدید
+        if key == "model":
+            return model_index.ModelIndex((r.model, r) for r in store.all_rows())
+        if key == "interchange":
+            return InterchangeIndex(store.rows("bearing"))
+        if isinstance(key, tuple) and key[0] == "text":
+            rows = next(rows for rows in store.sections().values() if id(rows) == key[1])
+            return text_index.TextIndex(_text_documents(rows))
+        if isinstance(key, tuple):
+            search_type, field = key
+            return DimensionIndex(store.rows(search_type), (field,), SEARCH_FIELDS[search_type])
+        index = DimensionIndex(store.rows(key), SEARCH_FIELDS[key])
+        index.columns()
+        return index
+
+    def check_indexes(self, store):
+        indexes = store._snapshot.indexes
+        kinds = {type(index) for index in indexes.values()}
+        self.assertIn(DimensionIndex, kinds)
+        self.assertIn(model_index.ModelIndex, kinds)
+        self.assertIn(InterchangeIndex, kinds)
+        self.assertIn(text_index.TextIndex, kinds)
+        for key, index in indexes.items():
+            with self.subTest(index=key):
+                self.assertEqual(self.state(key, index), self.state(key, self.fresh(store, key)))
+
+    def test_incremental_indexes_match_fresh_build(self):
+        store = self.reloaded()
+        self.assertIn("interchange", store._snapshot.indexes)
+        self.check_indexes(store)
+
+        # ردیف‌های snapshot جدید همان ردیف‌های فایل جدید هستند (ترتیب ممکن است فرق کند)
+        rebuilt = CatalogStore(self.path, use_artifact=False)
+        for name, rows in store.sections().items():
+            self.assertCountEqual([repr(r) for r in rows], [repr(r) for r in rebuilt.rows(name)])
+        for query in ("NEW 001", "NEW TWIN", "changed", "77"):
+            self.assertEqual(
+                sorted(map(repr, (r for r, *_ in store.model_search(query)))),
+                sorted(map(repr, (r for r, *_ in rebuilt.model_search(query)))),
+            )
+
+    def test_without_numpy_indexes_are_rebuilt(self):
+        with mock.patch.object(model_index, "np", None), mock.patch.object(text_index, "np", None):
+            store = self.reloaded()
+            # بدون NumPy ایندکس‌های متنی و مدل کنار می‌روند و در اولین استفاده از صفر ساخته می‌شوند
+            self.assertNotIn("model", store._snapshot.indexes)
+            store.warm_up()
+            self.check_indexes(store)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmark import synthetic_records  # noqa: E402
+from catalog import FAMILIES_FILE, SEARCH_FIELDS, CatalogRow, CatalogStore  # noqa: E402
+from catalog_sqlite import TYPE_FILTER, SqliteCatalogStore, import_json  # noqa: E402
+
+RECORDS = 4000
+
+
+def values(row):
+    return tuple(getattr(row, field) for field in CatalogRow.__slots__)
+
+
+def row_set(rows):
+    # ترتیب جستجوی ابعادی بین دو backend فرق دارد؛ مقادیر None هم در مقایسه مرتب‌سازی نمی‌شوند
+    return sorted(map(values, rows), key=repr)
+
+
+def ranked(pairs):
+    return [(values(row), round(dist, 9)) for row, dist in pairs]
+
+
+class TypeFilterTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        json_path = os.path.join(cls.folder, "catalog.json")
+        shutil.copy(os.path.join(ROOT, "DataBase", FAMILIES_FILE), os.path.join(cls.folder, FAMILIES_FILE))
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(list(synthetic_records(RECORDS)), f, ensure_ascii=False)
+        cls.memory = CatalogStore(json_path, use_artifact=False)
+        cls.memory.refresh()
+        cls.sqlite = SqliteCatalogStore(import_json(json_path, os.path.join(cls.folder, "catalog.sqlite")))
+        cls.sqlite.refresh()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sqlite.close()
+        shutil.rmtree(cls.folder, ignore_errors=True)
+
+    def samples(self, search_type, count=40):
+        rng = random.Random(search_type)
+        fields = SEARCH_FIELDS[search_type]
+        rows = [r for r in self.memory.rows(search_type) if all(getattr(r, f) is not None for f in fields)]
+        all_types = sorted({r.type for r in rows if r.type})
+        for row in rng.sample(rows, count):
+            # نوع خود ردیف، چند نوع تصادفی، نوعی که وجود ندارد و مجموعه خالی
+            for types in (None, {row.type}, set(rng.sample(all_types, 3)), {"no_such_type"}, set()):
+                yield row, types
+
+    def test_search(self):
+        for search_type, fields in SEARCH_FIELDS.items():
+            for row, types in self.samples(search_type):
+                query = tuple(getattr(row, f) for f in fields)
+                with self.subTest(search_type=search_type, query=query, types=types):
+                    expected = row_set(self.memory.search(search_type, query, types=types))
+                    self.assertEqual(expected, row_set(self.sqlite.search(search_type, query, types=types)))
+                    if types is None:
+                        self.assertTrue(expected)
+
+    def test_field_search(self):
+        for search_type, fields in SEARCH_FIELDS.items():
+            for row, types in self.samples(search_type, 20):
+                for field in fields:
+                    value = getattr(row, field)
+                    with self.subTest(search_type=search_type, field=field, value=value, types=types):
+                        self.assertEqual(
+                            row_set(self.memory.field_search(search_type, field, value, types=types)),
+                            row_set(self.sqlite.field_search(search_type, field, value, types=types)),
+                        )
+
+    def test_nearest(self):
+        for search_type, fields in SEARCH_FIELDS.items():
+            for row, types in self.samples(search_type, 20):
+                query = tuple(getattr(row, f) + 0.7 for f in fields)
+                with self.subTest(search_type=search_type, query=query, types=types):
+                    self.assertEqual(
+                        ranked(self.memory.nearest(search_type, query, types=types)),
+                        ranked(self.sqlite.nearest(search_type, query, types=types)),
+                    )
+
+    def test_text_search(self):
+        for search_type in SEARCH_FIELDS:
+            for query in ("rubber", "seal*", "2Z"):
+                for types in (None, {"bearing", "housing"}, {"no_such_type"}):
+                    with self.subTest(search_type=search_type, query=query, types=types):
+                        self.assertEqual(
+                            row_set(self.memory.text_search(search_type, query, types=types)),
+                            row_set(self.sqlite.text_search(search_type, query, types=types)),
+                        )
+
+    def test_section_filters_use_index(self):
+        for sql, params in (
+            (f"SELECT id FROM rows AS r WHERE r.section = ? AND {TYPE_FILTER}", ["bearing", json.dumps(["bearing"])]),
+            ("SELECT id, model FROM rows WHERE section = ? ORDER BY id", ["bearing"]),
+        ):
+            plan = self.sqlite._conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+            self.assertTrue(any("rows_section_type" in detail for *_, detail in plan), plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
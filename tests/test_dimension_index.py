@@ -0,0 +1,144 @@
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import DEFAULT_TOLERANCE, SEARCH_FIELDS, CatalogRow, CatalogStore, DimensionIndex  # noqa: E402
+from engine import IncrementalSearch, SearchEngine  # noqa: E402
+
+TOL = DEFAULT_TOLERANCE
+EPS = 1e-9
+# مرز پنجره: داخل، دقیقاً روی tolerance و کمی بیرون از آن
+OFFSETS = (0.0, TOL - EPS, -(TOL - EPS), TOL, -TOL, TOL + EPS, -(TOL + EPS))
+# مقادیر تکراری و نزدیک به هم تا چند ردیف یک کلید داشته باشند و مرزها روی ردیف‌های واقعی بیفتند؛
+# فاصله 0.1/0.2 و 0.15/0.25 در float دقیقاً برابر tolerance است (برای مقادیر بزرگ‌تر چنین جفتی وجود ندارد)
+COMMON = (0.1, 0.15, 0.2, 0.25, 10.0, 10.05, 10.1, 20.0999, 47.0)
+GRID = (0.1, 0.15, 0.2, 0.25, 10.1)
+
+
+def make_rows(count, seed=3):
+    rng = random.Random(seed)
+
+    def value():
+        roll = rng.random()
+        if roll < 0.05:
+            return None
+        if roll < 0.6:
+            return rng.choice(COMMON)
+        return round(rng.uniform(1, 60), rng.choice((0, 1, 2, 4)))
+
+    return [
+        CatalogRow(value(), value(), value(), None, None, f"M{i:05d}", "bearing", "", "", "") for i in range(count)
+    ]
+
+
+def scan(rows, fields, query, tolerance=TOL):
+    # همان پیمایش خطی قبلی: ردیف‌هایی که همه فیلدهای لازم را دارند و هر فیلد پرسیده شده در پنجره است
+    return [
+        r
+        for r in rows
+        if all(getattr(r, f) is not None for f in fields)
+        and all(abs(getattr(r, f) - v) < tolerance for f, v in query)
+    ]
+
+
+def ids(rows):
+    return sorted(map(id, rows))
+
+
+def queries(rows, fields, count, seed=5):
+    rng = random.Random(seed)
+    usable = [r for r in rows if all(getattr(r, f) is not None for f in fields)]
+    for row in rng.sample(usable, count):
+        # هر فیلد همه جابه‌جایی‌های مرزی را می‌بیند، با ترکیب تصادفی برای بقیه فیلدها
+        columns = [OFFSETS] + [rng.sample(OFFSETS, len(OFFSETS)) for _ in fields[1:]]
+        for offsets in zip(*columns):
+            yield tuple((f, getattr(row, f) + o) for f, o in zip(fields, offsets))
+    for values in itertools.product(GRID, repeat=len(fields)):
+        yield tuple(zip(fields, values))
+
+
+class DimensionIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_rows(1000)
+
+    def check(self, index, rows, fields, tolerance=TOL):
+        for query in queries(rows, fields, 30):
+            expected = scan(rows, fields, query, tolerance)
+            self.assertEqual(ids(index.query([v for _, v in query], tolerance)), ids(expected), (query, tolerance))
+
+    def test_query_matches_linear_scan(self):
+        for search_type, fields in SEARCH_FIELDS.items():
+            index = DimensionIndex(self.rows, fields)
+            self.check(index, self.rows, fields)
+            self.check(index, self.rows, fields, tolerance=0.05)
+
+    def test_field_index_matches_linear_scan(self):
+        fields = SEARCH_FIELDS["bearing"]
+        for field in fields:
+            index = DimensionIndex(self.rows, (field,), fields)
+            for query in queries(self.rows, fields, 30):
+                item = [q for q in query if q[0] == field]
+                self.assertEqual(ids(index.query([item[0][1]])), ids(scan(self.rows, fields, item)), item)
+
+    def test_updated_matches_linear_scan(self):
+        fields = SEARCH_FIELDS["bearing"]
+        rng = random.Random(9)
+        index = DimensionIndex(self.rows, fields)
+        index.columns()
+        removed = rng.sample(self.rows, 150)
+        added = make_rows(150, seed=11)
+        # ردیف‌های جدید با همان کلید ردیف‌های قبلی (ترتیب پایدار کلیدهای تکراری)
+        added += [CatalogRow(r.d, r.D, r.B, None, None, r.model + "b", "bearing", "", "", "") for r in removed[:50]]
+        gone = set(map(id, removed))
+        rows = [r for r in self.rows if id(r) not in gone] + added
+
+        updated = index.updated(removed, added)
+        self.check(updated, rows, fields)
+        fresh = DimensionIndex(rows, fields)
+        self.assertEqual(list(updated._keys), list(fresh._keys))
+        self.assertEqual([c.tolist() for c in updated.columns()], [c.tolist() for c in fresh.columns()])
+        # نسخه قبلی دست نخورده می‌ماند
+        self.check(index, self.rows, fields)
+
+
+class IncrementalSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        path = os.path.join(self.folder, "catalog.json")
+        self.source = make_rows(1000)
+        records = [{"type": r.type, "model": r.model, "d": r.d, "D": r.D, "B": r.B} for r in self.source]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        self.engine = SearchEngine(CatalogStore(path, use_artifact=False), cache_size=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_narrowing_matches_linear_scan(self):
+        fields = SEARCH_FIELDS["bearing"]
+        rows = self.engine.catalog.rows("bearing")
+        live = IncrementalSearch(self.engine, "bearing")
+        sources = set()
+        for query in queries(rows, fields, 30):
+            # تایپ فیلد به فیلد، پاک کردن یکی و تایپ دوباره؛ هر مرحله با پیمایش کامل مقایسه می‌شود
+            steps = [query[:1], query[:2], query, query[1:], query[:1] + query[2:], query]
+            for step in steps:
+                raw = {f: "" for f in fields}
+                raw.update((f, repr(v)) for f, v in step)
+                # مرجع همان مقادیری است که از متن فیلدها خوانده شده‌اند (safe_float نماد علمی را نمی‌پذیرد)
+                parsed = live.parse(raw)
+                self.assertEqual(ids(live.update(raw)), ids(scan(rows, fields, parsed)), parsed)
+                sources.add(live.last_source)
+        self.assertEqual(sources, {"index", "narrow", "cache"})
+
+
+if __name__ == "__main__":
+    unittest.main()
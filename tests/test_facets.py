@@ -0,0 +1,188 @@
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import sip  # noqa: E402
+from PyQt5.QtCore import Qt  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QListWidget  # noqa: E402
+
+import main  # noqa: E402
+from engine import ResultEntry  # noqa: E402
+from facets import NO_TYPE, TypeFacets, entry_type  # noqa: E402
+from result_view import ResultListModel  # noqa: E402
+
+TYPES = ("bearing", "tapered_roller", "housing", "lock_nut", None)
+
+app = QApplication.instance() or QApplication([])
+
+
+def make_entries(count, seed=0, prefix="M"):
+    rng = random.Random(seed)
+    return [
+        ResultEntry(f"{prefix}{i:05d}", "", None, rng.uniform(5, 50), None, None, None, rng.choice(TYPES))
+        for i in range(count)
+    ]
+
+
+def chunks(entries, sizes=(37, 200, 513, 1)):
+    # اندازه تکه‌ها مضرب ۸ نیستند تا مرز بایت‌های bitset هم بررسی شود
+    start = 0
+    for size in sizes:
+        yield entries[start : start + size]
+        start += size
+    if start < len(entries):
+        yield entries[start:]
+
+
+def loaded(model):
+    # همه ردیف‌های view با fetchMore، مثل رسیدن اسکرول به انتهای لیست
+    while model.canFetchMore():
+        model.fetchMore()
+    return [model.entry(row).model for row in range(model.rowCount())]
+
+
+class TypeFacetsTest(unittest.TestCase):
+    def test_counts_and_visible(self):
+        entries = make_entries(1000)
+        facets = TypeFacets()
+        for chunk in chunks(entries):
+            facets.add(chunk)
+        self.assertEqual(facets.counts(), Counter(map(entry_type, entries)))
+        self.assertIn(NO_TYPE, facets.counts())
+        self.assertEqual(list(facets.visible(())), list(range(len(entries))))
+        for hidden in ({"bearing"}, {"bearing", NO_TYPE}, {"no_such_type"}, set(TYPES[:4])):
+            for start in (0, 5, 37, 999):
+                expected = [i for i, e in enumerate(entries) if i >= start and entry_type(e) not in hidden]
+                self.assertEqual(list(facets.visible(hidden, start)), expected, (hidden, start))
+
+    def test_clear(self):
+        facets = TypeFacets()
+        facets.add(make_entries(20))
+        facets.clear()
+        self.assertEqual(facets.counts(), {})
+        self.assertEqual(list(facets.visible({"bearing"})), [])
+
+
+class ResultListModelFacetTest(unittest.TestCase):
+    def setUp(self):
+        self.model = ResultListModel(batch_size=50)
+        self.emitted = []
+        self.model.facets_changed.connect(lambda: self.emitted.append(self.model.facets.counts()))
+
+    def append(self, entries):
+        for chunk in chunks(entries):
+            self.model.append(chunk)
+
+    def test_counts_follow_appended_chunks(self):
+        entries = make_entries(800)
+        seen = []
+        for chunk in chunks(entries):
+            self.model.append(chunk)
+            seen.extend(chunk)
+            self.assertEqual(self.model.facets.counts(), Counter(map(entry_type, seen)))
+            self.assertEqual(self.emitted[-1], Counter(map(entry_type, seen)))
+        # فقط صفحه‌های اول بدون fetchMore به view داده شده‌اند
+        self.assertLess(self.model.rowCount(), len(entries))
+        self.assertEqual(loaded(self.model), [e.model for e in entries])
+
+    def test_hide_and_unhide(self):
+        entries = make_entries(600, seed=1)
+        self.append(entries)
+        everything = [e.model for e in entries]
+
+        self.model.set_hidden_types({"bearing", NO_TYPE})
+        self.assertEqual(self.model.rowCount(), self.model.batch_size)
+        expected = [e.model for e in entries if entry_type(e) not in {"bearing", NO_TYPE}]
+        self.assertEqual(loaded(self.model), expected)
+        # تعدادها همه نوع‌ها را نشان می‌دهند، حتی نوع پنهان
+        self.assertEqual(self.model.facets.counts(), Counter(map(entry_type, entries)))
+
+        # تکه‌های بعدی هم با فیلتر فعلی اضافه می‌شوند
+        more = make_entries(300, seed=2, prefix="N")
+        self.append(more)
+        expected += [e.model for e in more if entry_type(e) not in {"bearing", NO_TYPE}]
+        self.assertEqual(loaded(self.model), expected)
+        self.assertEqual(self.model.facets.counts(), Counter(map(entry_type, entries + more)))
+
+        self.model.set_hidden_types(set())
+        self.assertEqual(loaded(self.model), everything + [e.model for e in more])
+
+    def test_hidden_types_survive_a_new_search(self):
+        self.model.set_hidden_types({"lock_nut"})
+        self.append(make_entries(200, seed=3))
+        self.model.clear()
+        self.assertEqual(self.emitted[-1], {})
+        entries = make_entries(300, seed=4)
+        self.append(entries)
+        self.assertEqual(loaded(self.model), [e.model for e in entries if e.type != "lock_nut"])
+
+    def test_sorted_with_hidden_type(self):
+        entries = make_entries(400, seed=5)
+        self.model.set_hidden_types({"housing"})
+        self.model.sort_by("d")
+        self.append(entries)
+        visible = sorted((e for e in entries if e.type != "housing"), key=lambda e: (e.d, e.model))
+        self.assertEqual(loaded(self.model), [e.model for e in visible])
+
+
+class FacetListTest(unittest.TestCase):
+    # چک‌باکس‌های صفحه جستجو: MainWindow.update_facets و on_facet_toggled روی یک صفحه ساختگی
+    def setUp(self):
+        self.window = SimpleNamespace(t=lambda key: "none")
+        self.screen = SimpleNamespace(
+            result_model=ResultListModel(batch_size=50), facet_list=QListWidget(), facet_items={}
+        )
+
+    def items(self):
+        facet_list = self.screen.facet_list
+        return {
+            facet_list.item(i).data(Qt.UserRole): (facet_list.item(i).text(), facet_list.item(i).checkState())
+            for i in range(facet_list.count())
+        }
+
+    def search(self, entries):
+        model = self.screen.result_model
+        model.clear()
+        main.MainWindow.update_facets(self.window, self.screen)
+        for chunk in chunks(entries):
+            model.append(chunk)
+            main.MainWindow.update_facets(self.window, self.screen)
+
+    def test_items_follow_counts(self):
+        first = make_entries(500, seed=6)
+        self.search(first)
+        counts = Counter(map(entry_type, first))
+        self.assertEqual(self.screen.facet_list.count(), len(counts))
+        self.assertEqual(self.items()[NO_TYPE][0], f"none ({counts[NO_TYPE]})")
+        self.assertEqual(self.items()["bearing"], (f"bearing ({counts['bearing']})", Qt.Checked))
+
+        # پنهان کردن از چک‌باکس و جستجوی بعدی با نوع‌های کمتر
+        self.screen.facet_items["bearing"].setCheckState(Qt.Unchecked)
+        main.MainWindow.on_facet_toggled(self.window, self.screen)
+        self.assertEqual(self.screen.result_model.hidden_types(), {"bearing"})
+
+        gone = self.screen.facet_items["housing"]
+        second = [e for e in make_entries(300, seed=7) if e.type in ("bearing", "lock_nut")]
+        self.search(second)
+        # آیتم‌های نتایج قبلی واقعاً حذف می‌شوند و با هر جستجو جمع نمی‌شوند
+        self.assertTrue(sip.isdeleted(gone))
+        counts = Counter(map(entry_type, second))
+        self.assertEqual(set(self.items()), set(counts))
+        self.assertEqual(self.screen.facet_list.count(), len(counts))
+        self.assertEqual(self.items()["bearing"][1], Qt.Unchecked)
+        self.assertEqual(loaded(self.screen.result_model), [e.model for e in second if e.type != "bearing"])
+
+        self.search([])
+        self.assertEqual(self.screen.facet_list.count(), 0)
+        self.assertTrue(self.screen.facet_list.isHidden())
+
+
+if __name__ == "__main__":
+    unittest.main()
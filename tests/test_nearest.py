@@ -0,0 +1,117 @@
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import catalog  # noqa: E402
+from catalog import SEARCH_FIELDS, CatalogRow, DimensionIndex  # noqa: E402
+
+DESCRIPTIONS = ("open", "rubber seal", "metal shield")
+# مقادیری که در float32 یکی می‌شوند ولی در float64 نه؛ رتبه‌بندی نهایی باید با float64 باشد
+CLOSE = (20.0, 20.0000001, 20.0000002, 400.0, 400.00001, 47.0, 47.0000003)
+WEIGHTS = (None, (1.0, 1.0, 1.0), (4.0, 1.0, 0.25), (0.0, 2.0, 1.0))
+TOLERANCES = (None, 5.0, 0.5)
+
+
+def make_rows(count, seed=13):
+    rng = random.Random(seed)
+
+    def value(low, high):
+        roll = rng.random()
+        if roll < 0.03:
+            return None
+        if roll < 0.5:
+            return rng.choice(CLOSE)
+        return round(rng.uniform(low, high), rng.choice((0, 1, 3)))
+
+    # چند ردیف با مدل یکسان و توضیح متفاوت، و ابعاد کاملاً تکراری برای برابری فاصله
+    rows = []
+    for i in range(count):
+        if rows and rng.random() < 0.2:
+            twin = rng.choice(rows)
+            dims = (twin.d, twin.D, twin.B)
+        else:
+            dims = (value(3, 400), value(10, 800), value(4, 120))
+        rows.append(CatalogRow(*dims, None, None, f"M{i // 3:05d}", "bearing", "", DESCRIPTIONS[i % 3], ""))
+    return rows
+
+
+def brute(rows, fields, values, tolerance, weights):
+    # مرجع float64 روی همه ردیف‌ها با همان ترتیب برابرها (فاصله، مدل، توضیح انگلیسی)
+    weights = weights or (1.0,) * len(fields)
+    ranked = []
+    for row in rows:
+        if any(getattr(row, f) is None for f in fields):
+            continue
+        dist = sum(w * (getattr(row, f) - v) ** 2 for f, v, w in zip(fields, values, weights)) ** 0.5
+        if tolerance is None or dist <= tolerance:
+            ranked.append((dist, row.model, row.desc_en, row))
+    ranked.sort(key=lambda item: item[:3])
+    return [(id(row), dist) for dist, _, _, row in ranked]
+
+
+def queries(rows, fields, count, seed=17):
+    rng = random.Random(seed)
+    usable = [r for r in rows if all(getattr(r, f) is not None for f in fields)]
+    for row in rng.sample(usable, count):
+        exact = tuple(getattr(row, f) for f in fields)
+        yield exact
+        yield tuple(v + rng.uniform(-3, 3) for v in exact)
+    for value in CLOSE:
+        yield (value,) * len(fields)
+
+
+class NearestTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_rows(2000)
+
+    def check(self, search_type):
+        fields = SEARCH_FIELDS[search_type]
+        index = DimensionIndex(self.rows, fields)
+        for values in queries(self.rows, fields, 15):
+            for tolerance in TOLERANCES:
+                for weights in WEIGHTS:
+                    weights = weights and weights[: len(fields)]
+                    expected = brute(self.rows, fields, values, tolerance, weights)
+                    for k in (1, 3, 10):
+                        found = [(id(row), dist) for row, dist in index.nearest(values, k, tolerance, weights)]
+                        self.assertEqual(found, expected[:k], (values, k, tolerance, weights))
+
+    def test_matches_float64_brute_force(self):
+        for search_type in SEARCH_FIELDS:
+            self.check(search_type)
+
+    def test_fallback_without_numpy(self):
+        with mock.patch.object(catalog, "np", None):
+            for search_type in SEARCH_FIELDS:
+                self.check(search_type)
+
+    def test_ties_keep_model_order(self):
+        # بیش از k ردیف با فاصله برابر: انتخاب و ترتیب فقط به مدل و توضیح بستگی دارد، نه به جای ردیف در ایندکس
+        rows = [
+            CatalogRow(20.0, 47.0, 14.0, None, None, f"T{i % 7}", "bearing", "", DESCRIPTIONS[i % 3], "")
+            for i in range(21)
+        ]
+        random.Random(1).shuffle(rows)
+        index = DimensionIndex(rows, SEARCH_FIELDS["bearing"])
+        expected = brute(rows, SEARCH_FIELDS["bearing"], (20.0, 47.0, 14.0), None, None)[:5]
+        self.assertEqual([(id(r), d) for r, d in index.nearest((20.0, 47.0, 14.0), 5)], expected)
+        self.assertEqual([r.model for r, _ in index.nearest((20.0, 47.0, 14.0), 5)], ["T0", "T0", "T0", "T1", "T1"])
+
+    def test_float32_order_is_rechecked(self):
+        # فاصله float32 این دو ردیف برعکس float64 است؛ پیش‌فیلتر float32 نباید ردیف نزدیک‌تر را کنار بگذارد
+        query = (25.319, 107.266, 15.863)
+        closer = CatalogRow(26.807, 108.396, 15.846, None, None, "Z1", "bearing", "", "", "")
+        farther = CatalogRow(26.807008, 108.395991, 15.846006, None, None, "A1", "bearing", "", "", "")
+        decoys = [CatalogRow(40.0 + i, 120.0, 20.0, None, None, f"D{i}", "bearing", "", "", "") for i in range(20)]
+        index = DimensionIndex([farther, closer] + decoys, SEARCH_FIELDS["bearing"])
+        self.assertEqual([r.model for r, _ in index.nearest(query, 1)], ["Z1"])
+        self.assertEqual([r.model for r, _ in index.nearest(query, 2)], ["Z1", "A1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
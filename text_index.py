@@ -0,0 +1,214 @@
+import bisect
+import re
+from array import array
+
+from catalog import normalize_digits
+
+try:
+    import numpy as np
+except ImportError:  # بدون NumPy اشتراک لیست‌ها با set انجام می‌شود
+    np = None
+
+# ی/ک عربی به فارسی، حذف نیم‌فاصله، کشیده و اعراب
+_LETTERS = str.maketrans(
+    {
+        "\u064a": "\u06cc",  # ي -> ی
+        "\u0649": "\u06cc",  # ى -> ی
+        "\u0643": "\u06a9",  # ك -> ک
+        "\u0629": "\u0647",  # ة -> ه
+        "\u200c": None,
+        "\u200d": None,
+        "\u0640": None,
+        **{chr(c): None for c in range(0x064B, 0x0660)},
+    }
+)
+_TOKEN = re.compile(r"[^\W_]+(?:\.\d+)?")
+
+
+def normalize_text(text):
+    return normalize_digits(str(text)).translate(_LETTERS).casefold()
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return _TOKEN.findall(normalize_text(text))
+
+
+def parse_query(query, prefix_last=False):
+    # هر کلمه یک شرط AND است؛ "seal*" جستجوی پیشوندی است
+    terms = []
+    words = str(query or "").split()
+    for n, word in enumerate(words):
+        prefix = word.endswith("*") or (prefix_last and n == len(words) - 1)
+        tokens = tokenize(word.rstrip("*"))
+        for i, token in enumerate(tokens):
+            terms.append((token, prefix and i == len(tokens) - 1))
+    return terms
+
+
+class TextIndex:
+    # ایندکس معکوس فشرده (CSR): واژه‌ها مرتب هستند و شناسه سندهای همه واژه‌ها پشت سر هم
+    # در یک آرایه uint32 قرار دارند؛ پس بازه پیشوند یک واژه هم یک برش پیوسته است
+    def __init__(self, documents):
+        # هر سند تاپلی از بخش‌های متنی است؛ توضیحات تکراری فقط یک بار توکن می‌شوند
+        cache = {}
+        term_ids = {}
+        pair_terms = array("I")
+        pair_docs = array("I")
+        count = 0
+        for doc_id, parts in enumerate(documents):
+            count += 1
+            terms = set()
+            for part in parts:
+                if not part:
+                    continue
+                tokens = cache.get(part)
+                if tokens is None:
+                    tokens = cache[part] = tuple({term_ids.setdefault(t, len(term_ids)) for t in tokenize(part)})
+                terms.update(tokens)
+            pair_terms.extend(terms)
+            pair_docs.extend([doc_id] * len(terms))
+        del cache
+
+        self.doc_count = count
+        self.terms = sorted(term_ids, key=term_ids.get)
+        rank = array("I", bytes(4 * len(self.terms)))
+        for position, tid in enumerate(sorted(range(len(self.terms)), key=self.terms.__getitem__)):
+            rank[tid] = position
+        self.terms.sort()
+        del term_ids
+
+        if np is not None and pair_docs:
+            keys = np.frombuffer(rank, dtype=np.uint32)[np.frombuffer(pair_terms, dtype=np.uint32)]
+            order = np.argsort(keys, kind="stable")
+            self._ids = array("I", np.frombuffer(pair_docs, dtype=np.uint32)[order].tobytes())
+            counts = np.bincount(keys, minlength=len(self.terms))
+            self._offsets = array("Q", [0])
+            self._offsets.frombytes(np.cumsum(counts, dtype=np.uint64).tobytes())
+            self._view = np.frombuffer(self._ids, dtype=np.uint32)
+        else:
+            postings = [array("I") for _ in self.terms]
+            for tid, doc_id in zip(pair_terms, pair_docs):
+                postings[rank[tid]].append(doc_id)
+            self._ids = array("I")
+            self._offsets = array("Q", [0])
+            for ids in postings:
+                self._ids.extend(ids)
+                self._offsets.append(len(self._ids))
+            self._view = None
+
+    def __len__(self):
+        return len(self.terms)
+
+    def updated(self, dropped, documents):
+        # سندهای حذف شده (موقعیت‌های مرتب در لیست قبلی) کنار می‌روند و سندهای جدید به انتها اضافه می‌شوند؛
+        # فقط سندهای جدید توکن می‌شوند. بدون NumPy None برمی‌گردد و ایندکس دوباره ساخته می‌شود
+        if self._view is None:
+            return None
+        offsets = np.frombuffer(self._offsets, dtype=np.uint64).astype(np.int64)
+        term_of = np.repeat(np.arange(len(self.terms), dtype=np.int64), np.diff(offsets))
+        docs = self._view.astype(np.int64)
+        if dropped:
+            dropped = np.asarray(dropped, dtype=np.int64)
+            member = np.zeros(self.doc_count, dtype=bool)
+            member[dropped] = True
+            keep = ~member[docs]
+            docs = docs[keep]
+            term_of = term_of[keep]
+            # شناسه هر سند به اندازه تعداد سندهای حذف شده پیش از آن کم می‌شود
+            docs -= np.searchsorted(dropped, docs)
+        base = self.doc_count - len(dropped)
+
+        cache = {}
+        pairs = []
+        count = 0
+        for doc_id, parts in enumerate(documents, base):
+            count += 1
+            terms = set()
+            for part in parts:
+                if not part:
+                    continue
+                tokens = cache.get(part)
+                if tokens is None:
+                    tokens = cache[part] = tuple(set(tokenize(part)))
+                terms.update(tokens)
+            pairs.extend((term, doc_id) for term in terms)
+
+        # واژه‌های جدید در جای مرتب خود درج می‌شوند و شماره واژه‌های قبلی جابه‌جا می‌شود
+        fresh = sorted({term for term, _ in pairs}.difference(self.terms))
+        at = np.array([bisect.bisect_left(self.terms, term) for term in fresh], dtype=np.int64)
+        terms = sorted(self.terms + fresh)
+        shift = np.searchsorted(at, np.arange(len(self.terms)), side="right")
+        term_of = term_of + shift[term_of]
+
+        # postings قبلی مرتب می‌مانند و سندهای جدید از همه بزرگ‌ترند، پس فقط درج در انتهای هر واژه لازم است
+        rank = {term: bisect.bisect_left(terms, term) for term, _ in pairs}
+        pairs = sorted((rank[term], doc) for term, doc in pairs)
+        new_terms = np.array([term for term, _ in pairs], dtype=np.int64)
+        new_docs = np.array([doc for _, doc in pairs], dtype=np.int64)
+        if not len(docs) and not len(new_docs):
+            return None
+        positions = np.searchsorted(term_of, new_terms, side="right")
+        ids = np.insert(docs, positions, new_docs).astype(np.uint32)
+        counts = np.bincount(term_of, minlength=len(terms)) + np.bincount(new_terms, minlength=len(terms))
+        # واژه‌هایی که فقط در سندهای حذف شده بودند کنار می‌روند تا با ایندکس ساخته شده از صفر یکی باشد
+        used = counts > 0
+        if not used.all():
+            terms = [term for term, keep in zip(terms, used.tolist()) if keep]
+            counts = counts[used]
+
+        clone = TextIndex.__new__(TextIndex)
+        clone.doc_count = base + count
+        clone.terms = terms
+        clone._ids = array("I", ids.tobytes())
+        clone._offsets = array("Q", [0])
+        clone._offsets.frombytes(np.cumsum(counts, dtype=np.uint64).tobytes())
+        clone._view = np.frombuffer(clone._ids, dtype=np.uint32)
+        return clone
+
+    def nbytes(self):
+        return (
+            self._ids.itemsize * len(self._ids)
+            + self._offsets.itemsize * len(self._offsets)
+            + sum(len(t) for t in self.terms)
+        )
+
+    def _slice(self, lo, hi):
+        start, stop = self._offsets[lo], self._offsets[hi]
+        if self._view is not None:
+            return self._view[start:stop]
+        return self._ids[start:stop]
+
+    def postings(self, term, prefix=False):
+        lo = bisect.bisect_left(self.terms, term)
+        if prefix:
+            hi = bisect.bisect_left(self.terms, term + "\uffff", lo)
+        else:
+            hi = lo + 1 if lo < len(self.terms) and self.terms[lo] == term else lo
+        ids = self._slice(lo, hi)
+        if hi - lo > 1:
+            # اجتماع لیست‌های چند واژه هم‌پیشوند
+            ids = np.unique(ids) if self._view is not None else array("I", sorted(set(ids)))
+        return ids
+
+    def search(self, query, prefix_last=False):
+        # None یعنی پرس‌وجو هیچ واژه‌ای نداشت؛ لیست خالی یعنی سندی پیدا نشد
+        terms = parse_query(query, prefix_last)
+        if not terms:
+            return None
+
+        lists = sorted((self.postings(term, prefix) for term, prefix in terms), key=len)
+        result = lists[0]
+        for ids in lists[1:]:
+            if not len(result):
+                break
+            if self._view is not None:
+                # هر دو لیست مرتب و بدون تکرارند؛ ماسک عضویت از intersect1d (که مرتب‌سازی دارد) سریع‌تر است
+                member = np.zeros(self.doc_count, dtype=bool)
+                member[ids] = True
+                result = result[member[result]]
+            else:
+                keep = set(ids)
+                result = array("I", (i for i in result if i in keep))
+        return result.tolist()